@@ -633,14 +633,24 @@ def _optimize_image_for_ai(image_path, max_width=2048, max_height=2048, quality=
     - Redimensiona si es muy grande
     - Comprime a JPEG para reducir tamaño
     - Mantiene calidad suficiente para análisis visual
+    Con límite cuadrado la variante sale de la caché compartida (image_payloads).
     """
+    if max_width == max_height:
+        try:
+            from image_payloads import encoded_image
+            return encoded_image(image_path, max_width, quality=quality)
+        except Exception:
+            pass
     try:
         from PIL import Image
         import io
         
-        # Abrir imagen
-        img = Image.open(image_path)
-        original_format = img.format
+        # Abrir imagen (en JPEG se decodifica ya reducida con Image.draft)
+        try:
+            from analyzer import open_reduced
+            img = open_reduced(image_path, max(max_width, max_height))
+        except ImportError:
+            img = Image.open(image_path)
         
         # Convertir a RGB si es necesario (para JPEG)
         if img.mode != 'RGB':
@@ -0,0 +1,183 @@
+"""
+Caché de análisis en disco, direccionada por contenido y compartida entre lotes.
+
+La clave combina el sha256 de la imagen, la etapa ('layout', 'dna', 'ocr'...) y
+sus parámetros (modo preciso, modelo, versión del prompt...). Los valores son
+JSON guardados en SQLite, de modo que la comparten los hilos, los procesos de
+segmentación y los reinicios. Al superar max_bytes se descartan las entradas
+usadas hace más tiempo (LRU) y una entrada guardada con ttl deja de servirse al
+caducar; los contadores de aciertos y fallos por etapa también se guardan en la
+base para poder monitorizarlos.
+"""
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+CACHE_ENABLED = os.environ.get('IMG2HTML_ANALYSIS_CACHE', 'true').lower() == 'true'
+CACHE_DIR = os.environ.get('IMG2HTML_ANALYSIS_CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+CACHE_MAX_BYTES = int(os.environ.get('IMG2HTML_ANALYSIS_CACHE_MB', 256)) * 1024 * 1024
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY,
+        stage TEXT NOT NULL,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created REAL NOT NULL,
+        accessed REAL NOT NULL,
+        expires REAL
+    )""",
+    "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)",
+    """CREATE TABLE IF NOT EXISTS counters (
+        stage TEXT PRIMARY KEY,
+        hits INTEGER NOT NULL DEFAULT 0,
+        misses INTEGER NOT NULL DEFAULT 0
+    )""",
+)
+
+
+class AnalysisCache:
+    def __init__(self, path: str, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._db() as db:
+            try:
+                # WAL: lectores y escritor concurrentes (hilos y procesos de segmentación)
+                db.execute('PRAGMA journal_mode=WAL')
+            except Exception:
+                pass
+            for stmt in _SCHEMA:
+                db.execute(stmt)
+            # Bases creadas antes de que existiera la caducidad por entrada
+            columns = {row[1] for row in db.execute('PRAGMA table_info(entries)')}
+            if 'expires' not in columns:
+                db.execute('ALTER TABLE entries ADD COLUMN expires REAL')
+
+    def _db(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        return _Closing(db)
+
+    @staticmethod
+    def key(stage: str, digest: str, params: Optional[Dict] = None) -> str:
+        raw = json.dumps([stage, digest, params or {}], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, stage: str, digest: str, params: Optional[Dict] = None, default=None):
+        """Valor guardado para (etapa, imagen, parámetros) o default si no existe."""
+        key = self.key(stage, digest, params)
+        now = time.time()
+        with self._lock, self._db() as db:
+            row = db.execute('SELECT value, expires FROM entries WHERE key=?', (key,)).fetchone()
+            if row is not None and row[1] is not None and row[1] <= now:
+                db.execute('DELETE FROM entries WHERE key=?', (key,))
+                row = None
+            hit = row is not None
+            if hit:
+                db.execute('UPDATE entries SET accessed=? WHERE key=?', (now, key))
+            db.execute('INSERT OR IGNORE INTO counters (stage) VALUES (?)', (stage,))
+            db.execute(f"UPDATE counters SET {'hits=hits+1' if hit else 'misses=misses+1'} WHERE stage=?", (stage,))
+        if not hit:
+            return default
+        try:
+            return json.loads(row[0])
+        except Exception:
+            return default
+
+    def put(self, stage: str, digest: str, value, params: Optional[Dict] = None, ttl: Optional[float] = None):
+        """
+        Guarda value (JSON); con ttl (segundos) la entrada caduca pasado ese
+        tiempo. ttl <= 0 significa no guardar (devuelve False).
+        """
+        if ttl is not None and float(ttl) <= 0:
+            return False
+        data = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+        size = len(data.encode('utf-8'))
+        if self.max_bytes and size > self.max_bytes:
+            return False
+        now = time.time()
+        expires = now + float(ttl) if ttl is not None else None
+        with self._lock, self._db() as db:
+            db.execute('INSERT OR REPLACE INTO entries (key, stage, value, size, created, accessed, expires) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                       (self.key(stage, digest, params), stage, data, size, now, now, expires))
+            self._evict(db)
+        return True
+
+    def _evict(self, db):
+        if not self.max_bytes:
+            return
+        # Lo caducado se descarta antes que lo usado hace tiempo
+        db.execute('DELETE FROM entries WHERE expires IS NOT NULL AND expires<=?', (time.time(),))
+        total = db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Se libera hasta el 90 % del límite para no desalojar en cada escritura
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in db.execute('SELECT key, size FROM entries ORDER BY accessed'):
+            victims.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        db.executemany('DELETE FROM entries WHERE key=?', victims)
+
+    def stats(self) -> Dict:
+        with self._db() as db:
+            entries, total = db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+            per_stage = {stage: {'entries': n, 'bytes': b} for stage, n, b in
+                         db.execute('SELECT stage, COUNT(*), SUM(size) FROM entries GROUP BY stage')}
+            for stage, hits, misses in db.execute('SELECT stage, hits, misses FROM counters'):
+                per_stage.setdefault(stage, {'entries': 0, 'bytes': 0}).update(hits=hits, misses=misses)
+        hits = sum(s.get('hits', 0) for s in per_stage.values())
+        misses = sum(s.get('misses', 0) for s in per_stage.values())
+        return {
+            'enabled': True,
+            'path': self.path,
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / float(hits + misses), 3) if hits + misses else 0.0,
+            'stages': per_stage,
+        }
+
+    def clear(self):
+        with self._lock, self._db() as db:
+            db.execute('DELETE FROM entries')
+            db.execute('DELETE FROM counters')
+
+
+class _Closing:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self.db
+
+    def __exit__(self, *exc):
+        self.db.close()
+        return False
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> Optional[AnalysisCache]:
+    """Caché compartida del proceso (None si IMG2HTML_ANALYSIS_CACHE=false o no se puede abrir)."""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = AnalysisCache(os.path.join(CACHE_DIR, 'analysis.sqlite3'), CACHE_MAX_BYTES)
+            except Exception:
+                return None
+        return _cache
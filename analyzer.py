@@ -3,18 +3,31 @@ import re
 import unicodedata
 import base64
 import json
+import hashlib
+import io
+import struct
+import threading
+import zlib
+from collections import OrderedDict
 from typing import Dict, List, Optional
-from PIL import Image
+from PIL import Image, ImageChops, ImageStat
 try:
-    import cv2
     import numpy as np
 except Exception:
-    cv2 = None
     np = None
+try:
+    import cv2
+except Exception:
+    cv2 = None
 try:
     import colorgram
 except Exception:
     colorgram = None
+try:
+    from analysis_cache import get_cache as _analysis_cache
+except Exception:
+    def _analysis_cache():
+        return None
 
 KEYWORDS = {
     'hero': 'Hero',
@@ -58,7 +71,67 @@ def parse_order(name):
         return int(m2.group(1))
     return 9999
 
-def analyze_images(paths):
+_probes = {}
+_probes_lock = threading.Lock()
+
+def probe_image(path):
+    """
+    Lee solo la cabecera de una imagen: formato, tamaño, modo y orientación
+    EXIF, sin decodificar píxeles. Memorizado por (ruta, tamaño, mtime), de
+    modo que las etapas posteriores no vuelven a abrir el archivo para
+    conocer sus dimensiones. Lanza excepción si no es una imagen legible.
+    """
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _probes_lock:
+        info = _probes.get(key)
+    if info is not None:
+        return dict(info)
+    with Image.open(path) as im:
+        w, h = im.size
+        info = {'format': im.format, 'width': w, 'height': h, 'mode': im.mode, 'orientation': 1}
+        # En JPEG/WebP el bloque EXIF forma parte de la cabecera; en PNG solo
+        # se usa si el chunk eXIf precede a los datos (getexif() decodificaría)
+        raw = im.info.get('exif')
+    if raw:
+        try:
+            exif = Image.Exif()
+            exif.load(raw)
+            info['orientation'] = int(exif.get(0x0112, 1) or 1)
+        except Exception:
+            pass
+    with _probes_lock:
+        _probes[key] = info
+    return dict(info)
+
+def open_reduced(path, max_side, resample=None):
+    """
+    Abre una imagen en RGB con el lado mayor limitado a max_side. En JPEG usa
+    Image.draft para decodificar directamente a escala 1/2, 1/4 u 1/8 (sin
+    pasar por la resolución completa) y después ajusta con resample (LANCZOS
+    por defecto; NEAREST conserva los colores originales).
+    """
+    im = Image.open(path)
+    w, h = im.size
+    if max(w, h) > max_side:
+        ratio = max_side / float(max(w, h))
+        target = (max(1, int(w * ratio)), max(1, int(h * ratio)))
+        try:
+            im.draft('RGB', target)
+        except Exception:
+            pass
+        im = im.convert('RGB')
+        if max(im.size) > max_side:
+            im = im.resize(target, resample if resample is not None else Image.Resampling.LANCZOS)
+        return im
+    return im.convert('RGB')
+
+def analyze_images(paths, probes=None):
+    """
+    Agrupa las imágenes en secciones. Si se reciben probes ({ruta: cabecera}
+    de probe_image), cada sección guarda en 'sources' el formato, tamaño y
+    orientación de sus imágenes originales.
+    """
     items = []
     for p in paths:
         base = os.path.basename(p)
@@ -78,6 +151,8 @@ def analyze_images(paths):
         else:
             by_slug[key] = len(sections)
             sections.append({'name': it['name'], 'label': it['label'], 'slug': it['slug'], 'images': [it['path']]})
+        if probes and probes.get(it['path']):
+            sections[by_slug[key]].setdefault('sources', []).append(dict(probes[it['path']], path=it['path']))
     title = items[0]['label'] if items else 'Sitio'
     return {'title': title, 'sections': sections, 'count': len(items)}
 
@@ -106,69 +181,194 @@ def _is_grayscale(rgb, tolerance=10):
     r, g, b = rgb
     return abs(r-g) < tolerance and abs(g-b) < tolerance
 
-def extract_design_dna(image_paths):
+PALETTE_SAMPLE = int(os.environ.get('IMG2HTML_PALETTE_SAMPLE', 65536))
+PALETTE_MAX_SIDE = 1024
+PALETTE_BITS = 4
+
+def _reservoir_pixels(blocks, k, seed=0):
+    """
+    Muestreo de reservorio (algoritmo R) vectorizado sobre bloques de píxeles
+    N x 3: devuelve hasta k píxeles uniformes sin conocer el total de antemano
+    y sin retener más que k en memoria.
+    """
+    rnd = np.random.RandomState(seed)
+    reservoir = np.empty((k, 3), dtype=np.uint8)
+    seen = 0
+    for block in blocks:
+        block = np.asarray(block).reshape(-1, 3)
+        if seen < k:
+            take = min(k - seen, len(block))
+            reservoir[seen:seen + take] = block[:take]
+            block = block[take:]
+            seen += take
+        n = len(block)
+        if n == 0:
+            continue
+        slots = (rnd.random_sample(n) * (seen + 1 + np.arange(n))).astype(np.int64)
+        keep = slots < k
+        # Con índices repetidos gana la última asignación, como en el algoritmo secuencial
+        reservoir[slots[keep]] = block[keep]
+        seen += n
+    return reservoir[:min(seen, k)]
+
+def _sample_pixels(feat, max_pixels=None, seed=0, oversample=2):
+    """
+    Muestra de píxeles RGB (N x 3, uint8): reservorio de max_pixels sobre una
+    rejilla con paso fijo y desplazamiento aleatorio de unas oversample veces
+    ese tamaño. Determinista para una semilla dada; el coste depende de
+    max_pixels, no del tamaño de la captura.
+    """
+    max_pixels = max_pixels or PALETTE_SAMPLE
+    arr = feat.bgr[..., ::-1] if feat.has_cv else np.asarray(feat.rgb)
+    h, w = arr.shape[:2]
+    rnd = np.random.RandomState(seed)
+    stride = max(1, int(np.ceil(np.sqrt(h * w / float(max_pixels * oversample)))))
+    oy, ox = (rnd.randint(stride, size=2) if stride > 1 else (0, 0))
+    grid = arr[oy::stride, ox::stride]
+    step = max(1, 65536 // max(1, grid.shape[1]))
+    blocks = (np.ascontiguousarray(grid[y:y + step]) for y in range(0, grid.shape[0], step))
+    return _reservoir_pixels(blocks, max_pixels, seed)
+
+def _palette_colors(pixels, k=12, min_distance=24.0, weights=None):
+    """
+    Paleta de hasta k colores a partir de un histograma cuantizado
+    (PALETTE_BITS bits por canal). Cada color es la media real de los píxeles
+    de su celda; las celdas vecinas casi idénticas (degradados, antialias)
+    se descartan. weights pondera cada píxel (p. ej. por área de su imagen).
+    Devuelve [(rgb, proporción)] ordenado por frecuencia.
+    """
+    pixels = np.asarray(pixels).reshape(-1, 3)
+    if pixels.size == 0:
+        return []
+    if weights is None:
+        weights = np.ones(len(pixels), dtype=np.float64)
+    shift = 8 - PALETTE_BITS
+    q = pixels.astype(np.int32) >> shift
+    idx = (q[:, 0] << (2 * PALETTE_BITS)) | (q[:, 1] << PALETTE_BITS) | q[:, 2]
+    nbins = 1 << (3 * PALETTE_BITS)
+    counts = np.bincount(idx, weights=weights, minlength=nbins)
+    sums = np.stack([np.bincount(idx, weights=pixels[:, c] * weights, minlength=nbins) for c in range(3)], axis=1)
+    order = np.argsort(-counts, kind='stable')
+    order = order[counts[order] > 0]
+    total = float(counts.sum())
+    chosen = []
+    means = []
+    for b in order:
+        mean = sums[b] / counts[b]
+        if means and np.min(np.linalg.norm(np.array(means) - mean, axis=1)) < min_distance:
+            continue
+        means.append(mean)
+        chosen.append((tuple(int(round(v)) for v in mean), counts[b] / total))
+        if len(chosen) >= k:
+            break
+    return chosen
+
+def _merged_sample(image_paths, feature_cache=None, max_pixels=None, seed=0):
+    """
+    Muestra conjunta de todas las imágenes: el presupuesto max_pixels se
+    reparte entre ellas y cada píxel pesa área / tamaño de su muestra, de modo
+    que cada captura contribuye en proporción a su superficie.
+    """
+    max_pixels = max_pixels or PALETTE_SAMPLE
+    per_image = max(256, max_pixels // max(1, len(image_paths)))
+    samples = []
+    weights = []
+    for i, p in enumerate(image_paths):
+        try:
+            if feature_cache is not None and feature_cache.peek(p, 'bgr') is not None:
+                feat = feature_cache.features(p)
+            else:
+                # La paleta no necesita resolución completa: decodificación reducida
+                feat = ImageFeatures(open_reduced(p, PALETTE_MAX_SIDE, Image.Resampling.NEAREST))
+            info = probe_image(p)
+            w, h = info['width'], info['height']
+            sample = _sample_pixels(feat, per_image, seed + i)
+        except Exception:
+            continue
+        if len(sample):
+            samples.append(sample)
+            weights.append(np.full(len(sample), w * h / float(len(sample))))
+    if not samples:
+        return np.zeros((0, 3), dtype=np.uint8), np.zeros(0)
+    return np.concatenate(samples), np.concatenate(weights)
+
+def _palette_roles(rgb_colors):
+    """Asigna background/text/primary/secondary a una lista de colores RGB."""
+    by_lum = sorted(rgb_colors, key=_luminance)
+    bg_color = by_lum[-1] if by_lum else (255,255,255)
+    text_color = by_lum[0] if by_lum else (17,17,17)
+    primary_color = None
+    max_sat = -1
+    for rgb in rgb_colors:
+        if _is_grayscale(rgb, 20):
+            continue
+        sat = max(rgb) - min(rgb)
+        if sat > max_sat:
+            max_sat = sat
+            primary_color = rgb
+    if not primary_color:
+        primary_color = (59,130,246)
+    secondary_color = text_color
+    if len(by_lum) > 1:
+        secondary_color = by_lum[1]
+    return [
+        {"slug": "background", "color": _rgb_to_hex(bg_color)},
+        {"slug": "text", "color": _rgb_to_hex(text_color)},
+        {"slug": "primary", "color": _rgb_to_hex(primary_color)},
+        {"slug": "secondary", "color": _rgb_to_hex(secondary_color)}
+    ]
+
+def extract_design_dna(image_paths, feature_cache=None, seed=0):
+    """
+    ADN de diseño (paleta por roles y tipografía) del conjunto de capturas. Se
+    guarda en la caché de análisis por el contenido de las imágenes, en orden,
+    así que volver a subir el mismo diseño no repite el muestreo.
+    """
+    cache = _analysis_cache() if image_paths else None
+    digest = None
+    params = {'seed': seed, 'sample': PALETTE_SAMPLE, 'bits': PALETTE_BITS}
+    if cache is not None:
+        try:
+            digest = hashlib.sha256(':'.join(source_digest(p) for p in image_paths).encode('ascii')).hexdigest()
+            dna = cache.get('dna', digest, params)
+            if dna is not None:
+                return dna
+        except Exception:
+            digest = None
+    dna = _design_dna(image_paths, feature_cache, seed)
+    if digest:
+        try:
+            cache.put('dna', digest, dna, params)
+        except Exception:
+            pass
+    return dna
+
+def _design_dna(image_paths, feature_cache=None, seed=0):
     default_palette = [{"slug":"background","color":"#ffffff"},{"slug":"text","color":"#111111"},{"slug":"primary","color":"#3b82f6"}]
     if not image_paths:
         return {"palette": default_palette, "typography": {"fontFamily": "Inter, system-ui, sans-serif"}}
-    path = image_paths[0]
+    feat = _as_features(image_paths[0], feature_cache)
     palette = []
-    if colorgram:
+    if np is not None:
+        # Histograma cuantizado vectorizado sobre una muestra acotada de píxeles
+        # de todas las capturas, ponderada por área
+        try:
+            pixels, weights = _merged_sample(image_paths, feature_cache, seed=seed)
+            colors = _palette_colors(pixels, 12, weights=weights)
+            if colors:
+                palette = _palette_roles([rgb for rgb, _ in colors])
+        except Exception:
+            palette = []
+    if not palette and colorgram:
         try:
-            colors = colorgram.extract(path, 12)
-            rgb_colors = [(c.rgb.r, c.rgb.g, c.rgb.b) for c in colors]
-            by_lum = sorted(rgb_colors, key=_luminance)
-            bg_color = by_lum[-1] if by_lum else (255,255,255)
-            text_color = by_lum[0] if by_lum else (17,17,17)
-            primary_color = None
-            max_sat = -1
-            for rgb in rgb_colors:
-                if _is_grayscale(rgb, 20):
-                    continue
-                sat = max(rgb) - min(rgb)
-                if sat > max_sat:
-                    max_sat = sat
-                    primary_color = rgb
-            if not primary_color:
-                primary_color = (59,130,246)
-            secondary_color = text_color
-            if len(by_lum) > 1:
-                secondary_color = by_lum[1]
-            palette = [
-                {"slug": "background", "color": _rgb_to_hex(bg_color)},
-                {"slug": "text", "color": _rgb_to_hex(text_color)},
-                {"slug": "primary", "color": _rgb_to_hex(primary_color)},
-                {"slug": "secondary", "color": _rgb_to_hex(secondary_color)}
-            ]
+            colors = colorgram.extract(feat.rgb, 12)
+            palette = _palette_roles([(c.rgb.r, c.rgb.g, c.rgb.b) for c in colors])
         except Exception:
             palette = []
     if not palette:
         try:
-            img = Image.open(path).convert('RGB')
-            small = img.resize((96, 96))
-            pixels = list(small.getdata())
-            by_lum = sorted(pixels, key=_luminance)
-            bg_color = by_lum[-1] if by_lum else (255,255,255)
-            text_color = by_lum[0] if by_lum else (17,17,17)
-            primary_color = None
-            max_sat = -1
-            for rgb in pixels:
-                if _is_grayscale(rgb, 20):
-                    continue
-                sat = max(rgb) - min(rgb)
-                if sat > max_sat:
-                    max_sat = sat
-                    primary_color = rgb
-            if not primary_color:
-                primary_color = (59,130,246)
-            secondary_color = text_color
-            if len(by_lum) > 1:
-                secondary_color = by_lum[1]
-            palette = [
-                {"slug": "background", "color": _rgb_to_hex(bg_color)},
-                {"slug": "text", "color": _rgb_to_hex(text_color)},
-                {"slug": "primary", "color": _rgb_to_hex(primary_color)},
-                {"slug": "secondary", "color": _rgb_to_hex(secondary_color)}
-            ]
+            small = feat.rgb.resize((96, 96))
+            palette = _palette_roles(list(small.getdata()))
         except Exception:
             palette = default_palette
     return {"palette": palette, "typography": {"fontFamily": "Inter, system-ui, sans-serif"}}
@@ -190,14 +390,30 @@ PATTERN_MAP = {
     'hero-split': 'hero-split-screen'
 }
 
+def _column_count(row):
+    return len(row.get('columns') or row.get('column_boxes') or [])
+
+def _primary_row(rows):
+    """
+    Primera fila con estructura: si la fila superior es de una sola columna y
+    el XY-cut recursivo encontró filas anidadas dentro, desciende a ellas.
+    """
+    r0 = rows[0]
+    while _column_count(r0) <= 1:
+        nested = (r0.get('column_layouts') or [[]])[0]
+        if not nested:
+            break
+        r0 = nested[0]
+    return r0
+
 def identify_pattern(section):
     label = section.get('label', '')
     slug = section.get('slug', '')
     text = (label + ' ' + slug).lower()
     rows = section.get('layout_rows') or []
     if rows:
-        r0 = rows[0]
-        cols = r0.get('columns') or []
+        r0 = _primary_row(rows)
+        cols = r0.get('columns') or r0.get('column_boxes') or []
         rp = r0.get('ratios_percent') or []
         if len(cols) == 2:
             if len(rp) >= 2 and isinstance(rp[0], (int, float)) and isinstance(rp[1], (int, float)):
@@ -218,30 +434,29 @@ def identify_pattern_variant(section):
     rows = section.get('layout_rows') or []
     if not rows:
         return ''
-    r0 = rows[0]
+    r0 = _primary_row(rows)
     rp = r0.get('ratios_percent') or []
-    cols = r0.get('columns') or []
+    cols = r0.get('columns') or r0.get('column_boxes') or []
     if len(cols) == 2 and len(rp) >= 2 and isinstance(rp[0], (int, float)) and isinstance(rp[1], (int, float)):
         diff = abs(int(rp[0]) - int(rp[1]))
         return 'balanced' if diff <= 10 else 'asymmetric'
     return ''
 
 def _row_energy(img):
-    w, h = img.size
-    px = img.convert('L').load()
-    arr = []
-    for y in range(h):
-        s = 0
-        last = px[0, y]
-        for x in range(1, w):
-            v = px[x, y]
-            d = v - last
-            if d < 0:
-                d = -d
-            s += d
-            last = v
-        arr.append(s)
-    return arr
+    """
+    Energía horizontal por fila: suma de |p[x, y] - p[x-1, y]| en escala de grises.
+    Vectorizado con NumPy; si no está disponible usa ImageChops (C) en lugar de
+    recorrer cada píxel en Python.
+    """
+    gray = img.convert('L')
+    w, h = gray.size
+    if np is not None:
+        arr = np.asarray(gray, dtype=np.int32)
+        return np.abs(np.diff(arr, axis=1)).sum(axis=1).tolist()
+    if w < 2:
+        return [0] * h
+    diff = ImageChops.difference(gray.crop((1, 0, w, h)), gray.crop((0, 0, w - 1, h)))
+    return [int(ImageStat.Stat(diff.crop((0, y, w - 1, y + 1))).sum[0]) for y in range(h)]
 
 def _find_cuts(energy, min_gap):
     h = len(energy)
@@ -258,21 +473,18 @@ def _find_cuts(energy, min_gap):
     return cuts
 
 def _col_energy(img):
-    w, h = img.size
-    px = img.convert('L').load()
-    arr = []
-    for x in range(w):
-        s = 0
-        last = px[x, 0]
-        for y in range(1, h):
-            v = px[x, y]
-            d = v - last
-            if d < 0:
-                d = -d
-            s += d
-            last = v
-        arr.append(s)
-    return arr
+    """
+    Energía vertical por columna: suma de |p[x, y] - p[x, y-1]| en escala de grises.
+    """
+    gray = img.convert('L')
+    w, h = gray.size
+    if np is not None:
+        arr = np.asarray(gray, dtype=np.int32)
+        return np.abs(np.diff(arr, axis=0)).sum(axis=0).tolist()
+    if h < 2:
+        return [0] * w
+    diff = ImageChops.difference(gray.crop((0, 1, w, h)), gray.crop((0, 0, w, h - 1)))
+    return [int(ImageStat.Stat(diff.crop((x, 0, x + 1, h - 1))).sum[0]) for x in range(w)]
 
 def _find_vcuts(energy, min_gap):
     w = len(energy)
@@ -288,238 +500,1202 @@ def _find_vcuts(energy, min_gap):
             last = i
     return cuts
 
-def segment_columns(path, out_dir, min_width=160, precise=False):
-    if cv2 is not None and np is not None:
-        try:
-            im = cv2.imread(path)
-            if im is None:
-                raise RuntimeError('cv2 failed to read')
-            h, w = im.shape[:2]
-            gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
-            gray = cv2.GaussianBlur(gray, (5, 5), 0)
-            sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-            abs_x = np.abs(sobelx)
-            col_energy = abs_x.sum(axis=0)
-            col_energy = col_energy / (col_energy.max() + 1e-9)
-            kernel = np.ones((15,), dtype=np.float64) / 15.0
-            smooth = np.convolve(col_energy, kernel, mode='same')
-            mu = smooth.mean(); sigma = smooth.std()
-            thr = mu + (1.2 if precise else 1.5) * sigma
-            cand_cuts = [i for i, e in enumerate(smooth) if e > thr]
-            edges = cv2.Canny(gray, 50, 150)
-            lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=(90 if precise else 120), minLineLength=int(0.55*h), maxLineGap=20)
-            line_xs = []
-            if lines is not None:
-                for l in lines[:,0]:
-                    x1,y1,x2,y2 = l
-                    if abs(x1 - x2) <= 3:
-                        line_xs.append(int((x1 + x2) // 2))
-            hsv = cv2.cvtColor(im, cv2.COLOR_BGR2HSV)
-            avg_cols = hsv.mean(axis=0)
-            Z = avg_cols.astype(np.float32)
-            K = 3 if precise else 2
-            criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 0.2)
+def _plane_nbytes(value):
+    if value is None:
+        return 0
+    if isinstance(value, Image.Image):
+        return value.size[0] * value.size[1] * len(value.getbands())
+    return int(getattr(value, 'nbytes', 0))
+
+class FeatureCache:
+    """
+    Cache por trabajo de planos derivados de imágenes (gris, desenfoque, HSV,
+    Sobel, Canny...). Cada plano se calcula una sola vez y se memoriza; cuando
+    se supera max_bytes se descartan planos en orden LRU y se recalculan si
+    vuelven a pedirse.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None:
             try:
-                ret, labels, centers = cv2.kmeans(Z, K, None, criteria, 10, cv2.KMEANS_PP_CENTERS)
-                labels = labels.flatten().tolist()
+                max_bytes = int(os.environ.get('IMG2HTML_FEATURE_CACHE_MB', '512')) * 1024 * 1024
             except Exception:
-                labels = [0]*w
-            trans = []
-            last_label = labels[0]
-            for i in range(1, w):
-                if labels[i] != last_label:
-                    trans.append(i)
-                    last_label = labels[i]
-            cuts = cand_cuts + line_xs + trans
-            cuts = sorted(set([c for c in cuts if c >= 10 and c <= w-10]))
-            merged = []
-            last = -min_width
-            for c in cuts:
-                if c - last >= (min_width if not precise else int(min_width*0.8)):
-                    merged.append(c)
-                    last = c
-            cuts = merged
-            segments = []
-            starts = [0] + cuts
-            ends = cuts + [w]
-            base = os.path.splitext(os.path.basename(path))[0]
-            for i, (x0, x1) in enumerate(zip(starts, ends)):
-                if (x1 - x0) < max(100, min_width // 2):
-                    continue
-                crop = im[0:h, x0:x1]
-                name = f"{base}_col_{i+1}.png"
-                p = os.path.join(out_dir, name)
-                try:
-                    cv2.imwrite(p, crop)
-                    segments.append(p)
-                except Exception:
-                    continue
-            return segments
-        except Exception:
-            pass
-    try:
-        img = Image.open(path).convert('RGB')
-        w, h = img.size
-        energy = _col_energy(img)
-        cuts = _find_vcuts(energy, min_width)
-        segments = []
-        starts = [0] + cuts
-        ends = cuts + [w]
-        base = os.path.splitext(os.path.basename(path))[0]
-        for i, (x0, x1) in enumerate(zip(starts, ends)):
-            if (x1 - x0) < max(100, min_width // 2):
-                continue
-            crop = img.crop((x0, 0, x1, h))
-            name = f"{base}_col_{i+1}.png"
-            p = os.path.join(out_dir, name)
+                max_bytes = 512 * 1024 * 1024
+        self.max_bytes = max_bytes
+        self._planes = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def features(self, path: str) -> 'ImageFeatures':
+        return ImageFeatures(path, cache=self)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def peek(self, key, plane):
+        with self._lock:
+            item = self._planes.get((key, plane))
+            if item is not None:
+                self._planes.move_to_end((key, plane))
+                return item[0]
+        return None
+
+    def get(self, key, plane, compute):
+        with self._lock:
+            item = self._planes.get((key, plane))
+            if item is not None:
+                self._planes.move_to_end((key, plane))
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+        value = compute()
+        size = _plane_nbytes(value)
+        with self._lock:
+            old = self._planes.pop((key, plane), None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._planes[(key, plane)] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._planes) > 1:
+                _, (_, dropped) = self._planes.popitem(last=False)
+                self._bytes -= dropped
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._planes.clear()
+            self._bytes = 0
+
+class ImageFeatures:
+    """
+    Vista perezosa de una imagen y sus planos derivados. Los planos se piden
+    por atributo (bgr, rgb, gray, blurred, hsv, sobel_x, sobel_y, canny) y se
+    guardan en el FeatureCache compartido. crop() devuelve otra vista sobre
+    una caja de la misma imagen decodificada.
+    """
+
+    def __init__(self, source, cache: Optional[FeatureCache] = None, key=None, parent=None, box=None):
+        self.source = source
+        self.cache = cache if cache is not None else FeatureCache()
+        self.key = key if key is not None else (source if isinstance(source, str) else id(source))
+        self.parent = parent
+        self.box = box
+
+    def get(self, plane):
+        return self.cache.get(self.key, plane, lambda: self._compute(plane))
+
+    def _compute(self, plane):
+        if self.parent is not None and plane in ('bgr', 'gray', 'hsv'):
+            x0, y0, x1, y1 = self.box
+            base = self.parent.cache.peek(self.parent.key, plane) if plane != 'bgr' else None
+            if base is None:
+                base = self.parent.bgr if plane == 'bgr' else None
+            if base is not None:
+                return base[y0:y1, x0:x1]
+        if plane == 'bgr':
+            if isinstance(self.source, Image.Image):
+                return cv2.cvtColor(np.asarray(self.source.convert('RGB')), cv2.COLOR_RGB2BGR)
+            if isinstance(self.source, str):
+                im = cv2.imread(self.source)
+                if im is None:
+                    raise RuntimeError('cv2 failed to read')
+                return im
+            return self.source
+        if plane == 'rgb':
+            if self.parent is not None and (cv2 is None or np is None):
+                x0, y0, x1, y1 = self.box
+                return self.parent.rgb.crop((x0, y0, x1, y1))
+            if isinstance(self.source, Image.Image):
+                return self.source.convert('RGB')
+            if cv2 is not None and np is not None:
+                return Image.fromarray(cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB))
+            return Image.open(self.source).convert('RGB')
+        if plane == 'gray':
+            return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        if plane == 'blurred':
+            return cv2.GaussianBlur(self.gray, (5, 5), 0)
+        if plane == 'hsv':
+            return cv2.cvtColor(self.bgr, cv2.COLOR_BGR2HSV)
+        if plane == 'sobel_x':
+            return cv2.Sobel(self.blurred, cv2.CV_64F, 1, 0, ksize=3)
+        if plane == 'sobel_y':
+            return cv2.Sobel(self.blurred, cv2.CV_64F, 0, 1, ksize=3)
+        if plane == 'canny':
+            return cv2.Canny(self.blurred, 50, 150)
+        raise KeyError(plane)
+
+    def __getattr__(self, name):
+        if name in ('bgr', 'rgb', 'gray', 'blurred', 'hsv', 'sobel_x', 'sobel_y', 'canny'):
+            return self.get(name)
+        raise AttributeError(name)
+
+    @property
+    def size(self):
+        """(ancho, alto) sin decodificar más de lo necesario."""
+        if self.box is not None:
+            x0, y0, x1, y1 = self.box
+            return (x1 - x0, y1 - y0)
+        for plane in ('bgr', 'rgb'):
+            value = self.cache.peek(self.key, plane)
+            if value is not None:
+                return value.size if isinstance(value, Image.Image) else (value.shape[1], value.shape[0])
+        if isinstance(self.source, Image.Image):
+            return self.source.size
+        if isinstance(self.source, str):
+            with Image.open(self.source) as im:
+                return im.size
+        return (self.source.shape[1], self.source.shape[0])
+
+    @property
+    def has_cv(self):
+        return cv2 is not None and np is not None
+
+    def image(self):
+        """Imagen decodificada preferida: array BGR con OpenCV, PIL RGB sin él."""
+        if self.has_cv:
             try:
-                crop.save(p)
-                segments.append(p)
+                return self.bgr
             except Exception:
-                continue
-        return segments
+                pass
+        return self.rgb
+
+    def crop(self, box):
+        box = tuple(int(v) for v in box)
+        return ImageFeatures(None, cache=self.cache, key=(self.key, box), parent=self, box=box)
+
+def _as_features(path, feature_cache=None):
+    if isinstance(path, ImageFeatures):
+        return path
+    if feature_cache is not None:
+        return feature_cache.features(path)
+    return ImageFeatures(path)
+
+def _merge_cuts(cuts, length, min_size, precise=False):
+    cuts = sorted(set([c for c in cuts if c >= 10 and c <= length-10]))
+    step = min_size if not precise else int(min_size*0.8)
+    merged = []
+    last = -min_size
+    for c in cuts:
+        if c - last >= step:
+            merged.append(c)
+            last = c
+    return merged
+
+def _label_transitions(labels):
+    trans = []
+    if not labels:
+        return trans
+    last_label = labels[0]
+    for i in range(1, len(labels)):
+        if labels[i] != last_label:
+            trans.append(i)
+            last_label = labels[i]
+    return trans
+
+def _spans(cuts, length, min_len):
+    """
+    Convierte cortes en tramos (índice, inicio, fin), descartando los más cortos
+    que min_len. El índice es la posición original del tramo (nombres *_seg_N).
+    """
+    starts = [0] + list(cuts)
+    ends = list(cuts) + [length]
+    return [(i, a, b) for i, (a, b) in enumerate(zip(starts, ends)) if (b - a) >= min_len]
+
+# Detector de transiciones de color: 'changepoint' (por defecto) o 'kmeans'
+TRANSITION_DETECTOR = os.environ.get('IMG2HTML_TRANSITIONS', 'changepoint').lower()
+
+def _hough_positions(edges, axis, span, precise=False, scale=1, offset=0):
+    lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=(90 if precise else 120), minLineLength=int(0.55*span), maxLineGap=max(2, 20 // scale))
+    line_pos = []
+    if lines is not None:
+        for l in lines.reshape(-1, 4):
+            x1,y1,x2,y2 = l
+            if axis == 0 and abs(y1 - y2) <= 3:
+                line_pos.append(offset + int((y1 + y2) // 2))
+            elif axis == 1 and abs(x1 - x2) <= 3:
+                line_pos.append(offset + int((x1 + x2) // 2))
+    return line_pos
+
+def _profile_candidates(energy, avg_hsv, line_pos, precise=False, scale=1):
+    """
+    Cortes candidatos a partir de los perfiles 1D ya acumulados: energía Sobel
+    por línea, color HSV medio por línea y posiciones de líneas Hough.
+    """
+    energy = energy / (energy.max() + 1e-9)
+    ksize = max(3, 15 // scale)
+    kernel = np.ones((ksize,), dtype=np.float64) / float(ksize)
+    smooth = np.convolve(energy, kernel, mode='same')
+    mu = smooth.mean(); sigma = smooth.std()
+    thr = mu + (1.2 if precise else 1.5) * sigma
+    cand_cuts = [i for i, e in enumerate(smooth) if e > thr]
+    if TRANSITION_DETECTOR == 'kmeans':
+        trans = _kmeans_transitions(avg_hsv, precise)
+    else:
+        trans = _change_points(avg_hsv, window=max(8, 32 // scale), precise=precise)
+    return cand_cuts + list(line_pos) + trans
+
+def _kmeans_transitions(avg_hsv, precise=False):
+    """Transiciones entre etiquetas de cv2.kmeans sobre el perfil HSV (detector anterior)."""
+    Z = np.asarray(avg_hsv).astype(np.float32)
+    K = 3 if precise else 2
+    criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 0.2)
+    try:
+        ret, labels, centers = cv2.kmeans(Z, K, None, criteria, 10, cv2.KMEANS_PP_CENTERS)
+        labels = labels.flatten().tolist()
     except Exception:
+        labels = [0]*len(Z)
+    return _label_transitions(labels)
+
+def _change_points(profile, window=32, precise=False, min_jump=None):
+    """
+    Puntos de cambio del perfil HSV medio en O(n) con sumas prefijas.
+
+    Para cada posición compara la media de la ventana anterior y la posterior
+    (window líneas) y, para exigir que el cambio persista, también la de las
+    ventanas exteriores [i-2w, i-w) y [i+w, i+2w): así una línea de texto o un
+    borde fino no cuenta como transición y un degradado suave tampoco. Se
+    aceptan los máximos locales cuya puntuación supera un umbral absoluto o
+    proporcional al ruido estimado, con supresión de no-máximos en ±window.
+    """
+    X = np.asarray(profile, dtype=np.float64)
+    if X.ndim == 1:
+        X = X[:, None]
+    n = X.shape[0]
+    w = int(window)
+    if n < 2 * w + 1:
         return []
+    S = np.zeros((n + 1, X.shape[1]), dtype=np.float64)
+    np.cumsum(X, axis=0, out=S[1:])
+
+    def window_mean(starts):
+        starts = np.clip(starts, 0, n - w)
+        return (S[starts + w] - S[starts]) / float(w)
+
+    idx = np.arange(n)
+    inner = np.linalg.norm(window_mean(idx - w) - window_mean(idx), axis=1)
+    outer = np.linalg.norm(window_mean(idx - 2 * w) - window_mean(idx + w), axis=1)
+    score = np.minimum(inner, outer)
+    score[:w] = 0.0
+    score[n - w:] = 0.0
+    diffs = np.abs(np.diff(X, axis=0))
+    noise = float(np.linalg.norm(1.4826 * np.median(diffs, axis=0)))
+    if min_jump is None:
+        min_jump = 6.0 if precise else 9.0
+    thr = max(min_jump, 4.0 * noise)
+    peaks = np.flatnonzero((score[1:-1] > thr) & (score[1:-1] >= score[:-2]) & (score[1:-1] > score[2:])) + 1
+    changes = []
+    for i in peaks[np.argsort(-score[peaks], kind='stable')]:
+        if all(abs(int(i) - c) > w for c in changes):
+            changes.append(int(i))
+    return sorted(changes)
+
+def _cv_candidates(feat, axis, precise=False, scale=1):
+    """
+    Cortes candidatos (sin fusionar) con OpenCV sobre los planos memorizados
+    de ImageFeatures. axis=0 busca cortes horizontales (filas); axis=1 cortes
+    verticales (columnas). Combina picos de energía Sobel, líneas Hough y
+    transiciones de color HSV. scale > 1 indica un nivel reducido de la
+    pirámide: las ventanas se encogen en proporción.
+    """
+    w, h = feat.size
+    span = w if axis == 0 else h
+    sobel = feat.sobel_y if axis == 0 else feat.sobel_x
+    energy = np.abs(sobel).sum(axis=1 - axis)
+    line_pos = _hough_positions(feat.canny, axis, span, precise, scale)
+    avg = feat.hsv.mean(axis=1 - axis)
+    return _profile_candidates(energy, avg, line_pos, precise, scale)
+
+def _cv_cuts(feat, axis, min_size, precise=False):
+    w, h = feat.size
+    length = h if axis == 0 else w
+    return _merge_cuts(_cv_candidates(feat, axis, precise), length, min_size, precise)
+
+PYRAMID_TARGET = 1024
+PYRAMID_MAX_SCALE = 16
+
+def _pyramid_scale(length):
+    scale = 1
+    while length // (scale * 2) >= PYRAMID_TARGET and scale < PYRAMID_MAX_SCALE:
+        scale *= 2
+    return scale
 
-def segment_image(path, out_dir, min_height=180, precise=False):
-    if cv2 is not None and np is not None:
+def _refine_cut(bgr, axis, c, radius):
+    """
+    Ajusta un corte aproximado a la línea de máxima energía Sobel dentro de
+    una banda estrecha de ±radius píxeles a resolución completa.
+    """
+    length = bgr.shape[axis]
+    a = max(0, c - radius); b = min(length, c + radius + 1)
+    if b - a < 3:
+        return c
+    pa = max(0, a - 3); pb = min(length, b + 3)
+    strip = bgr[pa:pb] if axis == 0 else np.ascontiguousarray(bgr[:, pa:pb])
+    gray = cv2.GaussianBlur(cv2.cvtColor(strip, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+    if axis == 0:
+        sobel = cv2.Sobel(gray, cv2.CV_32F, 0, 1, ksize=3)
+    else:
+        sobel = cv2.Sobel(gray, cv2.CV_32F, 1, 0, ksize=3)
+    energy = np.abs(sobel).sum(axis=1 - axis)[a - pa:b - pa]
+    if energy.size == 0 or float(energy.max()) <= 0.0:
+        return c
+    return a + int(np.argmax(energy))
+
+def _pyramid_cuts(feat, axis, min_size, precise=False):
+    """
+    Detección coarse-to-fine: busca candidatos sobre un nivel reducido de la
+    pirámide (Sobel, Canny, Hough y k-means sobre muchos menos píxeles),
+    fusiona y sólo refina cada corte en una banda estrecha a resolución
+    completa. Si la imagen no es lo bastante grande usa el camino normal.
+    """
+    w, h = feat.size
+    length = h if axis == 0 else w
+    scale = _pyramid_scale(length)
+    if scale == 1:
+        return _cv_cuts(feat, axis, min_size, precise)
+    bgr = feat.bgr
+    key = (feat.key, 'pyramid', scale)
+    small = feat.cache.get(key, 'bgr', lambda: cv2.resize(bgr, (max(1, w // scale), max(1, h // scale)), interpolation=cv2.INTER_AREA))
+    coarse = ImageFeatures(small, cache=feat.cache, key=key)
+    approx = [c * scale + scale // 2 for c in _cv_candidates(coarse, axis, precise, scale=scale)]
+    approx = _merge_cuts(approx, length, min_size, precise)
+    refined = [_refine_cut(bgr, axis, c, 2 * scale) for c in approx]
+    return _merge_cuts(refined, length, min_size, precise)
+
+def _pil_cuts(img, axis, min_size):
+    if axis == 0:
+        return _find_cuts(_row_energy(img), min_size)
+    return _find_vcuts(_col_energy(img), min_size)
+
+def _segment_spans(feat, axis, min_size, precise=False, pyramid=False):
+    """
+    Tramos (índice, inicio, fin) a lo largo de axis. Usa OpenCV si está
+    disponible (coarse-to-fine con pyramid=True) y, si falla, la energía
+    vectorizada sobre la imagen PIL.
+    """
+    w, h = feat.size
+    length = h if axis == 0 else w
+    min_len = max(120, min_size // 2) if axis == 0 else max(100, min_size // 2)
+    if feat.has_cv:
         try:
-            im = cv2.imread(path)
-            if im is None:
-                raise RuntimeError('cv2 failed to read')
-            h, w = im.shape[:2]
-            gray = cv2.cvtColor(im, cv2.COLOR_BGR2GRAY)
-            gray = cv2.GaussianBlur(gray, (5, 5), 0)
-            sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-            abs_y = np.abs(sobely)
-            row_energy = abs_y.sum(axis=1)
-            row_energy = row_energy / (row_energy.max() + 1e-9)
-            kernel = np.ones((15,), dtype=np.float64) / 15.0
-            smooth = np.convolve(row_energy, kernel, mode='same')
-            mu = smooth.mean(); sigma = smooth.std()
-            thr = mu + (1.2 if precise else 1.5) * sigma
-            cand_cuts = [i for i, e in enumerate(smooth) if e > thr]
-            edges = cv2.Canny(gray, 50, 150)
-            lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=(90 if precise else 120), minLineLength=int(0.55*w), maxLineGap=20)
-            line_ys = []
-            if lines is not None:
-                for l in lines[:,0]:
-                    x1,y1,x2,y2 = l
-                    if abs(y1 - y2) <= 3:
-                        line_ys.append(int((y1 + y2) // 2))
-            hsv = cv2.cvtColor(im, cv2.COLOR_BGR2HSV)
-            avg_rows = hsv.mean(axis=1)
-            Z = avg_rows.astype(np.float32)
-            K = 3 if precise else 2
-            criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 0.2)
-            try:
-                ret, labels, centers = cv2.kmeans(Z, K, None, criteria, 10, cv2.KMEANS_PP_CENTERS)
-                labels = labels.flatten().tolist()
-            except Exception:
-                labels = [0]*h
-            trans = []
-            last_label = labels[0]
-            for i in range(1, h):
-                if labels[i] != last_label:
-                    trans.append(i)
-                    last_label = labels[i]
-            cuts = cand_cuts + line_ys + trans
-            cuts = sorted(set([c for c in cuts if c >= 10 and c <= h-10]))
-            merged = []
-            last = -min_height
-            for c in cuts:
-                if c - last >= (min_height if not precise else int(min_height*0.8)):
-                    merged.append(c)
-                    last = c
-            cuts = merged
-            segments = []
-            starts = [0] + cuts
-            ends = cuts + [h]
-            base = os.path.splitext(os.path.basename(path))[0]
-            for i, (y0, y1) in enumerate(zip(starts, ends)):
-                if (y1 - y0) < max(120, min_height // 2):
-                    continue
-                crop = im[y0:y1, 0:w]
-                name = f"{base}_seg_{i+1}.png"
-                p = os.path.join(out_dir, name)
-                try:
-                    cv2.imwrite(p, crop)
-                    segments.append(p)
-                except Exception:
-                    continue
-            return segments
+            cuts_fn = _pyramid_cuts if pyramid else _cv_cuts
+            return _spans(cuts_fn(feat, axis, min_size, precise), length, min_len)
+        except Exception:
+            pass
+    return _spans(_pil_cuts(feat.rgb, axis, min_size), length, min_len)
+
+PNG_COMPRESSION = int(os.environ.get('IMG2HTML_PNG_COMPRESSION', 1))
+
+def _save_crop(feat, box, p):
+    x0, y0, x1, y1 = box
+    if feat.has_cv:
+        try:
+            if cv2.imwrite(p, feat.bgr[y0:y1, x0:x1], [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION]):
+                return p
         except Exception:
             pass
+    feat.rgb.crop((x0, y0, x1, y1)).save(p, compress_level=PNG_COMPRESSION)
+    return p
+
+_source_digests = {}
+_source_digests_lock = threading.Lock()
+
+def source_digest(path):
+    """SHA-256 del archivo fuente, memorizado por (ruta, tamaño, mtime)."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    with _source_digests_lock:
+        digest = _source_digests.get(key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with _source_digests_lock:
+            _source_digests[key] = digest
+    return digest
+
+def virtual_segment(source, box):
+    """
+    Segmento virtual: imagen fuente, caja [x0, y0, x1, y1] y hash de contenido
+    (hash de la fuente + caja). Sustituye al PNG del recorte hasta que un
+    archivo sea realmente necesario.
+    """
+    box = [int(v) for v in box]
+    digest = source_digest(source)
+    return {
+        'source': source,
+        'box': box,
+        'hash': hashlib.sha256((digest + ':' + ','.join(map(str, box))).encode('ascii')).hexdigest()[:20]
+    }
+
+def attach_virtual_segments(layout, source):
+    """Añade 'segment' (segmento virtual) a cada fila y columna de un layout."""
+    for row in layout.get('rows') or []:
+        row['segment'] = virtual_segment(source, row['box'])
+        for col in row.get('columns') or []:
+            col['segment'] = virtual_segment(source, col['box'])
+    return layout
+
+def load_segment(segment, feature_cache=None):
+    """
+    Recorte de un segmento virtual bajo demanda, desde la fuente decodificada
+    en feature_cache: array BGR (vista, sin copia) con OpenCV o PIL.Image.
+    """
+    x0, y0, x1, y1 = segment['box']
+    feat = _as_features(segment['source'], feature_cache)
+    if feat.has_cv:
+        return feat.bgr[y0:y1, x0:x1]
+    return feat.rgb.crop((x0, y0, x1, y1))
+
+def materialize_segment(segment, out_dir, name=None, feature_cache=None):
+    """
+    Escribe el PNG de un segmento virtual (compresión rápida PNG_COMPRESSION)
+    solo si no existe ya y devuelve su ruta. Sin name, el archivo se nombra
+    por hash, de modo que recortes idénticos se escriben una sola vez.
+    """
+    p = os.path.join(out_dir, name or f"{segment['hash']}.png")
+    if not os.path.isfile(p):
+        _save_crop(_as_features(segment['source'], feature_cache), segment['box'], p)
+    return p
+
+def segment_layout(path, out_dir=None, min_height=180, min_width=160, precise=False, write=False, feature_cache=None, pyramid=False, depth=1):
+    """
+    Segmenta filas y columnas sobre una única imagen decodificada, sin pasar
+    los recortes por disco. Devuelve:
+
+        {'width', 'height', 'rows': [{'index', 'box', 'name', 'columns': [
+            {'index', 'box', 'width', 'name'}]}]}
+
+    Las cajas son [x0, y0, x1, y1] en coordenadas de la imagen original.
+    Con write=True y out_dir, cada recorte se escribe una sola vez al final
+    (clave 'path' en filas y columnas), con los mismos nombres que
+    segment_image/segment_columns; write='columns' escribe solo las columnas. pyramid=True activa la detección
+    coarse-to-fine para capturas muy altas. Con depth > 1 las filas se
+    detectan igual y, dentro de cada fila, XYCutEngine calcula columnas y
+    'rows' anidadas (depth 3: filas → columnas → filas), sin recortar ni
+    volver a decodificar.
+    """
+    feat = _as_features(path, feature_cache)
+    engine = None
     try:
-        img = Image.open(path).convert('RGB')
-        w, h = img.size
-        energy = _row_energy(img)
-        cuts = _find_cuts(energy, min_height)
-        segments = []
-        starts = [0] + cuts
-        ends = cuts + [h]
-        for i, (y0, y1) in enumerate(zip(starts, ends)):
-            if (y1 - y0) < max(120, min_height // 2):
-                continue
-            crop = img.crop((0, y0, w, y1))
-            base = os.path.splitext(os.path.basename(path))[0]
-            name = f"{base}_seg_{i+1}.png"
-            p = os.path.join(out_dir, name)
+        w, h = feat.size
+        if depth > 1 and feat.has_cv:
+            engine = XYCutEngine(feat, min_height, min_width, precise)
+        row_spans = _segment_spans(feat, 0, min_height, precise, pyramid)
+    except Exception:
+        return {'width': 0, 'height': 0, 'rows': []}
+    base = os.path.splitext(os.path.basename(path if isinstance(path, str) else str(feat.key)))[0]
+    rows = []
+    for i, y0, y1 in row_spans:
+        row_name = f"{base}_seg_{i+1}"
+        columns = []
+        try:
+            if engine is not None:
+                engine.region((0, y0, w, y1))
+                col_spans = engine.spans((0, y0, w, y1), 1)
+            else:
+                col_spans = _segment_spans(feat.crop((0, y0, w, y1)), 1, min_width, precise, pyramid)
+        except Exception:
+            col_spans = []
+        for j, x0, x1 in col_spans:
+            col = {
+                'index': j,
+                'box': [x0, y0, x1, y1],
+                'width': x1 - x0,
+                'name': f"{row_name}_col_{j+1}.png"
+            }
+            if engine is not None:
+                col['rows'] = engine.nested_rows((x0, y0, x1, y1), depth - 2)
+            columns.append(col)
+        rows.append({'index': i, 'box': [0, y0, w, y1], 'name': f"{row_name}.png", 'columns': columns})
+    layout = {'width': w, 'height': h, 'rows': rows}
+    if write and out_dir:
+        write_layout_crops(layout, feat, out_dir, rows=(write != 'columns'))
+    return layout
+
+def write_layout_crops(layout, feat, out_dir, rows=True):
+    """
+    Escribe los recortes de un layout de segment_layout y rellena 'path'.
+    rows=False escribe solo las columnas (los archivos que enlaza el HTML);
+    las filas quedan como segmentos virtuales.
+    """
+    for row in layout.get('rows') or []:
+        if rows:
             try:
-                crop.save(p)
-                segments.append(p)
+                row['path'] = _save_crop(feat, row['box'], os.path.join(out_dir, row['name']))
             except Exception:
-                continue
-        return segments
+                row['path'] = None
+        for col in row.get('columns') or []:
+            try:
+                col['path'] = _save_crop(feat, col['box'], os.path.join(out_dir, col['name']))
+            except Exception:
+                col['path'] = None
+    return layout
+
+def segment_columns(path, out_dir, min_width=160, precise=False, feature_cache=None, pyramid=False):
+    feat = _as_features(path, feature_cache)
+    try:
+        w, h = feat.size
+        spans = _segment_spans(feat, 1, min_width, precise, pyramid)
+    except Exception:
+        return []
+    base = os.path.splitext(os.path.basename(path))[0]
+    segments = []
+    for i, x0, x1 in spans:
+        p = os.path.join(out_dir, f"{base}_col_{i+1}.png")
+        try:
+            segments.append(_save_crop(feat, (x0, 0, x1, h), p))
+        except Exception:
+            continue
+    return segments
+
+def segment_image(path, out_dir, min_height=180, precise=False, feature_cache=None, pyramid=False):
+    feat = _as_features(path, feature_cache)
+    try:
+        w, h = feat.size
+        spans = _segment_spans(feat, 0, min_height, precise, pyramid)
     except Exception:
         return []
+    base = os.path.splitext(os.path.basename(path))[0]
+    segments = []
+    for i, y0, y1 in spans:
+        p = os.path.join(out_dir, f"{base}_seg_{i+1}.png")
+        try:
+            segments.append(_save_crop(feat, (0, y0, w, y1), p))
+        except Exception:
+            continue
+    return segments
+
+XY_FLAT_ENERGY = 0.5
+# |Sobel| 3x3 sobre uint8 no supera 4 * 255
+_SOBEL_MAX = 1020
+
+def _integral32(a):
+    """Tabla de áreas sumadas int32 (con fila y columna de ceros) de un array 2D."""
+    sat = np.zeros((a.shape[0] + 1, a.shape[1] + 1), dtype=np.int32)
+    np.cumsum(a, axis=0, dtype=np.int32, out=sat[1:, 1:])
+    np.cumsum(sat[1:, 1:], axis=1, out=sat[1:, 1:])
+    return sat
 
-def analyze_image_with_qwen2vl(image_path: str, use_cache: bool = True) -> Optional[Dict]:
+class XYCutEngine:
     """
-    Usa Qwen2-VL para análisis visual profundo de una imagen.
-    Detecta componentes UI, tipografías, layouts, colores y espaciados.
-    Usa cache para evitar analizar la misma imagen múltiples veces.
+    Motor XY-cut recursivo sobre tablas de áreas sumadas (integral images).
+
+    |Sobel x| y |Sobel y| se calculan una sola vez por imagen (uint16). Las
+    integrales se construyen por región (region(box), p. ej. una fila de la
+    página) en int32, solo si la suma máxima cabe en 32 bits: dentro de la
+    región la energía de cualquier subrectángulo sale en O(1) y los perfiles
+    en O(alto) u O(ancho); fuera de ella (o en regiones demasiado grandes) se
+    suman directamente los planos. Las líneas Hough se detectan una vez sobre
+    la imagen completa y se filtran por región.
+    """
+
+    def __init__(self, feat, min_height=180, min_width=160, precise=False):
+        self.feat = feat
+        self.min_height = min_height
+        self.min_width = min_width
+        self.precise = precise
+        self.width, self.height = feat.size
+        blurred = feat.blurred
+        self.gx = np.abs(cv2.Sobel(blurred, cv2.CV_16S, 1, 0, ksize=3)).astype(np.uint16)
+        self.gy = np.abs(cv2.Sobel(blurred, cv2.CV_16S, 0, 1, ksize=3)).astype(np.uint16)
+        self.hsv = feat.hsv
+        self._region = None
+        lines = cv2.HoughLinesP(feat.canny, 1, np.pi/180, threshold=(90 if precise else 120), minLineLength=int(0.55*min(self.width, self.height, 2*max(120, min(min_height, min_width)//2))), maxLineGap=20)
+        self.lines = lines.reshape(-1, 4) if lines is not None else np.zeros((0, 4), dtype=np.int32)
+
+    def region(self, box):
+        """
+        Región de trabajo: construye sus tablas integrales int32 (y libera las
+        anteriores). Devuelve False si la región es demasiado grande para
+        sumar en 32 bits; entonces se usan sumas directas.
+        """
+        x0, y0, x1, y1 = [int(v) for v in box]
+        self._region = None
+        if (x1 - x0) * (y1 - y0) * _SOBEL_MAX >= 2 ** 31:
+            return False
+        hsv = self.hsv[y0:y1, x0:x1]
+        self._region = {
+            'box': (x0, y0, x1, y1),
+            'sat_x': _integral32(self.gx[y0:y1, x0:x1]),
+            'sat_y': _integral32(self.gy[y0:y1, x0:x1]),
+            'sat_hsv': cv2.integral(np.ascontiguousarray(hsv), sdepth=cv2.CV_32S),
+        }
+        return True
+
+    def _tables(self, box):
+        """(tablas, x0, y0) de la región si contiene box; None si no."""
+        r = self._region
+        if r is None:
+            return None
+        rx0, ry0, rx1, ry1 = r['box']
+        x0, y0, x1, y1 = box
+        if x0 < rx0 or y0 < ry0 or x1 > rx1 or y1 > ry1:
+            return None
+        return r, rx0, ry0
+
+    @staticmethod
+    def _rect(sat, x0, y0, x1, y1):
+        return int(sat[y1, x1]) - int(sat[y0, x1]) - int(sat[y1, x0]) + int(sat[y0, x0])
+
+    def energy(self, box):
+        """Energía de gradiente (|gx| + |gy|) de un subrectángulo (O(1) dentro de la región)."""
+        x0, y0, x1, y1 = box
+        found = self._tables(box)
+        if found is None:
+            return float(self.gx[y0:y1, x0:x1].sum(dtype=np.int64) + self.gy[y0:y1, x0:x1].sum(dtype=np.int64))
+        r, ox, oy = found
+        a, b, c, d = x0 - ox, y0 - oy, x1 - ox, y1 - oy
+        return float(self._rect(r['sat_x'], a, b, c, d) + self._rect(r['sat_y'], a, b, c, d))
+
+    def _profiles(self, box, axis):
+        """Perfil de energía Sobel y HSV medio por línea dentro de box."""
+        x0, y0, x1, y1 = box
+        found = self._tables(box)
+        if found is None:
+            grad = self.gy if axis == 0 else self.gx
+            energy = grad[y0:y1, x0:x1].sum(axis=1 - axis, dtype=np.float64)
+            hsv = self.hsv[y0:y1, x0:x1].mean(axis=1 - axis)
+            return energy, hsv
+        r, ox, oy = found
+        a, b, c, d = x0 - ox, y0 - oy, x1 - ox, y1 - oy
+        sat_hsv = r['sat_hsv']
+        if axis == 0:
+            sat, ys = r['sat_y'], np.arange(b, d + 1)
+            energy = np.diff(sat[ys, c] - sat[ys, a])
+            hsv = np.diff(sat_hsv[ys, c] - sat_hsv[ys, a], axis=0) / float(max(1, x1 - x0))
+        else:
+            sat, xs = r['sat_x'], np.arange(a, c + 1)
+            energy = np.diff(sat[d, xs] - sat[b, xs])
+            hsv = np.diff(sat_hsv[d, xs] - sat_hsv[b, xs], axis=0) / float(max(1, y1 - y0))
+        return energy.astype(np.float64), hsv
+
+    def _region_lines(self, box, axis):
+        """Líneas globales recortadas a box que cubren ≥ 55% del lado de la región."""
+        x0, y0, x1, y1 = box
+        span = (x1 - x0) if axis == 0 else (y1 - y0)
+        out = []
+        for lx0, ly0, lx1, ly1 in self.lines:
+            if axis == 0 and abs(ly0 - ly1) <= 3 and y0 <= ly0 < y1:
+                covered = min(max(lx0, lx1), x1) - max(min(lx0, lx1), x0)
+                if covered >= 0.55 * span:
+                    out.append(int((ly0 + ly1) // 2) - y0)
+            elif axis == 1 and abs(lx0 - lx1) <= 3 and x0 <= lx0 < x1:
+                covered = min(max(ly0, ly1), y1) - max(min(ly0, ly1), y0)
+                if covered >= 0.55 * span:
+                    out.append(int((lx0 + lx1) // 2) - x0)
+        return out
+
+    def spans(self, box, axis):
+        """Tramos (índice, inicio, fin) en coordenadas absolutas a lo largo de axis."""
+        x0, y0, x1, y1 = box
+        start = y0 if axis == 0 else x0
+        length = (y1 - y0) if axis == 0 else (x1 - x0)
+        min_size = self.min_height if axis == 0 else self.min_width
+        min_len = max(120, min_size // 2) if axis == 0 else max(100, min_size // 2)
+        if length < 2 * min_len:
+            return [(0, start, start + length)]
+        energy, hsv = self._profiles(box, axis)
+        cands = _profile_candidates(energy, hsv, self._region_lines(box, axis), self.precise)
+        cuts = _merge_cuts(cands, length, min_size, self.precise)
+        return [(i, start + a, start + b) for i, a, b in _spans(cuts, length, min_len)]
+
+    def tree(self, box=None, axis=0, depth=3):
+        """
+        Árbol de layout {'box', 'split', 'children'} alternando filas y
+        columnas hasta depth niveles. Las regiones planas (sin energía) o que
+        no se dividen en al menos dos tramos son hojas. Las tablas integrales
+        se construyen en el nodo más alto que cabe en 32 bits y las reutiliza
+        todo su subárbol.
+        """
+        if box is None:
+            box = (0, 0, self.width, self.height)
+        node = {'box': [int(v) for v in box], 'split': None, 'children': []}
+        if depth <= 0:
+            return node
+        if self._tables(box) is None:
+            self.region(box)
+        x0, y0, x1, y1 = box
+        area = max(1, (x1 - x0) * (y1 - y0))
+        if self.energy(box) / area < XY_FLAT_ENERGY:
+            return node
+        spans = self.spans(box, axis)
+        if len(spans) < 2:
+            return node
+        node['split'] = 'rows' if axis == 0 else 'columns'
+        for _, a, b in spans:
+            child = (x0, a, x1, b) if axis == 0 else (a, y0, b, y1)
+            node['children'].append(self.tree(child, 1 - axis, depth - 1))
+        return node
+
+    def nested_rows(self, box, depth):
+        """Filas anidadas (formato de segment_layout, sin nombres de archivo) dentro de box."""
+        if depth <= 0:
+            return []
+        x0, y0, x1, y1 = box
+        area = max(1, (x1 - x0) * (y1 - y0))
+        if self.energy(box) / area < XY_FLAT_ENERGY:
+            return []
+        row_spans = self.spans(box, 0)
+        if len(row_spans) < 2:
+            return []
+        rows = []
+        for i, a, b in row_spans:
+            columns = []
+            col_spans = self.spans((x0, a, x1, b), 1) if depth > 1 else []
+            for j, c0, c1 in col_spans:
+                col = {'index': j, 'box': [c0, a, c1, b], 'width': c1 - c0}
+                if depth > 2:
+                    col['rows'] = self.nested_rows((c0, a, c1, b), depth - 2)
+                columns.append(col)
+            rows.append({'index': i, 'box': [x0, a, x1, b], 'columns': columns})
+        return rows
+
+def xy_cut_tree(path, min_height=180, min_width=160, precise=False, depth=3, feature_cache=None):
+    """Árbol XY-cut completo (filas → columnas → filas anidadas...) de una imagen."""
+    feat = _as_features(path, feature_cache)
+    return XYCutEngine(feat, min_height, min_width, precise).tree(depth=depth)
+
+def column_ratios(widths):
+    """Proporciones (ratios, ratios_percent) de un conjunto de anchos de columna."""
+    total_w = sum(widths)
+    if total_w <= 0:
+        return [], []
+    ratios = [round(w2/float(total_w), 3) for w2 in widths]
+    return ratios, [int(round(r*100)) for r in ratios]
+
+def nested_layout_rows(rows):
+    """
+    Convierte filas anidadas de XYCutEngine al formato de layout_rows
+    (sin archivos: cajas y proporciones), recursivamente.
+    """
+    out = []
+    for r in rows or []:
+        cols = r.get('columns') or []
+        ratios, ratios_percent = column_ratios([c['width'] for c in cols])
+        entry = {
+            'box': r['box'],
+            'column_boxes': [c['box'] for c in cols],
+            'ratios': ratios,
+            'ratios_percent': ratios_percent
+        }
+        nested = [nested_layout_rows(c.get('rows')) for c in cols]
+        if any(nested):
+            entry['column_layouts'] = nested
+        out.append(entry)
+    return out
+
+STREAM_STRIP_HEIGHT = 1024
+_STRIP_CONTEXT = 8
+_RAW_CHANNELS = {'L': 1, 'RGB': 3, 'BGR': 3, 'RGBX': 4, 'RGBA': 4, 'BGRX': 4, 'BGRA': 4}
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# Canales por tipo de color PNG (gris, RGB, paleta, gris+alfa, RGBA)
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+_PNG_READ_SIZE = 64 * 1024
+
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+class _PngRows:
     """
-    # Verificar cache
-    if use_cache:
+    Decodificación secuencial de un PNG de 8 bits no entrelazado.
+
+    El flujo zlib de los IDAT se descomprime por tramos y cada franja de filas
+    filtradas se envuelve en un PNG mínimo precedido de la fila anterior ya
+    desfiltrada (filtro 0): PIL deshace los filtros Up/Average/Paeth sin ver
+    nunca la imagen completa. Al empezar cada lectura se guarda un punto de
+    control (estado zlib + fila previa) para poder volver a franjas anteriores.
+    """
+
+    MAX_CHECKPOINTS = 64
+
+    def __init__(self, path):
+        self._fh = open(path, 'rb')
+        try:
+            self._scan()
+        except Exception:
+            self.close()
+            raise
+        self._checkpoints = OrderedDict()
+        self._rewind()
+
+    def _scan(self):
+        fh = self._fh
+        if fh.read(8) != _PNG_SIGNATURE:
+            raise ValueError('no es un PNG')
+        ihdr = None
+        self._idat = []
+        self._extra = []
+        while True:
+            hdr = fh.read(8)
+            if len(hdr) < 8:
+                break
+            length, kind = struct.unpack('>I4s', hdr)
+            if kind == b'IHDR':
+                ihdr = fh.read(length)
+                fh.seek(4, 1)
+            elif kind in (b'PLTE', b'tRNS'):
+                self._extra.append(hdr + fh.read(length + 4))
+            else:
+                if kind == b'IDAT':
+                    self._idat.append((fh.tell(), length))
+                fh.seek(length + 4, 1)
+            if kind == b'IEND':
+                break
+        if not ihdr or not self._idat:
+            raise ValueError('PNG sin IHDR/IDAT')
+        w, h, depth, color, _, _, interlace = struct.unpack('>IIBBBBB', ihdr)
+        if depth != 8 or interlace or color not in _PNG_CHANNELS:
+            raise ValueError('PNG no decodificable por franjas')
+        self.size = (w, h)
+        self._ihdr_tail = ihdr[8:]
+        self._stride = w * _PNG_CHANNELS[color]
+
+    def _rewind(self):
+        self._y = 0
+        self._z = zlib.decompressobj()
+        self._src = (0, 0)
+        self._tail = b''
+        self._prev = bytes(self._stride)
+
+    def _checkpoint(self):
+        if self._y in self._checkpoints:
+            return
+        if len(self._checkpoints) >= self.MAX_CHECKPOINTS:
+            self._checkpoints.popitem(last=False)
+        self._checkpoints[self._y] = (self._z.copy(), self._src, self._tail, self._prev)
+
+    def _restore(self, y0):
+        marks = [y for y in self._checkpoints if y <= y0]
+        if not marks:
+            self._rewind()
+            return
+        self._y = max(marks)
+        z, self._src, self._tail, self._prev = self._checkpoints[self._y]
+        self._z = z.copy()
+
+    def _filtered(self, n):
+        """Siguientes n filas filtradas (byte de filtro + datos)."""
+        need = n * (self._stride + 1)
+        parts = []
+        have = 0
+        while have < need:
+            if not self._tail:
+                i, off = self._src
+                if i >= len(self._idat) or self._z.eof:
+                    break
+                start, length = self._idat[i]
+                self._fh.seek(start + off)
+                self._tail = self._fh.read(min(_PNG_READ_SIZE, length - off))
+                off += len(self._tail)
+                self._src = (i + 1, 0) if off >= length else (i, off)
+            data = self._z.decompress(self._tail, need - have)
+            self._tail = self._z.unconsumed_tail
+            parts.append(data)
+            have += len(data)
+        if have < need:
+            raise ValueError('PNG truncado')
+        return b''.join(parts)
+
+    def _decode(self, n):
+        w, _ = self.size
+        raw = b'\x00' + self._prev + self._filtered(n)
+        png = b''.join([
+            _PNG_SIGNATURE,
+            _png_chunk(b'IHDR', struct.pack('>II', w, n + 1) + self._ihdr_tail),
+            *self._extra,
+            _png_chunk(b'IDAT', zlib.compress(raw, 0)),
+            _png_chunk(b'IEND', b''),
+        ])
+        im = Image.open(io.BytesIO(png))
+        im.load()
+        prev = im.crop((0, n, w, n + 1)).tobytes()
+        if len(prev) != self._stride:
+            raise ValueError('modo PNG no soportado')
+        self._prev = prev
+        self._y += n
+        return im.crop((0, 1, w, n + 1))
+
+    def read(self, y0, y1):
+        """Filas [y0, y1) como array BGR uint8 contiguo."""
+        if y0 < self._y:
+            self._restore(y0)
+        while self._y < y0:
+            self._checkpoint()
+            self._decode(min(y0 - self._y, STREAM_STRIP_HEIGHT))
+        self._checkpoint()
+        im = self._decode(y1 - y0)
+        if im.mode == 'P':
+            im = im.convert('RGB')
+        pix = np.asarray(im)
+        if pix.ndim == 2 or pix.shape[2] == 2:
+            gray = pix if pix.ndim == 2 else pix[:, :, 0]
+            return cv2.cvtColor(np.ascontiguousarray(gray), cv2.COLOR_GRAY2BGR)
+        return np.ascontiguousarray(pix[:, :, 2::-1])
+
+    def close(self):
         try:
-            # Crear hash del archivo para usar como clave de cache
-            with open(image_path, 'rb') as f:
-                file_hash = hashlib.md5(f.read()).hexdigest()
-            cache_key = f"{image_path}:{file_hash}"
-            if cache_key in _vision_analysis_cache:
-                return _vision_analysis_cache[cache_key]
+            self._fh.close()
         except Exception:
             pass
-    
+        self._checkpoints = OrderedDict()
+
+class StripReader:
+    """
+    Lector de franjas horizontales BGR uint8 de una imagen.
+
+    Para formatos sin compresión (BMP, PPM/PGM) el archivo se mapea con
+    np.memmap y cada franja se lee directamente del disco. Los PNG de 8 bits
+    no entrelazados se decodifican por franjas con _PngRows. En ambos casos
+    nunca se carga la imagen completa. JPEG/WebP (y PNG de 16 bits o
+    entrelazados) no admiten decodificación parcial: se decodifican una vez
+    a uint8 y se entregan vistas, de modo que al menos los planos derivados
+    (gris, HSV, Sobel) quedan limitados a una franja.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mm = None
+        self._png = None
+        self._full = None
+        with Image.open(path) as im:
+            self.size = im.size
+            tile = list(im.tile or [])
+        w, h = self.size
+        if len(tile) == 1 and tile[0][0] == 'raw':
+            args = tile[0][3]
+            rawmode, stride, orientation = (args, 0, 1) if isinstance(args, str) else (tuple(args) + (0, 1))[:3]
+            ch = _RAW_CHANNELS.get(rawmode)
+            extents = tile[0][1]
+            if ch and tuple(extents) == (0, 0, w, h):
+                stride = stride or w * ch
+                self._mm = np.memmap(path, dtype=np.uint8, mode='r', offset=tile[0][2], shape=(h, stride))
+                self._rawmode = rawmode
+                self._channels = ch
+                self._orientation = orientation or 1
+        if self._mm is None:
+            try:
+                self._png = _PngRows(path)
+            except Exception:
+                self._png = None
+        if self._mm is None and self._png is None:
+            self._full = cv2.imread(path)
+            if self._full is None:
+                self._full = cv2.cvtColor(np.asarray(Image.open(path).convert('RGB')), cv2.COLOR_RGB2BGR)
+
+    @property
+    def streaming(self):
+        return self._mm is not None or self._png is not None
+
+    def read(self, y0, y1):
+        """Filas [y0, y1) como array BGR uint8 contiguo."""
+        w, h = self.size
+        y0 = max(0, y0); y1 = min(h, y1)
+        if self._full is not None:
+            return self._full[y0:y1]
+        if self._png is not None:
+            return self._png.read(y0, y1)
+        if self._orientation < 0:
+            rows = self._mm[h - y1:h - y0][::-1]
+        else:
+            rows = self._mm[y0:y1]
+        pix = np.asarray(rows[:, :w * self._channels]).reshape(y1 - y0, w, self._channels)
+        mode = self._rawmode
+        if mode == 'L':
+            return cv2.cvtColor(np.ascontiguousarray(pix[:, :, 0]), cv2.COLOR_GRAY2BGR)
+        if mode.startswith('RGB'):
+            return np.ascontiguousarray(pix[:, :, 2::-1])
+        return np.ascontiguousarray(pix[:, :, :3])
+
+    def read_scaled(self, y0, y1, max_rows, strip_height=STREAM_STRIP_HEIGHT):
+        """
+        Filas [y0, y1) reducidas verticalmente a como mucho max_rows, leyendo
+        por franjas. Las coordenadas x se conservan (útil para columnas).
+        """
+        w, _ = self.size
+        n = y1 - y0
+        if n <= max_rows:
+            return self.read(y0, y1)
+        factor = -(-n // max_rows)
+        step = max(factor, (strip_height // factor) * factor)
+        parts = []
+        for a in range(y0, y1, step):
+            b = min(y1, a + step)
+            out_rows = max(1, (b - a) // factor)
+            parts.append(cv2.resize(self.read(a, b), (w, out_rows), interpolation=cv2.INTER_AREA))
+        return np.vstack(parts)
+
+    def close(self):
+        if self._png is not None:
+            self._png.close()
+        self._mm = None
+        self._png = None
+        self._full = None
+
+def _stream_row_profiles(reader, precise=False, strip_height=STREAM_STRIP_HEIGHT):
+    """
+    Acumula por franjas la energía Sobel por fila, el HSV medio por fila y
+    las líneas horizontales Hough. Cada franja lleva _STRIP_CONTEXT filas de
+    contexto para que el desenfoque y Sobel coincidan con la imagen completa.
+    """
+    w, h = reader.size
+    energy = np.zeros(h, dtype=np.float64)
+    avg_hsv = np.zeros((h, 3), dtype=np.float64)
+    line_pos = []
+    for y0 in range(0, h, strip_height):
+        y1 = min(h, y0 + strip_height)
+        a = max(0, y0 - _STRIP_CONTEXT); b = min(h, y1 + _STRIP_CONTEXT)
+        bgr = reader.read(a, b)
+        gray = cv2.GaussianBlur(cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+        sobel = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
+        energy[y0:y1] = np.abs(sobel[y0 - a:y1 - a]).sum(axis=1)
+        del sobel
+        avg_hsv[y0:y1] = cv2.cvtColor(bgr[y0 - a:y1 - a], cv2.COLOR_BGR2HSV).mean(axis=1)
+        for yy in _hough_positions(cv2.Canny(gray, 50, 150), 0, w, precise, offset=a):
+            if y0 <= yy < y1:
+                line_pos.append(yy)
+    return energy, avg_hsv, line_pos
+
+def _save_band(bgr, p):
+    """Escribe una franja BGR; si cv2 falla prueba con PIL y, si no, devuelve None."""
     try:
-        import requests
-    except ImportError:
-        return None
-    
-    lm_studio_endpoint = os.environ.get('LM_STUDIO_ENDPOINT', 'http://localhost:1234/v1/chat/completions')
-    model_name = os.environ.get('LM_STUDIO_MODEL', 'qwen2-vl-7b-instruct')
-    
-    # Leer y optimizar imagen
+        if cv2.imwrite(p, bgr, [cv2.IMWRITE_PNG_COMPRESSION, PNG_COMPRESSION]):
+            return p
+    except Exception:
+        pass
     try:
-        img = Image.open(image_path).convert('RGB')
-        # Redimensionar si es muy grande (máx 1024px para análisis rápido)
-        max_size = 1024
-        if max(img.size) > max_size:
-            ratio = max_size / max(img.size)
-            new_size = (int(img.size[0] * ratio), int(img.size[1] * ratio))
-            img = img.resize(new_size, Image.Resampling.LANCZOS)
-        
-        # Convertir a base64
-        import io
-        output = io.BytesIO()
-        img.save(output, format='JPEG', quality=85, optimize=True)
-        output.seek(0)
-        image_base64 = base64.b64encode(output.read()).decode('utf-8')
+        Image.fromarray(np.ascontiguousarray(bgr[:, :, ::-1])).save(p, compress_level=PNG_COMPRESSION)
+        return p
     except Exception:
         return None
-    
-    prompt = """Analiza esta imagen de diseño web en detalle y responde SOLO con un JSON válido con la siguiente estructura:
+
+def segment_layout_streaming(path, out_dir=None, min_height=180, min_width=160, precise=False, write=False, strip_height=STREAM_STRIP_HEIGHT):
+    """
+    Variante de segment_layout para capturas enormes (p. ej. >40k px de alto).
+    Las filas se detectan acumulando perfiles franja a franja y las columnas
+    de cada fila sobre la banda reducida verticalmente (las x se conservan),
+    así que nunca se materializan los derivados float64 de la imagen completa.
+    Devuelve la misma estructura que segment_layout.
+    """
+    try:
+        reader = StripReader(path)
+    except Exception:
+        return {'width': 0, 'height': 0, 'rows': []}
+    try:
+        w, h = reader.size
+        energy, avg_hsv, line_pos = _stream_row_profiles(reader, precise, strip_height)
+        cuts = _merge_cuts(_profile_candidates(energy, avg_hsv, line_pos, precise), h, min_height, precise)
+        row_spans = _spans(cuts, h, max(120, min_height // 2))
+        base = os.path.splitext(os.path.basename(path))[0]
+        rows = []
+        for i, y0, y1 in row_spans:
+            row_name = f"{base}_seg_{i+1}"
+            columns = []
+            try:
+                band = reader.read_scaled(y0, y1, 4 * strip_height, strip_height)
+                band_feat = ImageFeatures(band, cache=FeatureCache(), key=(path, y0, y1))
+                col_spans = _segment_spans(band_feat, 1, min_width, precise)
+            except Exception:
+                col_spans = []
+            for j, x0, x1 in col_spans:
+                columns.append({
+                    'index': j,
+                    'box': [x0, y0, x1, y1],
+                    'width': x1 - x0,
+                    'name': f"{row_name}_col_{j+1}.png"
+                })
+            row = {'index': i, 'box': [0, y0, w, y1], 'name': f"{row_name}.png", 'columns': columns}
+            if write and out_dir:
+                try:
+                    band = reader.read(y0, y1)
+                    if write != 'columns':
+                        row['path'] = _save_band(band, os.path.join(out_dir, row['name']))
+                    for col in columns:
+                        x0, _, x1, _ = col['box']
+                        col['path'] = _save_band(band[:, x0:x1], os.path.join(out_dir, col['name']))
+                except Exception:
+                    row.setdefault('path', None)
+            rows.append(row)
+        return {'width': w, 'height': h, 'rows': rows}
+    except Exception:
+        return {'width': 0, 'height': 0, 'rows': []}
+    finally:
+        reader.close()
+
+STREAMING_MIN_PIXELS = int(os.environ.get('IMG2HTML_STREAMING_MIN_PIXELS', 40 * 1000 * 1000))
+
+VIRTUAL_SEGMENTS = os.environ.get('IMG2HTML_VIRTUAL_SEGMENTS', 'true').lower() == 'true'
+
+def _named_layout(geometry, path):
+    """Layout guardado en caché con los nombres de recorte de esta captura."""
+    base = os.path.splitext(os.path.basename(path))[0]
+    for row in geometry.get('rows') or []:
+        row_name = f"{base}_seg_{row['index']+1}"
+        row['name'] = f"{row_name}.png"
+        for col in row.get('columns') or []:
+            col['name'] = f"{row_name}_col_{col['index']+1}.png"
+    return geometry
+
+# Subir al cambiar el algoritmo de segmentación: invalida la geometría guardada en caché
+LAYOUT_CACHE_VERSION = 2
+
+def slice_layout(path, out_dir, precise=False, pyramid=False, depth=1, feature_cache=None, streaming_min_pixels=None, virtual=None):
+    """
+    Segmenta y escribe los recortes de una captura eligiendo el motor según su
+    tamaño: por franjas a partir de streaming_min_pixels, en memoria por
+    debajo. Es una función de módulo sin estado compartido, de modo que puede
+    ejecutarse en un proceso de un ProcessPoolExecutor.
+
+    Con segmentos virtuales (VIRTUAL_SEGMENTS) solo se escriben las columnas,
+    que son los archivos que enlaza el HTML; filas y columnas llevan además
+    'segment' (fuente + caja + hash) para recortar bajo demanda.
+    """
+    threshold = STREAMING_MIN_PIXELS if streaming_min_pixels is None else streaming_min_pixels
+    virtual = VIRTUAL_SEGMENTS if virtual is None else virtual
+    write = 'columns' if virtual else True
+    info = probe_image(path)
+    w, h = info['width'], info['height']
+    if w * h >= threshold:
+        # Capturas gigantes: segmentación por franjas sin derivados de la imagen completa
+        # (sin caché: reescribir sus recortes exigiría decodificarlas enteras)
+        layout = segment_layout_streaming(path, out_dir, precise=bool(precise), write=write)
+    else:
+        feat = _as_features(path, feature_cache)
+        cache = _analysis_cache()
+        params = {'precise': bool(precise), 'pyramid': bool(pyramid), 'depth': int(depth), 'cv': bool(feat.has_cv),
+                  'transitions': TRANSITION_DETECTOR, 'version': LAYOUT_CACHE_VERSION}
+        digest = None
+        geometry = None
+        if cache is not None:
+            try:
+                digest = source_digest(path)
+                geometry = cache.get('layout', digest, params)
+            except Exception:
+                digest = None
+        if geometry is not None:
+            layout = _named_layout(geometry, path)
+        else:
+            layout = segment_layout(feat, precise=bool(precise), feature_cache=feature_cache, pyramid=bool(pyramid), depth=depth)
+            if digest and layout.get('width'):
+                try:
+                    cache.put('layout', digest, layout, params)
+                except Exception:
+                    pass
+        if out_dir and layout.get('rows'):
+            write_layout_crops(layout, feat, out_dir, rows=(write != 'columns'))
+    if virtual:
+        try:
+            attach_virtual_segments(layout, path)
+        except Exception:
+            pass
+    return layout
+
+QWEN2VL_VISION_PROMPT = """Analiza esta imagen de diseño web en detalle y responde SOLO con un JSON válido con la siguiente estructura:
 
 {
   "components": ["lista de componentes UI detectados: botones, cards, navegación, formularios, etc."],
@@ -549,6 +1725,85 @@ def analyze_image_with_qwen2vl(image_path: str, use_cache: bool = True) -> Optio
 }
 
 IMPORTANTE: Responde SOLO con el JSON, sin texto adicional."""
+# Modo fusionado: una sola petición devuelve el análisis visual y el texto (OCR)
+QWEN2VL_FUSED_PROMPT = QWEN2VL_VISION_PROMPT.replace('{\n  "components"', '''{
+  "text": "todo el texto visible en la imagen, literal y con sus saltos de línea; cadena vacía si no hay texto",
+  "components"''', 1)
+# La versión del prompt forma parte de la clave: editarlo invalida lo guardado
+QWEN2VL_VISION_PROMPT_VERSION = hashlib.sha256(QWEN2VL_VISION_PROMPT.encode('utf-8')).hexdigest()[:12]
+QWEN2VL_FUSED_PROMPT_VERSION = hashlib.sha256(QWEN2VL_FUSED_PROMPT.encode('utf-8')).hexdigest()[:12]
+VISION_MAX_SIDE = 1024
+# El texto necesita más resolución que el layout: misma resolución que el OCR
+FUSED_MAX_SIDE = int(os.environ.get('IMG2HTML_FUSED_MAX_SIDE', 2048))
+# Análisis guardados en la caché de disco (analysis_cache, etapa 'vision')
+VISION_CACHE_TTL = int(os.environ.get('IMG2HTML_VISION_CACHE_TTL', 7 * 24 * 3600))
+# Los fallos (LM Studio caído, respuesta sin JSON) se recuerdan poco tiempo; 0 = no se guardan
+VISION_CACHE_NEGATIVE_TTL = int(os.environ.get('IMG2HTML_VISION_CACHE_NEGATIVE_TTL', 300))
+
+def _parse_vision_json(content: str) -> Optional[Dict]:
+    try:
+        return json.loads(content)
+    except Exception:
+        # Intentar extraer JSON del texto
+        start = content.find('{')
+        end = content.rfind('}') + 1
+        if start != -1 and end > start:
+            try:
+                return json.loads(content[start:end])
+            except Exception:
+                pass
+    return None
+
+def analyze_image_with_qwen2vl(image_path: str, use_cache: bool = True, feature_cache: Optional[FeatureCache] = None, with_text: bool = False) -> Optional[Dict]:
+    """
+    Usa Qwen2-VL para análisis visual profundo de una imagen.
+    Detecta componentes UI, tipografías, layouts, colores y espaciados.
+    Con with_text la misma petición transcribe además el texto visible
+    (campo 'text'), en lugar de enviar la imagen otra vez para el OCR.
+    El resultado se guarda en la caché de disco bajo el sha256 de la imagen,
+    el modelo y la versión del prompt, de modo que sobrevive a reinicios.
+    """
+    model_name = os.environ.get('LM_STUDIO_MODEL', 'qwen2-vl-7b-instruct')
+    prompt = QWEN2VL_FUSED_PROMPT if with_text else QWEN2VL_VISION_PROMPT
+    max_size = FUSED_MAX_SIDE if with_text else VISION_MAX_SIDE
+    cache = _analysis_cache() if use_cache else None
+    digest = None
+    params = {
+        'model': model_name,
+        'prompt': QWEN2VL_FUSED_PROMPT_VERSION if with_text else QWEN2VL_VISION_PROMPT_VERSION,
+        'max_side': max_size,
+    }
+    if cache is not None:
+        try:
+            # Un único hash por imagen (memorizado por ruta, tamaño y mtime)
+            digest = source_digest(image_path)
+            cached = cache.get('vision', digest, params)
+            if isinstance(cached, dict):
+                return cached.get('analysis')
+        except Exception:
+            digest = None
+
+    try:
+        from lmstudio import get_client, message_content, CircuitOpen
+    except ImportError:
+        return None
+    # LM Studio caído o cargando el modelo (circuit breaker abierto): ni se codifica la imagen
+    client = get_client()
+    if not client.available():
+        return None
+    
+    # Imagen reducida (1024px para el layout, 2048px si también se lee el texto),
+    # en JPEG y base64; la variante se comparte con el OCR y el refinado
+    try:
+        from image_payloads import encoded_image
+
+        def _decoded():
+            if feature_cache is not None and feature_cache.peek(image_path, 'bgr') is not None:
+                return feature_cache.features(image_path).rgb
+            return None
+        image_base64 = encoded_image(image_path, max_size, quality=85, load=_decoded)
+    except Exception:
+        return None
     
     payload = {
         "model": model_name,
@@ -569,51 +1824,35 @@ IMPORTANTE: Responde SOLO con el JSON, sin texto adicional."""
                 ]
             }
         ],
-        "max_tokens": 1024,
+        "max_tokens": 2048 if with_text else 1024,
         "temperature": 0.1,
         "response_format": {"type": "json_object"}
     }
     
+    result = None
     try:
-        response = requests.post(lm_studio_endpoint, json=payload, timeout=30)
+        # Sesión compartida con el OCR: keep-alive, slots limitados y reintentos
+        response = client.post(payload, timeout=30)
         if response.status_code == 200:
-            result = response.json()
-            content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
+            content = message_content(response)
             if content:
-                try:
-                    return json.loads(content)
-                except Exception:
-                    # Intentar extraer JSON del texto
-                    start = content.find('{')
-                    end = content.rfind('}') + 1
-                    if start != -1 and end > start:
-                        result = json.loads(content[start:end])
-                        # Guardar en cache
-                        if use_cache:
-                            try:
-                                with open(image_path, 'rb') as f:
-                                    file_hash = hashlib.md5(f.read()).hexdigest()
-                                cache_key = f"{image_path}:{file_hash}"
-                                _vision_analysis_cache[cache_key] = result
-                            except Exception:
-                                pass
-                        return result
+                result = _parse_vision_json(content)
+    except CircuitOpen:
+        # No es una respuesta del modelo: no se guarda como fallo
+        return None
     except Exception:
         pass
     
-    # Guardar None en cache para evitar reintentos
-    if use_cache:
+    # Se guarda también el fallo (con caducidad corta) para no reintentar en bucle
+    if digest:
         try:
-            with open(image_path, 'rb') as f:
-                file_hash = hashlib.md5(f.read()).hexdigest()
-            cache_key = f"{image_path}:{file_hash}"
-            _vision_analysis_cache[cache_key] = None
+            cache.put('vision', digest, {'analysis': result}, params,
+                      ttl=VISION_CACHE_TTL if result is not None else VISION_CACHE_NEGATIVE_TTL)
         except Exception:
             pass
-    
-    return None
+    return result
 
-def enhance_section_with_vision(section: Dict, use_qwen2vl: bool = True) -> Dict:
+def enhance_section_with_vision(section: Dict, use_qwen2vl: bool = True, feature_cache: Optional[FeatureCache] = None) -> Dict:
     """
     Enriquece una sección con análisis visual usando Qwen2-VL si está disponible.
     """
@@ -631,15 +1870,18 @@ def enhance_section_with_vision(section: Dict, use_qwen2vl: bool = True) -> Dict
         return section
     
     image_path = images[0]
-    analysis = analyze_image_with_qwen2vl(image_path)
-    
-    if analysis:
+    analysis = analyze_image_with_qwen2vl(image_path, feature_cache=feature_cache)
+    return apply_vision_analysis(section, analysis)
+
+def apply_vision_analysis(section: Dict, analysis: Optional[Dict]) -> Dict:
+    """Vuelca en la sección los campos de un análisis de Qwen2-VL (se ignora 'text')."""
+    if isinstance(analysis, dict):
         # Mejorar la sección con información del análisis visual
         if 'components' in analysis:
             section['detected_components'] = analysis['components']
         
-        if 'layout' in analysis:
-            layout_info = analysis['layout']
+        layout_info = analysis.get('layout')
+        if isinstance(layout_info, dict):
             if 'type' in layout_info:
                 section['layout_type'] = layout_info['type']
             if 'columns' in layout_info:
@@ -648,10 +1890,10 @@ def enhance_section_with_vision(section: Dict, use_qwen2vl: bool = True) -> Dict
         if 'typography' in analysis:
             section['typography_hints'] = analysis['typography']
         
-        if 'colors' in analysis:
+        detected_colors = analysis.get('colors')
+        if isinstance(detected_colors, dict):
             # Mejorar paleta de colores con colores detectados
-            detected_colors = analysis['colors']
-            if 'palette' not in section:
+            if not isinstance(section.get('palette'), list):
                 section['palette'] = []
             for key, value in detected_colors.items():
                 if value and value != 'null':
@@ -669,3 +1911,53 @@ def enhance_section_with_vision(section: Dict, use_qwen2vl: bool = True) -> Dict
     
     return section
 
+def analyze_images_fused(paths: List[str], feature_cache: Optional[FeatureCache] = None) -> Dict[str, Optional[Dict]]:
+    """
+    Análisis visual y OCR en una sola petición por imagen ({ruta: análisis con
+    'text'}, None si falló), con todas las imágenes en paralelo. El llamador
+    reparte el resultado: 'text' para el OCR y el resto con apply_vision_analysis.
+    """
+    def _one(p):
+        try:
+            return analyze_image_with_qwen2vl(p, feature_cache=feature_cache, with_text=True)
+        except Exception:
+            return None
+    paths = list(dict.fromkeys(paths))
+    try:
+        from lmstudio import get_client
+        results = get_client().map(_one, paths)
+    except ImportError:
+        results = [_one(p) for p in paths]
+    return dict(zip(paths, results))
+
+def vision_text(analysis: Optional[Dict]) -> Optional[str]:
+    """
+    Texto transcrito de un análisis fusionado como str (las listas se unen por
+    líneas). None si el modelo no devolvió un campo 'text' utilizable: esa
+    imagen no cuenta como leída y pasa por el OCR normal.
+    """
+    if not isinstance(analysis, dict):
+        return None
+    text = analysis.get('text')
+    if isinstance(text, str):
+        return text.strip()
+    if isinstance(text, (list, tuple)):
+        return '\n'.join(str(t).strip() for t in text if isinstance(t, (str, int, float)) and str(t).strip())
+    return None
+
+def enhance_sections_with_vision(sections: List[Dict], use_qwen2vl: bool = True, feature_cache: Optional[FeatureCache] = None) -> List[Dict]:
+    """
+    enhance_section_with_vision sobre varias secciones a la vez, repartidas
+    entre los slots paralelos de LM Studio (cliente compartido de lmstudio).
+    """
+    def _one(section):
+        try:
+            return enhance_section_with_vision(section, use_qwen2vl=use_qwen2vl, feature_cache=feature_cache)
+        except Exception:
+            return section
+    try:
+        from lmstudio import get_client
+        return get_client().map(_one, sections)
+    except ImportError:
+        return [_one(s) for s in sections]
+
@@ -2,11 +2,19 @@ from flask import Flask, render_template, request, redirect, url_for, flash, sen
 from werkzeug.utils import secure_filename
 import os
 import zipfile
+import hashlib
+import struct
 import uuid
 import json
-from analyzer import analyze_images, extract_design_dna, identify_pattern, segment_image, segment_columns
+import copy
+from typing import Dict
+from analyzer import analyze_images, probe_image, extract_design_dna, identify_pattern, slice_layout, FeatureCache, column_ratios, nested_layout_rows, materialize_segment, source_digest, STREAMING_MIN_PIXELS
 from ocr import extract_texts
 from ai_refine import refine_and_generate_wp
+from jobs import JobQueue, QueueFull, JobRunning, RUNNING, run_stages
+from analysis_cache import get_cache as get_analysis_cache
+from image_payloads import get_payload_cache
+from lmstudio import get_client as get_lmstudio_client
 from wp_theme.prompts.runner import ThemeBuilder
 from dotenv import load_dotenv
 import threading
@@ -38,6 +46,37 @@ SAFE_XML_EXTS = {'.xml'}
 MAX_ZIP_FILES = 500
 MAX_ZIP_UNCOMPRESSED = 300 * 1024 * 1024  # 300 MB
 PROGRESS = {}
+# Los trabajos terminados se olvidan tras PROGRESS_TTL segundos; como máximo PROGRESS_MAX entradas
+PROGRESS_TTL = int(os.environ.get('IMG2HTML_PROGRESS_TTL', 3600))
+PROGRESS_MAX = int(os.environ.get('IMG2HTML_PROGRESS_MAX', 1000))
+PROGRESS_HEARTBEAT = 15
+PROGRESS_STREAM_MAX = 300
+_progress_meta = {}
+_progress_meta_pruned = [0.0]
+_progress_cond = threading.Condition()
+# Profundidad del layout: 1 = filas y columnas; >1 activa el XY-cut anidado (XYCutEngine)
+LAYOUT_DEPTH = int(os.environ.get('IMG2HTML_LAYOUT_DEPTH', 1))
+# Procesos para segmentar secciones en paralelo: 0 = automático (CPUs), 1 = secuencial
+SLICE_WORKERS = int(os.environ.get('IMG2HTML_SLICE_WORKERS', 0))
+# Conversiones simultáneas y trabajos en espera; el resto se rechaza hasta que haya hueco
+JOB_WORKERS = int(os.environ.get('IMG2HTML_JOB_WORKERS', 2))
+JOB_QUEUE_MAX = int(os.environ.get('IMG2HTML_JOB_QUEUE_MAX', 100))
+JOB_DB_PATH = os.environ.get('IMG2HTML_JOB_DB') or os.path.join(UPLOAD_DIR, 'jobs.sqlite3')
+# Hilos por trabajo para las etapas independientes (visión, DNA, OCR, segmentación...); 0 = una por etapa
+STAGE_WORKERS = int(os.environ.get('IMG2HTML_STAGE_WORKERS', 0))
+# Visión + OCR en una sola petición a Qwen2-VL cuando ambos irían a LM Studio
+FUSED_VISION_OCR = os.environ.get('IMG2HTML_FUSED_VISION_OCR', 'true').lower() == 'true'
+# Cada lote escribe en WORKSPACES_DIR/<batch_id>/ (temp_out, wp_theme, dist) sobre una copia del tema base
+WORKSPACES_DIR = os.environ.get('IMG2HTML_WORKSPACES') or os.path.join(BASE_DIR, 'workspaces')
+THEME_BASE_DIR = os.path.join(BASE_DIR, 'wp_theme')
+THEME_COPY_IGNORE = ('node_modules', 'dist', 'prompts', '__pycache__', '.git', '.cache')
+# Reconversión incremental: build.json guarda la huella de cada sección y lo ya
+# calculado, de modo que reconvertir un lote solo rehace las secciones cambiadas
+INCREMENTAL_BUILDS = os.environ.get('IMG2HTML_INCREMENTAL', 'true').lower() == 'true'
+BUILD_MANIFEST = 'build.json'
+BUILD_MANIFEST_VERSION = 1
+# Claves del contexto que no afectan al resultado (o que no deben guardarse)
+BUILD_VOLATILE_KEYS = ('batch_id', 'google_api_key', 'google_application_credentials', 'save_env', 'full_rebuild')
 
 def allowed_file(filename):
     ext = os.path.splitext(filename)[1].lower()
@@ -50,34 +89,185 @@ def _sanitize_slug(text: str):
         slug = 'img2html-theme'
     return slug[:64]
 
-def _safe_extract_zip(zf: zipfile.ZipFile, dest_dir: str):
+INGEST_WORKERS = int(os.environ.get('IMG2HTML_INGEST_WORKERS', 4))
+INGEST_CHUNK = 1024 * 1024
+
+def _ingest_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, target_path: str, max_bytes: int, known_digest: str = None, wait_for=None):
+    """
+    Extrae un miembro por bloques calculando su sha256 al vuelo y, si es
+    imagen, valida su cabecera. Devuelve (sha256, probe o None) o lanza
+    excepción (el archivo parcial se elimina). Con known_digest el miembro
+    se lee primero a memoria y solo se escribe si su hash es distinto: los
+    duplicados nunca llegan al disco. wait_for(info) bloquea hasta que los
+    bytes del miembro estén disponibles (subida por bloques en curso).
+    """
+    if wait_for is not None:
+        wait_for(info)
+    digest = hashlib.sha256()
+    written = 0
+    buffered = [] if known_digest else None
+    wf = None
+    try:
+        with zf.open(info) as rf:
+            if buffered is None:
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                wf = open(target_path, 'wb')
+            for chunk in iter(lambda: rf.read(INGEST_CHUNK), b''):
+                written += len(chunk)
+                # Tamaño real, no el declarado en la cabecera del ZIP
+                if written > max_bytes:
+                    raise ValueError('miembro demasiado grande')
+                digest.update(chunk)
+                if wf is not None:
+                    wf.write(chunk)
+                else:
+                    buffered.append(chunk)
+        if wf is not None:
+            wf.close()
+            wf = None
+        if buffered is not None:
+            if digest.hexdigest() == known_digest:
+                return digest.hexdigest(), None
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            with open(target_path, 'wb') as out:
+                for chunk in buffered:
+                    out.write(chunk)
+        probe = None
+        if os.path.splitext(target_path)[1].lower() in SAFE_IMAGE_EXTS:
+            probe = probe_image(target_path)
+        return digest.hexdigest(), probe
+    except Exception:
+        if wf is not None:
+            wf.close()
+        try:
+            os.remove(target_path)
+        except Exception:
+            pass
+        raise
+
+def _ingest_zip(zip_path: str, dest_dir: str, workers: int = None, wait_for=None,
+                max_files: int = None, max_uncompressed: int = None):
+    """
+    Ingesta en streaming de un ZIP: cada miembro aprovechable se extrae por
+    bloques con su sha256 calculado al vuelo y las imágenes se validan por
+    cabecera en un pool de hilos (zlib libera el GIL al descomprimir).
+
+    Deduplicado: el directorio central ya trae CRC32 y tamaño de cada
+    miembro, así que solo las imágenes que repiten (CRC32, tamaño) de otra
+    anterior se comparan por sha256, en memoria y sin escribirse; las que
+    resultan idénticas se descartan conservando la primera del archivo.
+    Devuelve {'images', 'probes', 'hashes', 'duplicates', 'files', 'truncated'}
+    y deja un manifiesto ingest.json en dest_dir. Los miembros que superan
+    max_files o max_uncompressed (por defecto MAX_ZIP_FILES/MAX_ZIP_UNCOMPRESSED)
+    no se extraen y se listan en 'truncated'. Con wait_for la extracción puede
+    empezar mientras el ZIP aún se está recibiendo; si la espera de algún
+    miembro se agota o se cancela, se relanza ese error al terminar para que
+    la extracción se repita sobre el archivo completo.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    max_files = max_files or MAX_ZIP_FILES
+    max_uncompressed = max_uncompressed or MAX_ZIP_UNCOMPRESSED
+    dest_root = os.path.abspath(dest_dir)
+    members = []
+    truncated = []
     total_uncompressed = 0
-    count = 0
-    for info in zf.infolist():
-        name = info.filename
-        # Evitar traversal
-        if '..' in name or name.startswith('/') or name.startswith('\\'):
-            continue
-        ext = os.path.splitext(name)[1].lower()
-        # Solo extraer contenidos que podamos aprovechar: imágenes, fuentes, texto y XML
-        if (
-            ext not in SAFE_IMAGE_EXTS
-            and ext not in FONT_EXTS
-            and ext not in SAFE_TEXT_EXTS
-            and ext not in SAFE_XML_EXTS
-        ):
-            continue
-        total_uncompressed += getattr(info, 'file_size', 0)
-        count += 1
-        if count > MAX_ZIP_FILES or total_uncompressed > MAX_ZIP_UNCOMPRESSED:
-            break
-        target_path = os.path.abspath(os.path.join(dest_dir, name))
-        if not target_path.startswith(os.path.abspath(dest_dir)):
+    first_by_crc = {}
+    # Durante una subida en curso el archivo crece bajo nuestros pies: sin
+    # buffer de lectura, para no servir bytes cacheados antes de llegar
+    source = open(zip_path, 'rb', buffering=0) if wait_for is not None else zip_path
+    with zipfile.ZipFile(source, 'r') as zf:
+        for info in zf.infolist():
+            name = info.filename
+            if info.is_dir() or '..' in name or name.startswith('/') or name.startswith('\\'):
+                continue
+            ext = os.path.splitext(name)[1].lower()
+            if (
+                ext not in SAFE_IMAGE_EXTS
+                and ext not in FONT_EXTS
+                and ext not in SAFE_TEXT_EXTS
+                and ext not in SAFE_XML_EXTS
+            ):
+                continue
+            if truncated or len(members) + 1 > max_files or total_uncompressed + getattr(info, 'file_size', 0) > max_uncompressed:
+                # Fuera de los límites: no se extrae, pero se informa
+                truncated.append(name)
+                continue
+            total_uncompressed += getattr(info, 'file_size', 0)
+            target_path = os.path.abspath(os.path.join(dest_dir, name))
+            if not target_path.startswith(dest_root + os.sep):
+                continue
+            first = None
+            if ext in SAFE_IMAGE_EXTS:
+                first = first_by_crc.setdefault((info.CRC, info.file_size), len(members))
+            members.append((info, target_path, first if first != len(members) else None))
+        results = [None] * len(members)
+        stalled = []
+        workers = max(1, workers or INGEST_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Primero los miembros únicos; después los posibles duplicados,
+            # que necesitan el sha256 del primero de su grupo
+            futures = {i: pool.submit(_ingest_member, zf, info, target, max_uncompressed, None, wait_for)
+                       for i, (info, target, first) in enumerate(members) if first is None}
+            for i, fut in futures.items():
+                try:
+                    results[i] = fut.result()
+                except (TimeoutError, RuntimeError) as e:
+                    # Bytes del miembro sin recibir: no es un miembro dañado
+                    results[i] = None
+                    if wait_for is not None:
+                        stalled.append(e)
+                except Exception:
+                    results[i] = None
+            futures = {i: pool.submit(_ingest_member, zf, info, target, max_uncompressed, (results[first] or (None,))[0], wait_for)
+                       for i, (info, target, first) in enumerate(members) if first is not None}
+            for i, fut in futures.items():
+                try:
+                    results[i] = fut.result()
+                except (TimeoutError, RuntimeError) as e:
+                    # Bytes del miembro sin recibir: no es un miembro dañado
+                    results[i] = None
+                    if wait_for is not None:
+                        stalled.append(e)
+                except Exception:
+                    results[i] = None
+    if source is not zip_path:
+        source.close()
+    if stalled:
+        raise stalled[0]
+    images, files, duplicates = [], [], []
+    probes, hashes, seen = {}, {}, {}
+    for (info, target, first), res in zip(members, results):
+        if res is None:
             continue
-        # Crear directorio padre si no existe
-        os.makedirs(os.path.dirname(target_path), exist_ok=True)
-        with zf.open(info) as rf, open(target_path, 'wb') as wf:
-            wf.write(rf.read())
+        digest, probe = res
+        ext = os.path.splitext(target)[1].lower()
+        if ext in SAFE_IMAGE_EXTS:
+            if digest in seen:
+                # Duplicado exacto: se conserva el primero del ZIP
+                if probe is not None:
+                    try:
+                        os.remove(target)
+                    except Exception:
+                        pass
+                duplicates.append({'path': target, 'duplicate_of': seen[digest]})
+                continue
+            if probe is None:
+                continue
+            seen[digest] = target
+            images.append(target)
+            probes[target] = probe
+        else:
+            files.append(target)
+        hashes[target] = digest
+    try:
+        manifest = {os.path.relpath(p, dest_dir): dict(probes.get(p) or {}, sha256=d) for p, d in hashes.items()}
+        with open(os.path.join(dest_dir, 'ingest.json'), 'w', encoding='utf-8') as f:
+            json.dump({'files': manifest, 'duplicates': [os.path.relpath(d['path'], dest_dir) for d in duplicates],
+                       'truncated': truncated}, f)
+    except Exception:
+        pass
+    return {'images': images, 'probes': probes, 'hashes': hashes, 'duplicates': duplicates, 'files': files,
+            'truncated': truncated}
 
 @app.template_filter('basename')
 def basename_filter(p):
@@ -135,6 +325,31 @@ def index():
 @app.route('/upload', methods=['POST'])
 def upload():
     file = request.files.get('zipfile')
+    if not file or file.filename == '':
+        flash('Adjunta un archivo ZIP válido')
+        return redirect(url_for('index'))
+    if not allowed_file(file.filename):
+        flash('El archivo debe ser un ZIP')
+        return redirect(url_for('index'))
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    batch_id = str(uuid.uuid4())
+    batch_dir = os.path.join(UPLOAD_DIR, batch_id)
+    os.makedirs(batch_dir, exist_ok=True)
+    zip_path = os.path.join(batch_dir, secure_filename(file.filename))
+    file.save(zip_path)
+    # Extracción en streaming con sha256, deduplicado y validación por cabecera
+    try:
+        ingest = _ingest_zip(zip_path, batch_dir)
+    except zipfile.BadZipFile:
+        flash('El archivo ZIP está dañado')
+        return redirect(url_for('index'))
+    return _render_upload_plan(batch_id, batch_dir, ingest)
+
+def _render_upload_plan(batch_id, batch_dir, ingest):
+    """
+    Construye el plan de un lote ya ingerido y muestra plan.html con las
+    opciones del formulario (común a /upload y a la subida por bloques).
+    """
     theme_name = request.form.get('theme_name', '').strip() or 'Img2HTML AI Theme'
     theme_slug = _sanitize_slug(request.form.get('theme_slug', '').strip() or '')
     theme_description = request.form.get('theme_description', '').strip() or 'Tema de bloques generado y refinado con IA desde imágenes'
@@ -149,40 +364,19 @@ def upload():
     google_api_key = request.form.get('google_api_key') or ''
     enable_slicing = request.form.get('enable_slicing') or ''
     precise_slicing = request.form.get('precise_slicing') or ''
+    pyramid_slicing = request.form.get('pyramid_slicing') or ''
     save_env = request.form.get('save_env') or ''
     enable_seo = request.form.get('enable_seo') or ''
     google_application_credentials = request.form.get('google_application_credentials') or ''
     google_application_credentials_file = request.files.get('google_application_credentials_file')
-    if not file or file.filename == '':
-        flash('Adjunta un archivo ZIP válido')
-        return redirect(url_for('index'))
-    if not allowed_file(file.filename):
-        flash('El archivo debe ser un ZIP')
-        return redirect(url_for('index'))
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
-    batch_id = str(uuid.uuid4())
-    batch_dir = os.path.join(UPLOAD_DIR, batch_id)
-    os.makedirs(batch_dir, exist_ok=True)
-    zip_path = os.path.join(batch_dir, secure_filename(file.filename))
-    file.save(zip_path)
-    with zipfile.ZipFile(zip_path, 'r') as zf:
-        _safe_extract_zip(zf, batch_dir)
-    images = []
-    from PIL import Image as PILImage
-    for root, _, files in os.walk(batch_dir):
-        for f in files:
-            ext = os.path.splitext(f)[1].lower()
-            if ext in SAFE_IMAGE_EXTS:
-                p = os.path.join(root, f)
-                try:
-                    im = PILImage.open(p); im.verify()
-                    images.append(p)
-                except Exception:
-                    pass
+    images = ingest['images']
+    probes = ingest['probes']
+    if ingest.get('truncated'):
+        flash(f"Se omitieron {len(ingest['truncated'])} archivos del ZIP por superar el límite de archivos o de tamaño descomprimido")
     if not images:
         flash('El ZIP no contiene imágenes válidas')
         return redirect(url_for('index'))
-    plan = analyze_images(images)
+    plan = analyze_images(images, probes)
     for s in plan['sections']:
         s['pattern'] = identify_pattern(s)
         try:
@@ -255,20 +449,443 @@ def upload():
     request.environ['img2html_theme_screenshot'] = screenshot_path
     request.environ['img2html_css_framework'] = css_framework
     request.environ['img2html_enable_seo'] = bool(enable_seo)
-    return render_template('plan.html', plan=plan, batch_id=batch_id, theme_name=theme_name, theme_slug=theme_slug, theme_description=theme_description, theme_version=theme_version, theme_author=theme_author, theme_uri=theme_uri, theme_textdomain=theme_textdomain, theme_tags=theme_tags, theme_license=theme_license, css_framework=css_framework, google_api_key=google_api_key, enable_slicing=enable_slicing, precise_slicing=precise_slicing, save_env=save_env, google_application_credentials=google_application_credentials)
+    return render_template('plan.html', plan=plan, batch_id=batch_id, theme_name=theme_name, theme_slug=theme_slug, theme_description=theme_description, theme_version=theme_version, theme_author=theme_author, theme_uri=theme_uri, theme_textdomain=theme_textdomain, theme_tags=theme_tags, theme_license=theme_license, css_framework=css_framework, google_api_key=google_api_key, enable_slicing=enable_slicing, precise_slicing=precise_slicing, pyramid_slicing=pyramid_slicing, save_env=save_env, google_application_credentials=google_application_credentials)
+
+UPLOAD_CHUNK_SIZE = int(os.environ.get('IMG2HTML_UPLOAD_CHUNK_MB', 8)) * 1024 * 1024
+MAX_CHUNKED_UPLOAD = int(os.environ.get('IMG2HTML_MAX_UPLOAD_MB', 2048)) * 1024 * 1024
+# Límites de extracción de la subida por bloques (packs de diseño grandes)
+MAX_CHUNKED_FILES = int(os.environ.get('IMG2HTML_MAX_UPLOAD_FILES', 5000))
+MAX_CHUNKED_UNCOMPRESSED = int(os.environ.get('IMG2HTML_MAX_UPLOAD_UNCOMPRESSED_MB', 4096)) * 1024 * 1024
+UPLOAD_STALL_TIMEOUT = 600
+CHUNKED_UPLOADS = {}
+_chunked_lock = threading.Lock()
+
+def _merge_range(ranges, a, b):
+    """Añade [a, b) a una lista ordenada de rangos disjuntos y la fusiona."""
+    out = []
+    for x, y in sorted(ranges + [[a, b]]):
+        if out and x <= out[-1][1]:
+            out[-1][1] = max(out[-1][1], y)
+        else:
+            out.append([x, y])
+    return out
 
-def _set_progress(batch_id, percent, message):
+def _range_covered(ranges, a, b):
+    return a >= b or any(x <= a and b <= y for x, y in ranges)
+
+def _evict_chunked_uploads(now=None):
+    """
+    Olvida las subidas sin actividad desde hace UPLOAD_STALL_TIMEOUT y libera
+    sus hilos de extracción. upload.json sigue en disco: se pueden reanudar.
+    """
+    now = now or time.time()
+    with _chunked_lock:
+        idle = [b for b, st in CHUNKED_UPLOADS.items() if now - st.get('touched', now) > UPLOAD_STALL_TIMEOUT]
+    for batch_id in idle:
+        _drop_chunked_upload(batch_id)
+
+def _chunked_state(batch_id):
+    """
+    Estado de una subida por bloques: en memoria o, tras un reinicio, desde
+    upload.json en el directorio del lote (la subida se puede reanudar).
+    """
     try:
-        PROGRESS.setdefault(batch_id, {})
-        PROGRESS[batch_id]['percent'] = int(max(0, min(100, percent)))
-        PROGRESS[batch_id]['message'] = str(message or '')
-        PROGRESS[batch_id]['ready'] = bool(PROGRESS[batch_id].get('ready'))
+        batch_id = str(uuid.UUID(batch_id))
+    except Exception:
+        return None
+    _evict_chunked_uploads()
+    with _chunked_lock:
+        st = CHUNKED_UPLOADS.get(batch_id)
+        if st is not None:
+            st['touched'] = time.time()
+            return st
+        batch_dir = os.path.join(UPLOAD_DIR, batch_id)
+        try:
+            with open(os.path.join(batch_dir, 'upload.json'), 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except Exception:
+            return None
+        st = {
+            'batch_id': batch_id,
+            'batch_dir': batch_dir,
+            'path': os.path.join(batch_dir, saved['filename']),
+            'filename': saved['filename'],
+            'size': int(saved['size']),
+            'ranges': saved.get('ranges') or [],
+            'cond': threading.Condition(),
+            'ingest': None,
+            'touched': time.time()
+        }
+        CHUNKED_UPLOADS[batch_id] = st
+        return st
+
+def _drop_chunked_upload(batch_id):
+    """Olvida el estado en memoria de una subida y libera a quien espere bytes."""
+    with _chunked_lock:
+        st = CHUNKED_UPLOADS.pop(batch_id, None)
+    if st is not None:
+        with st['cond']:
+            st['aborted'] = True
+            st['cond'].notify_all()
+
+def _save_chunked_state(st):
+    try:
+        tmp = os.path.join(st['batch_dir'], 'upload.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'filename': st['filename'], 'size': st['size'], 'ranges': st['ranges']}, f)
+        os.replace(tmp, os.path.join(st['batch_dir'], 'upload.json'))
+    except Exception:
+        pass
+
+def _wait_range(st, a, b):
+    """Bloquea hasta que los bytes [a, b) del ZIP se hayan recibido."""
+    with st['cond']:
+        while not _range_covered(st['ranges'], a, b):
+            if st.get('aborted'):
+                raise RuntimeError('subida cancelada')
+            if not st['cond'].wait(timeout=UPLOAD_STALL_TIMEOUT):
+                raise TimeoutError('subida detenida')
+
+def _central_directory_range(st):
+    """
+    Rango del directorio central si el final del ZIP (EOCD) ya se recibió;
+    None si aún no está disponible.
+    """
+    size = st['size']
+    suffix = [x for x, y in st['ranges'] if y == size]
+    if not suffix:
+        return None
+    start = max(suffix[0], size - (22 + 65535))
+    with open(st['path'], 'rb') as f:
+        f.seek(start)
+        data = f.read(size - start)
+    pos = data.rfind(b'PK\x05\x06')
+    while pos >= 0:
+        comment_len = struct.unpack('<H', data[pos + 20:pos + 22])[0] if pos + 22 <= len(data) else -1
+        if pos + 22 + comment_len == len(data):
+            cd_size, cd_offset = struct.unpack('<II', data[pos + 12:pos + 20])
+            if cd_offset == 0xFFFFFFFF:
+                # ZIP64: se espera al archivo completo
+                return (0, size)
+            return (cd_offset, cd_offset + cd_size)
+        pos = data.rfind(b'PK\x05\x06', 0, pos)
+    if start == suffix[0] and start > 0:
+        # El EOCD puede empezar antes de lo recibido
+        return None
+    return (0, size)
+
+def _ingest_chunked(st, wait_for=None):
+    """_ingest_zip de una subida por bloques, con sus límites propios."""
+    return _ingest_zip(st['path'], st['batch_dir'], wait_for=wait_for,
+                       max_files=MAX_CHUNKED_FILES, max_uncompressed=MAX_CHUNKED_UNCOMPRESSED)
+
+def _member_waiter(st):
+    def wait_for(info):
+        start = info.header_offset
+        _wait_range(st, start, start + 30)
+        with open(st['path'], 'rb') as f:
+            f.seek(start)
+            header = f.read(30)
+        name_len, extra_len = struct.unpack('<HH', header[26:30])
+        end = start + 30 + name_len + extra_len + info.compress_size
+        if info.flag_bits & 0x08:
+            end += 16
+        _wait_range(st, start, min(st['size'], end))
+    return wait_for
+
+def _maybe_start_chunked_ingest(st):
+    """
+    Arranca la extracción en segundo plano en cuanto el directorio central
+    está disponible; cada miembro se extrae cuando llegan sus bytes.
+    """
+    with st['cond']:
+        if st.get('ingest') is not None:
+            return
+        cd = _central_directory_range(st)
+        if cd is None or not _range_covered(st['ranges'], cd[0], cd[1]):
+            return
+        job = {'result': None, 'error': None, 'done': threading.Event()}
+        st['ingest'] = job
+
+    def run():
+        try:
+            job['result'] = _ingest_chunked(st, wait_for=_member_waiter(st))
+        except Exception as e:
+            job['error'] = e
+        finally:
+            job['done'].set()
+
+    threading.Thread(target=run, daemon=True).start()
+
+def _chunked_status(st):
+    received = sum(y - x for x, y in st['ranges'])
+    missing = []
+    pos = 0
+    for x, y in st['ranges']:
+        if x > pos:
+            missing.append([pos, x])
+        pos = y
+    if pos < st['size']:
+        missing.append([pos, st['size']])
+    return {
+        'batch_id': st['batch_id'],
+        'size': st['size'],
+        'chunk_size': UPLOAD_CHUNK_SIZE,
+        'received': received,
+        'ranges': st['ranges'],
+        'missing': missing[:50],
+        'complete': received >= st['size'],
+        'extracting': st.get('ingest') is not None
+    }
+
+def _json_response(obj, status=200):
+    return app.response_class(response=json.dumps(obj), status=status, mimetype='application/json')
+
+@app.route('/upload/init', methods=['POST'])
+def upload_init():
+    data = request.get_json(silent=True) or request.form
+    filename = secure_filename(str(data.get('filename') or ''))
+    try:
+        size = int(data.get('size') or 0)
+    except Exception:
+        size = 0
+    if not filename or not allowed_file(filename):
+        return _json_response({'error': 'El archivo debe ser un ZIP'}, 400)
+    if size <= 0:
+        return _json_response({'error': 'Tamaño no válido'}, 400)
+    # Un ZIP más grande de lo que se puede extraer llegaría entero para quedar truncado
+    limit = min(MAX_CHUNKED_UPLOAD, MAX_CHUNKED_UNCOMPRESSED)
+    if size > limit:
+        return _json_response({'error': f'El ZIP supera el máximo de {limit // (1024 * 1024)} MB', 'max_size': limit}, 413)
+    _evict_chunked_uploads()
+    batch_id = str(uuid.uuid4())
+    batch_dir = os.path.join(UPLOAD_DIR, batch_id)
+    os.makedirs(batch_dir, exist_ok=True)
+    path = os.path.join(batch_dir, filename)
+    # Archivo reservado con su tamaño final: cada bloque se escribe en su offset
+    with open(path, 'wb') as f:
+        f.truncate(size)
+    st = {
+        'batch_id': batch_id,
+        'batch_dir': batch_dir,
+        'path': path,
+        'filename': filename,
+        'size': size,
+        'ranges': [],
+        'cond': threading.Condition(),
+        'ingest': None,
+        'touched': time.time()
+    }
+    with _chunked_lock:
+        CHUNKED_UPLOADS[batch_id] = st
+    _save_chunked_state(st)
+    return _json_response(_chunked_status(st), 201)
+
+@app.route('/upload/<batch_id>', methods=['GET'])
+def upload_status(batch_id):
+    st = _chunked_state(batch_id)
+    if st is None:
+        return _json_response({'error': 'Subida no encontrada'}, 404)
+    return _json_response(_chunked_status(st))
+
+@app.route('/upload/<batch_id>/chunk', methods=['PUT'])
+def upload_chunk(batch_id):
+    """
+    Recibe un bloque en ?offset=N. La cabecera X-Chunk-Sha256 es obligatoria
+    y el bloque solo se escribe si coincide; reenviar un bloque es inocuo.
+    """
+    st = _chunked_state(batch_id)
+    if st is None:
+        return _json_response({'error': 'Subida no encontrada'}, 404)
+    try:
+        offset = int(request.args.get('offset', ''))
+    except Exception:
+        return _json_response({'error': 'offset no válido'}, 400)
+    expected = (request.headers.get('X-Chunk-Sha256') or '').strip().lower()
+    if not expected:
+        return _json_response({'error': 'Falta X-Chunk-Sha256'}, 400)
+    length = request.content_length or 0
+    if length <= 0 or length > 2 * UPLOAD_CHUNK_SIZE or offset < 0 or offset + length > st['size']:
+        return _json_response({'error': 'Bloque fuera de rango'}, 400)
+    digest = hashlib.sha256()
+    parts = []
+    remaining = length
+    while remaining > 0:
+        chunk = request.stream.read(min(remaining, 1024 * 1024))
+        if not chunk:
+            break
+        digest.update(chunk)
+        parts.append(chunk)
+        remaining -= len(chunk)
+    if remaining or digest.hexdigest() != expected:
+        return _json_response({'error': 'Checksum del bloque no coincide', 'offset': offset}, 422)
+    with open(st['path'], 'r+b') as f:
+        f.seek(offset)
+        for chunk in parts:
+            f.write(chunk)
+    with st['cond']:
+        st['ranges'] = _merge_range(st['ranges'], offset, offset + length)
+        st['cond'].notify_all()
+    _save_chunked_state(st)
+    try:
+        _maybe_start_chunked_ingest(st)
+    except Exception:
+        pass
+    return _json_response(_chunked_status(st))
+
+@app.route('/upload/<batch_id>/finalize', methods=['POST'])
+def upload_finalize(batch_id):
+    st = _chunked_state(batch_id)
+    if st is None:
+        return _json_response({'error': 'Subida no encontrada'}, 404)
+    status = _chunked_status(st)
+    if not status['complete']:
+        return _json_response(dict(status, error='Faltan bloques'), 409)
+    _maybe_start_chunked_ingest(st)
+    job = st.get('ingest')
+    if job is None:
+        # Sin EOCD reconocible: se procesa el archivo completo
+        try:
+            ingest = _ingest_chunked(st)
+        except zipfile.BadZipFile:
+            ingest = None
+    else:
+        job['done'].wait()
+        ingest = job['result']
+        if job['error'] is not None:
+            # Reintento sobre el archivo ya completo
+            try:
+                ingest = _ingest_chunked(st)
+            except zipfile.BadZipFile:
+                ingest = None
+    _drop_chunked_upload(st['batch_id'])
+    if ingest is None:
+        flash('El archivo ZIP está dañado')
+        return redirect(url_for('index'))
+    return _render_upload_plan(st['batch_id'], st['batch_dir'], ingest)
+
+def _progress_finished(st):
+    return bool(st.get('ready')) or int(st.get('percent') or 0) >= 100
+
+def _prune_progress(now):
+    """Olvida los trabajos terminados hace más de PROGRESS_TTL y mantiene PROGRESS acotado."""
+    for batch_id, meta in list(_progress_meta.items()):
+        if meta.get('finished') and now - meta['finished'] > PROGRESS_TTL:
+            PROGRESS.pop(batch_id, None)
+            _progress_meta.pop(batch_id, None)
+    excess = len(PROGRESS) - PROGRESS_MAX
+    if excess > 0:
+        # Primero los terminados, después los más antiguos
+        order = sorted(PROGRESS, key=lambda b: (not (_progress_meta.get(b) or {}).get('finished'), (_progress_meta.get(b) or {}).get('updated', 0)))
+        for batch_id in order[:excess]:
+            PROGRESS.pop(batch_id, None)
+            _progress_meta.pop(batch_id, None)
+    for batch_id in list(_progress_meta):
+        if batch_id not in PROGRESS:
+            _progress_meta.pop(batch_id, None)
+
+def _set_progress(batch_id, percent, message, **fields):
+    try:
+        with _progress_cond:
+            now = time.time()
+            PROGRESS.setdefault(batch_id, {})
+            PROGRESS[batch_id].update(fields)
+            PROGRESS[batch_id]['percent'] = int(max(0, min(100, percent)))
+            PROGRESS[batch_id]['message'] = str(message or '')
+            PROGRESS[batch_id]['ready'] = bool(PROGRESS[batch_id].get('ready'))
+            meta = _progress_meta.setdefault(batch_id, {'version': 0})
+            meta['version'] += 1
+            meta['updated'] = now
+            meta['finished'] = now if _progress_finished(PROGRESS[batch_id]) else None
+            if now - _progress_meta_pruned[0] > 30 or len(PROGRESS) > PROGRESS_MAX:
+                _progress_meta_pruned[0] = now
+                _prune_progress(now)
+            _progress_cond.notify_all()
+    except Exception:
+        pass
+
+PROGRESS_RESULT_KEYS = ('used_ai', 'provider', 'ocr_provider', 'saved_env', 'incremental')
+
+def _reset_progress(batch_id, message='En cola'):
+    """
+    Reinicia el progreso de un lote al encolar o arrancar una conversión: sin
+    esto una reconversión hereda ready=True/100 % de la anterior (la interfaz
+    redirige a la salida antigua y la poda lo trata como terminado).
+    """
+    try:
+        with _progress_cond:
+            entry = PROGRESS.setdefault(batch_id, {})
+            for key in PROGRESS_RESULT_KEYS:
+                entry.pop(key, None)
+            entry['ready'] = False
     except Exception:
         pass
+    _set_progress(batch_id, 1, message)
+
+def _progress_state(batch_id):
+    st = _progress_snapshot(batch_id)[0]
+    if st is None:
+        # Tras un reinicio el estado en memoria se pierde; la cola persistente sabe si sigue pendiente
+        try:
+            job = _get_job_queue().status(batch_id)
+        except Exception:
+            job = None
+        if job and job.get('position'):
+            _set_queue_position(batch_id, job['position'])
+            st = _progress_snapshot(batch_id)[0]
+    return st or {'percent': 0, 'message': 'Esperando...', 'ready': False}
+
+def _progress_snapshot(batch_id):
+    with _progress_cond:
+        st = PROGRESS.get(batch_id)
+        return (dict(st) if st is not None else None), (_progress_meta.get(batch_id) or {}).get('version', 0)
+
+@app.route('/progress/<batch_id>/stream', methods=['GET'])
+def progress_stream(batch_id):
+    """Server-Sent Events: un evento por cada llamada a _set_progress hasta que el trabajo termina."""
+    from flask import Response, stream_with_context
+
+    def events():
+        yield 'retry: 2000\n\n'
+        st, last_version = _progress_snapshot(batch_id)
+        if st is None:
+            st = _progress_state(batch_id)
+            last_version = _progress_snapshot(batch_id)[1]
+        yield f'data: {json.dumps(st)}\n\n'
+        if _progress_finished(st):
+            return
+        # El navegador reconecta solo; cortar cada cierto tiempo evita hilos colgados para siempre
+        deadline = time.time() + PROGRESS_STREAM_MAX
+        while time.time() < deadline:
+            with _progress_cond:
+                st, version = _progress_snapshot(batch_id)
+                if version == last_version:
+                    _progress_cond.wait(PROGRESS_HEARTBEAT)
+                    st, version = _progress_snapshot(batch_id)
+            if version == last_version:
+                # Comentario de latido: mantiene viva la conexión y detecta clientes caídos
+                yield ': ping\n\n'
+                continue
+            last_version = version
+            st = st or _progress_state(batch_id)
+            yield f'data: {json.dumps(st)}\n\n'
+            if _progress_finished(st):
+                return
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/progress/<batch_id>', methods=['GET'])
 def progress_status(batch_id):
-    st = PROGRESS.get(batch_id) or {'percent': 0, 'message': 'Esperando...', 'ready': False}
+    st = _progress_state(batch_id)
+    return app.response_class(response=json.dumps(st), status=200, mimetype='application/json')
+
+@app.route('/cache/stats', methods=['GET'])
+def analysis_cache_stats():
+    """Aciertos, fallos y tamaño de la caché de análisis y de imágenes codificadas (para monitorización)."""
+    cache = get_analysis_cache()
+    st = cache.stats() if cache is not None else {'enabled': False}
+    st['payloads'] = get_payload_cache().stats()
     return app.response_class(response=json.dumps(st), status=200, mimetype='application/json')
 
 @app.route('/result/<batch_id>', methods=['GET'])
@@ -278,7 +895,174 @@ def conversion_result(batch_id):
     provider = st.get('provider') or ''
     ocr_provider = st.get('ocr_provider') or ''
     saved_env = bool(st.get('saved_env'))
-    return render_template('done.html', output_dir='temp_out', theme_dir='wp_theme', used_ai=used_ai, saved_env=saved_env, provider=provider, ocr_provider=ocr_provider)
+    if not _is_batch_id(batch_id):
+        return render_template('done.html', output_dir='temp_out', theme_dir='wp_theme', used_ai=used_ai, saved_env=saved_env, provider=provider, ocr_provider=ocr_provider)
+    return render_template('done.html', batch_id=batch_id, output_dir=f'batch/{batch_id}/temp_out', theme_dir=f'batch/{batch_id}/wp_theme', used_ai=used_ai, saved_env=saved_env, provider=provider, ocr_provider=ocr_provider)
+
+def _slice_source(section, enable_slicing=False):
+    """Imagen de la sección que debe segmentarse, o None si no corresponde."""
+    if not section.get('images'):
+        return None
+    p0 = section['images'][0]
+    info = probe_image(p0)
+    w, h = info['width'], info['height']
+    ratio = h / float(max(1, w))
+    if not (enable_slicing or ratio >= 1.5):
+        return None
+    return p0
+
+def _slice_section(section, assets_dir, enable_slicing=False, precise_slicing=False, feature_cache=None, pyramid_slicing=False, layout=None):
+    """
+    Segmenta la primera imagen de la sección en filas y columnas sobre una sola
+    decodificación (segment_layout) y escribe cada recorte una única vez.
+    Actualiza images, segments y layout_rows de la sección y devuelve los
+    nombres de archivo escritos en assets_dir. Si se recibe layout (ya
+    calculado, p. ej. en otro proceso) solo se aplica a la sección.
+    """
+    copied = []
+    if layout is None:
+        p0 = _slice_source(section, enable_slicing)
+        if not p0:
+            return copied
+        layout = slice_layout(p0, assets_dir, precise_slicing, pyramid_slicing, LAYOUT_DEPTH, feature_cache, STREAMING_MIN_PIXELS)
+    rows = [r for r in layout['rows'] if r.get('path') or r.get('segment')]
+    if not rows:
+        return copied
+    layout_rows = []
+    images_flat = []
+    for r in rows:
+        if r.get('path'):
+            copied.append(os.path.basename(r['path']))
+        cols = [c for c in r['columns'] if c.get('path')]
+        if not cols:
+            continue
+        ratios, ratios_percent = column_ratios([c['width'] for c in cols])
+        entry = {
+            'segment': r['name'],
+            'columns': [os.path.basename(c['path']) for c in cols],
+            'ratios': ratios,
+            'ratios_percent': ratios_percent
+        }
+        # Estructura interna de cada columna (XY-cut recursivo, sin recortes extra)
+        nested = [nested_layout_rows(c.get('rows')) for c in cols]
+        if any(nested):
+            entry['column_layouts'] = nested
+        layout_rows.append(entry)
+        for c in cols:
+            images_flat.append(c['path'])
+            copied.append(os.path.basename(c['path']))
+    if images_flat:
+        section['images'] = images_flat
+    else:
+        # Sin columnas escritas: las filas sí hacen falta como archivo
+        paths = []
+        for r in rows:
+            if not r.get('path'):
+                try:
+                    r['path'] = materialize_segment(r['segment'], assets_dir, r['name'], feature_cache)
+                    copied.append(r['name'])
+                except Exception:
+                    continue
+            paths.append(r['path'])
+        if paths:
+            section['images'] = paths
+    # Solo las filas escritas en disco; el resto sigue como segmento virtual
+    section['segments'] = [r['name'] for r in rows if os.path.isfile(os.path.join(assets_dir, r['name']))]
+    # Referencias virtuales (fuente + caja + hash) para recortar bajo demanda
+    refs = [r['segment'] for r in rows if r.get('segment')]
+    if refs:
+        section['segment_refs'] = refs
+    if layout_rows:
+        section['layout_rows'] = layout_rows
+    return copied
+
+_slice_pool = None
+_slice_pool_lock = threading.Lock()
+
+def _get_slice_pool(workers):
+    """
+    Pool de procesos compartido por todas las conversiones: el arranque de
+    los intérpretes (spawn) se paga una vez y no en cada trabajo.
+    """
+    global _slice_pool
+    with _slice_pool_lock:
+        if _slice_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: el proceso padre tiene hilos (Flask, conversiones en curso)
+            ctx = multiprocessing.get_context('spawn')
+            _slice_pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+        return _slice_pool
+
+def _drop_slice_pool(pool=None):
+    """Descarta el pool compartido (p. ej. roto porque murió un proceso); el siguiente trabajo crea otro."""
+    global _slice_pool
+    with _slice_pool_lock:
+        if pool is None or _slice_pool is pool:
+            pool, _slice_pool = _slice_pool, None
+    if pool is not None:
+        try:
+            pool.shutdown(wait=False, cancel_futures=True)
+        except Exception:
+            pass
+
+def _slice_sections(sections, assets_dir, enable_slicing=False, precise_slicing=False, feature_cache=None, pyramid_slicing=False, workers=None, on_section=None):
+    """
+    Calcula el layout de todas las secciones a segmentar. Con más de un
+    worker cada sección se segmenta en un proceso del pool compartido
+    (_get_slice_pool); el resultado es {índice de sección: layout}, de
+    modo que la fusión en plan['sections'] no depende del orden de llegada.
+    on_section(hechas, total) se llama al terminar cada sección.
+    """
+    jobs = []
+    for i, section in enumerate(sections):
+        try:
+            p0 = _slice_source(section, enable_slicing)
+        except Exception:
+            p0 = None
+        if p0:
+            jobs.append((i, p0))
+    layouts = {}
+    total = len(jobs)
+    workers = workers or SLICE_WORKERS or min(4, os.cpu_count() or 1)
+    workers = max(1, min(workers, total))
+
+    def _done(i, layout):
+        layouts[i] = layout
+        if on_section:
+            try:
+                on_section(len(layouts), total)
+            except Exception:
+                pass
+
+    if workers > 1:
+        from concurrent.futures import as_completed
+        from concurrent.futures.process import BrokenProcessPool
+        pool = None
+        try:
+            pool = _get_slice_pool(max(workers, SLICE_WORKERS or min(4, os.cpu_count() or 1)))
+            futures = {pool.submit(slice_layout, p0, assets_dir, precise_slicing, pyramid_slicing, LAYOUT_DEPTH, None, STREAMING_MIN_PIXELS): i for i, p0 in jobs}
+            for fut in as_completed(futures):
+                try:
+                    _done(futures[fut], fut.result())
+                except BrokenProcessPool:
+                    raise
+                except Exception:
+                    pass
+        except BrokenProcessPool:
+            # Murió un proceso del pool: se recrea en el próximo trabajo
+            _drop_slice_pool(pool)
+        except Exception:
+            pass
+    # Secuencial (o secciones que fallaron en el pool), reutilizando feature_cache
+    for i, p0 in jobs:
+        if i in layouts:
+            continue
+        try:
+            _done(i, slice_layout(p0, assets_dir, precise_slicing, pyramid_slicing, LAYOUT_DEPTH, feature_cache, STREAMING_MIN_PIXELS))
+        except Exception:
+            pass
+    return layouts
 
 def _do_convert_async(ctx):
     batch_id = ctx.get('batch_id')
@@ -295,11 +1079,30 @@ def _do_convert_async(ctx):
     google_api_key = ctx.get('google_api_key') or ''
     enable_slicing = ctx.get('enable_slicing') or ''
     precise_slicing = ctx.get('precise_slicing') or ''
+    pyramid_slicing = ctx.get('pyramid_slicing') or ''
     enable_seo = bool(ctx.get('enable_seo'))
     save_env = ctx.get('save_env') or ''
     google_application_credentials = ctx.get('google_application_credentials') or ''
-    _set_progress(batch_id, 5, 'Inicializando conversión')
+    lm_client = get_lmstudio_client()
+
+    def lmstudio_changed(state):
+        # Circuit breaker de LM Studio: se refleja en el progreso del trabajo
+        percent = (PROGRESS.get(batch_id) or {}).get('percent', 5)
+        if state.get('state') == 'open':
+            message = f"LM Studio no disponible: se usan alternativas locales (reintento en {state.get('retry_in', 0)} s)"
+        else:
+            message = 'LM Studio disponible de nuevo'
+        _set_progress(batch_id, percent, message, lmstudio=state)
+
+    lm_client.add_listener(lmstudio_changed)
+    _reset_progress(batch_id, 'Inicializando conversión')
+    _set_progress(batch_id, 5, 'Inicializando conversión', lmstudio=lm_client.state())
+    # Planos derivados (gris, HSV, Sobel...) compartidos por todas las etapas del trabajo
+    feature_cache = FeatureCache()
     try:
+        options = _build_options(ctx)
+        ws, previous = _open_workspace(batch_id, options, bool(ctx.get('full_rebuild')))
+        out_dir = ws['static']
         batch_dir = os.path.join(UPLOAD_DIR, batch_id)
         images = []
         fonts = []
@@ -318,154 +1121,229 @@ def _do_convert_async(ctx):
                 elif ext in SAFE_XML_EXTS:
                     xml_files.append(full)
         _set_progress(batch_id, 10, 'Cargando imágenes')
-        plan = analyze_images(images)
+        probes = {}
+        for p in list(images):
+            try:
+                probes[p] = probe_image(p)
+            except Exception:
+                images.remove(p)
+        plan = analyze_images(images, probes)
         for s in plan['sections']:
             s['pattern'] = identify_pattern(s)
         _set_progress(batch_id, 20, 'Detectando patrones y secciones')
+
+        # Secciones cuyas entradas no cambiaron desde la conversión anterior: se
+        # reutilizan su visión, OCR, recortes y patrón guardados en build.json
+        sections = plan['sections']
+        fingerprints = [_section_fingerprint(s) for s in sections]
+        prev_sections = (previous or {}).get('sections') or {}
+        reused = {}
+        for i, s in enumerate(sections):
+            entry = prev_sections.get(s['slug'])
+            if entry and entry.get('fingerprint') == fingerprints[i] and entry.get('section'):
+                reused[i] = entry
+        changed = [i for i in range(len(sections)) if i not in reused]
+        removed = [slug for slug in prev_sections if slug not in {s['slug'] for s in sections}]
+        # Imágenes originales de cada sección (claves del OCR), antes de segmentar
+        sources = [list((reused[i].get('sources') if i in reused else None) or s['images']) for i, s in enumerate(sections)]
+        changed_images = [p for i in changed for p in sources[i]]
+        ocr_targets = images if previous is None else changed_images
+        wxr_plan = {'sections': [
+            {'label': s.get('label'), 'name': s.get('name'), 'slug': s.get('slug'), 'images': list(sources[i])}
+            for i, s in enumerate(sections)
+        ]}
+        built = {}
+        use_vision = os.environ.get('USE_VISION_ANALYSIS', 'true').lower() == 'true'
+        google_creds = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+        # Sin Google Vision el OCR también iría a Qwen2-VL: una petición por imagen para ambos
+        fused = FUSED_VISION_OCR and use_vision and not (google_creds and os.path.isfile(google_creds))
+        if previous is not None:
+            _purge_section_files(out_dir, prev_sections, {sections[i]['slug'] for i in reused})
+            _set_progress(batch_id, 20, f'Reconversión incremental: {len(changed)} de {len(sections)} secciones cambiadas',
+                          incremental={'changed': len(changed), 'reused': len(reused), 'removed': len(removed)})
         
-        # Análisis visual profundo con Qwen2-VL (opcional)
-        try:
-            from analyzer import enhance_section_with_vision
-            use_vision = os.environ.get('USE_VISION_ANALYSIS', 'true').lower() == 'true'
-            if use_vision:
-                _set_progress(batch_id, 22, 'Análisis visual profundo')
-                for s in plan['sections']:
-                    try:
-                        s = enhance_section_with_vision(s, use_qwen2vl=True)
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-        
-        dna = extract_design_dna(images)
-        _set_progress(batch_id, 30, 'Extrayendo paleta DNA')
-        try:
-            ocr_texts, ocr_provider = extract_texts(images)
-        except Exception:
-            ocr_texts, ocr_provider = ({}, '')
-        _set_progress(batch_id, 40, f'OCR: {ocr_provider or "N/A"}')
-        # Exportar contenido WXR (para importador de contenidos)
-        try:
-            _export_wxr(TEMP_OUT_DIR, plan, ocr_texts)
-        except Exception:
-            pass
-        os.makedirs(TEMP_OUT_DIR, exist_ok=True)
-        assets_dir = os.path.join(TEMP_OUT_DIR, 'assets')
-        os.makedirs(assets_dir, exist_ok=True)
-        copied = []
-        for section in plan['sections']:
-            for img in section['images']:
-                name = os.path.basename(img)
-                dst = os.path.join(assets_dir, name)
-                if not os.path.isfile(dst):
-                    with open(img, 'rb') as rf, open(dst, 'wb') as wf:
-                        wf.write(rf.read())
-                copied.append(name)
+        # Grafo de etapas: visión, DNA, OCR y segmentación solo dependen del plan
+        # y corren a la vez; HTML estático y tema arrancan en cuanto tienen sus entradas.
+        progress_lock = threading.Lock()
+        progress_max = [20]
+
+        def stage_progress(percent, message):
+            with progress_lock:
+                progress_max[0] = max(progress_max[0], percent)
+                _set_progress(batch_id, progress_max[0], message)
+
+        def vision_stage(r):
+            # Análisis visual profundo con Qwen2-VL (opcional)
             try:
-                from PIL import Image as PILImage
-                if section.get('images'):
-                    p0 = section['images'][0]
-                    im = PILImage.open(p0)
-                    w, h = im.size
-                    ratio = h / float(max(1, w))
-                    if enable_slicing or ratio >= 1.5:
-                        segs = segment_image(p0, assets_dir, precise=bool(precise_slicing))
-                        if segs:
-                            layout_rows = []
-                            images_flat = []
-                            for sp in segs:
-                                copied.append(os.path.basename(sp))
-                                cols = segment_columns(sp, assets_dir, precise=bool(precise_slicing))
-                                if cols:
-                                    widths = []
-                                    total_w = 0
-                                    for c in cols:
-                                        try:
-                                            cim = PILImage.open(c)
-                                            w2, _ = cim.size
-                                            widths.append(w2)
-                                            total_w += w2
-                                        except Exception:
-                                            widths.append(0)
-                                    ratios = []
-                                    ratios_percent = []
-                                    if total_w > 0:
-                                        ratios = [round(w2/float(total_w), 3) for w2 in widths]
-                                        ratios_percent = [int(round(r*100)) for r in ratios]
-                                    row = {
-                                        'segment': os.path.basename(sp),
-                                        'columns': [os.path.basename(c) for c in cols],
-                                        'ratios': ratios,
-                                        'ratios_percent': ratios_percent
-                                    }
-                                    layout_rows.append(row)
-                                    for c in cols:
-                                        images_flat.append(c)
-                                        copied.append(os.path.basename(c))
-                            if images_flat:
-                                section['images'] = images_flat
-                            else:
-                                section['images'] = segs
-                            section['segments'] = [os.path.basename(s) for s in segs]
-                            if layout_rows:
-                                section['layout_rows'] = layout_rows
-                    section['pattern'] = identify_pattern(section)
+                from analyzer import enhance_sections_with_vision, analyze_images_fused, apply_vision_analysis, vision_text
+                if fused and ocr_targets:
+                    stage_progress(22, 'Análisis visual y OCR (Qwen2-VL)')
+                    analyses = analyze_images_fused(ocr_targets, feature_cache=feature_cache)
+                    # Textos ya leídos: la etapa de OCR no vuelve a enviar estas imágenes
+                    texts = {p: vision_text(a) for p, a in analyses.items()}
+                    for i in changed:
+                        if sources[i]:
+                            # Un análisis malformado no debe descartar el texto de las demás
+                            try:
+                                apply_vision_analysis(sections[i], analyses.get(sources[i][0]))
+                            except Exception:
+                                pass
+                    return {p: t for p, t in texts.items() if t is not None}
+                if use_vision and changed:
+                    stage_progress(22, 'Análisis visual profundo')
+                    # Todas las secciones a la vez, hasta los slots paralelos de LM Studio
+                    enhance_sections_with_vision([sections[i] for i in changed], use_qwen2vl=True, feature_cache=feature_cache)
             except Exception:
                 pass
-        _set_progress(batch_id, 65, 'Generando HTML estático')
-        info_md = ''
-        if os.path.isfile(DOC_INFO_PATH):
+            return {}
+
+        def dna_stage(r):
+            dna = extract_design_dna(images, feature_cache=feature_cache)
+            stage_progress(30, 'Extrayendo paleta DNA')
+            return dna
+
+        def ocr_stage(r):
+            targets = ocr_targets
+            if previous is None:
+                ocr_texts, ocr_provider = ({}, '')
+            else:
+                # Textos de las imágenes sin cambios: los de la conversión anterior
+                kept = {p for i in reused for p in sources[i]}
+                ocr_texts = {p: t for p, t in (previous.get('ocr') or {}).items() if p in kept}
+                ocr_provider = '' if targets else (previous.get('result') or {}).get('ocr_provider', '')
+            # Modo fusionado: el texto llegó con el análisis visual
+            fused_texts = r.get('vision') or {}
+            if fused_texts:
+                ocr_texts.update(fused_texts)
+                ocr_provider = 'qwen2-vl'
+                targets = [p for p in targets if p not in fused_texts]
+            if targets:
+                try:
+                    ocr_texts_new, ocr_provider_new = extract_texts(targets)
+                    ocr_texts.update(ocr_texts_new)
+                    ocr_provider = ocr_provider or ocr_provider_new
+                except Exception:
+                    pass
+            stage_progress(40, f'OCR: {ocr_provider or "N/A"}')
+            return ocr_texts, ocr_provider
+
+        def assets_stage(r):
+            os.makedirs(out_dir, exist_ok=True)
+            assets_dir = os.path.join(out_dir, 'assets')
+            os.makedirs(assets_dir, exist_ok=True)
+            copied = {}
+            for i in changed:
+                copied[i] = []
+                for img in sections[i]['images']:
+                    name = os.path.basename(img)
+                    dst = os.path.join(assets_dir, name)
+                    if not os.path.isfile(dst):
+                        with open(img, 'rb') as rf, open(dst, 'wb') as wf:
+                            wf.write(rf.read())
+                    copied[i].append(name)
+            return assets_dir, copied
+
+        def slice_stage(r):
+            assets_dir = r['assets'][0]
+            stage_progress(45, 'Segmentando secciones')
+            layouts = _slice_sections(
+                [sections[i] for i in changed], assets_dir, enable_slicing, precise_slicing, feature_cache, pyramid_slicing,
+                on_section=lambda done, total: stage_progress(45 + (20 * done) // max(1, total), f'Segmentando secciones ({done}/{total})')
+            )
+            return {changed[j]: layout for j, layout in layouts.items()}
+
+        def layout_stage(r):
+            # Se aplica tras la visión para que identify_pattern vea sus resultados
+            assets_dir, copied = r['assets']
+            layouts = r['slice']
+            for i, section in enumerate(sections):
+                if i in reused:
+                    section.clear()
+                    section.update(copy.deepcopy(reused[i]['section']))
+                    copied[i] = list(reused[i].get('files', []))
+                    continue
+                try:
+                    if i in layouts:
+                        copied[i].extend(_slice_section(section, assets_dir, layout=layouts[i]))
+                    section['pattern'] = identify_pattern(section)
+                except Exception:
+                    pass
+            built['sections'] = {
+                s['slug']: {'fingerprint': fingerprints[i], 'sources': sources[i], 'section': copy.deepcopy(s),
+                            'files': sorted(set(copied.get(i, [])))}
+                for i, s in enumerate(sections)
+            }
+            # El tema trabaja sobre su propia copia: el HTML estático lee el plan a la vez
+            return copy.deepcopy(plan)
+
+        def wxr_stage(r):
+            # Exportar contenido WXR (para importador de contenidos) sobre el plan
+            # sin segmentar: el OCR está indexado por las imágenes originales
             try:
-                with open(DOC_INFO_PATH, 'r', encoding='utf-8') as f:
-                    info_md = f.read()
+                _export_wxr(out_dir, wxr_plan, r['ocr'][0])
             except Exception:
-                info_md = ''
-        # Añadir información adicional proveniente de archivos de texto/XML del ZIP
-        if text_files or xml_files:
-            extra_sections = []
-            if text_files:
-                extra_sections.append("## Contenido de texto detectado en el ZIP")
-                for tf in text_files:
-                    try:
-                        with open(tf, 'r', encoding='utf-8', errors='ignore') as rf:
-                            snippet = rf.read(4000)
-                        extra_sections.append(f"### {os.path.basename(tf)}\n\n{snippet}\n")
-                    except Exception:
-                        continue
-            if xml_files:
-                extra_sections.append("## Archivos XML detectados en el ZIP")
-                for xf in xml_files:
-                    base = os.path.basename(xf)
-                    # No volcamos XML completo para no inflar el prompt; sólo un aviso
-                    extra_sections.append(f"- {base}")
-            if extra_sections:
-                info_md = (info_md or '') + "\n\n" + "\n".join(extra_sections)
-        html_path = os.path.join(TEMP_OUT_DIR, 'index.html')
-        css_path = os.path.join(TEMP_OUT_DIR, 'styles.css')
-        title = plan['title']
-        sections_html = []
-        section_files = []
-        for idx, section in enumerate(plan['sections']):
-            section_file = f"{section['slug']}.html"
-            section_files.append(section_file)
-            file_name = os.path.join(TEMP_OUT_DIR, section_file)
-            html_file = open(file_name, 'w', encoding='utf-8')
-            paragraph_texts = []
-            for p in section['images']:
-                t = ocr_texts.get(p, '')
-                if t:
-                    paragraph_texts.append(t)
-            paragraph = '\n\n'.join(paragraph_texts) if paragraph_texts else ''
-            paragraph = paragraph.replace('\n\n', '<br/><br/>')
-            prev_link = ''
-            if idx > 0:
-                prev_chapter_file = f"{plan['sections'][idx-1]['slug']}.html"
-                prev_link = f'<p><a href="{prev_chapter_file}">Anterior</a></p>'
-            next_link = ''
-            if idx < len(plan['sections']) - 1:
-                next_chapter_file = f"{plan['sections'][idx+1]['slug']}.html"
-                next_link = f'<p><a href="{next_chapter_file}">Siguiente</a></p>'
-            content = f"""
+                pass
+
+        def info_stage(r):
+            info_md = ''
+            if os.path.isfile(DOC_INFO_PATH):
+                try:
+                    with open(DOC_INFO_PATH, 'r', encoding='utf-8') as f:
+                        info_md = f.read()
+                except Exception:
+                    info_md = ''
+            # Añadir información adicional proveniente de archivos de texto/XML del ZIP
+            if text_files or xml_files:
+                extra_sections = []
+                if text_files:
+                    extra_sections.append("## Contenido de texto detectado en el ZIP")
+                    for tf in text_files:
+                        try:
+                            with open(tf, 'r', encoding='utf-8', errors='ignore') as rf:
+                                snippet = rf.read(4000)
+                            extra_sections.append(f"### {os.path.basename(tf)}\n\n{snippet}\n")
+                        except Exception:
+                            continue
+                if xml_files:
+                    extra_sections.append("## Archivos XML detectados en el ZIP")
+                    for xf in xml_files:
+                        base = os.path.basename(xf)
+                        # No volcamos XML completo para no inflar el prompt; sólo un aviso
+                        extra_sections.append(f"- {base}")
+                if extra_sections:
+                    info_md = (info_md or '') + "\n\n" + "\n".join(extra_sections)
+            return info_md
+
+        def static_stage(r):
+            ocr_texts = r['ocr'][0]
+            info_md = r['info']
+            stage_progress(65, 'Generando HTML estático')
+            html_path = os.path.join(out_dir, 'index.html')
+            css_path = os.path.join(out_dir, 'styles.css')
+            title = plan['title']
+            sections_html = []
+            section_files = []
+            for idx, section in enumerate(plan['sections']):
+                section_file = f"{section['slug']}.html"
+                section_files.append(section_file)
+                file_name = os.path.join(out_dir, section_file)
+                html_file = open(file_name, 'w', encoding='utf-8')
+                paragraph_texts = []
+                for p in section['images']:
+                    t = ocr_texts.get(p, '')
+                    if t:
+                        paragraph_texts.append(t)
+                paragraph = '\n\n'.join(paragraph_texts) if paragraph_texts else ''
+                paragraph = paragraph.replace('\n\n', '<br/><br/>')
+                prev_link = ''
+                if idx > 0:
+                    prev_chapter_file = f"{plan['sections'][idx-1]['slug']}.html"
+                    prev_link = f'<p><a href="{prev_chapter_file}">Anterior</a></p>'
+                next_link = ''
+                if idx < len(plan['sections']) - 1:
+                    next_chapter_file = f"{plan['sections'][idx+1]['slug']}.html"
+                    next_link = f'<p><a href="{next_chapter_file}">Siguiente</a></p>'
+                content = f"""
 <html>
   <head>
     <link rel=\"stylesheet\" href=\"styles.css\">
@@ -480,11 +1358,11 @@ def _do_convert_async(ctx):
   </body>
 </html>
 """
-            html_file.write(content)
-            html_file.close()
-            imgs_html = ''.join([f'<img src="assets/{os.path.basename(p)}" alt="{section["name"]}">' for p in section['images']])
-            sections_html.append(f'<section id="{section["slug"]}"><h2>{section["label"]}</h2><p><a href="{section_file}">Abrir sección</a></p>{imgs_html}</section>')
-        html_content = f"""
+                html_file.write(content)
+                html_file.close()
+                imgs_html = ''.join([f'<img src="assets/{os.path.basename(p)}" alt="{section["name"]}">' for p in section['images']])
+                sections_html.append(f'<section id="{section["slug"]}"><h2>{section["label"]}</h2><p><a href="{section_file}">Abrir sección</a></p>{imgs_html}</section>')
+            html_content = f"""
 <!doctype html>
 <html lang=\"es\">
 <head>
@@ -502,9 +1380,9 @@ def _do_convert_async(ctx):
 </body>
 </html>
 """
-        with open(html_path, 'w', encoding='utf-8') as hf:
-            hf.write(html_content)
-        css_content = """
+            with open(html_path, 'w', encoding='utf-8') as hf:
+                hf.write(html_content)
+            css_content = """
 :root { --bg: #0b0c0f; --fg: #ffffff; --muted: #a3a3a3; --primary: #4f46e5; }
 * { box-sizing: border-box }
 html, body { height: 100% }
@@ -516,88 +1394,340 @@ h2 { font-size: 22px; margin: 24px 0 12px }
 section { padding: 16px 0; border-top: 1px solid #1f2330 }
 img { max-width: 100%; display: block; border-radius: 8px; margin: 8px 0 }
 """
-        with open(css_path, 'w', encoding='utf-8') as cf:
-            cf.write(css_content)
-        _set_progress(batch_id, 80, 'Construyendo tema FSE')
-        wp_theme_dir = os.path.join(BASE_DIR, 'wp_theme')
-        os.makedirs(wp_theme_dir, exist_ok=True)
-        try:
-            if google_api_key:
-                os.environ['GOOGLE_API_KEY'] = google_api_key
-                if save_env:
-                    _update_env_file(ENV_PATH, 'GOOGLE_API_KEY', google_api_key)
-            if google_application_credentials:
-                os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = google_application_credentials
-                if save_env:
-                    _update_env_file(ENV_PATH, 'GOOGLE_APPLICATION_CREDENTIALS', google_application_credentials)
-            builder = ThemeBuilder(output_dir=wp_theme_dir, context=dna)
-            builder.bootstrap()
-            builder.run_prompt('01_theme_json_full.json')
-            builder.run_prompt('52_template_parts_catalog.json')
-            builder.run_prompt('51_templates_catalog.json')
-            builder.run_prompt('53_patterns_catalog.json')
-            
-            # Construcción mejorada del tema
+            with open(css_path, 'w', encoding='utf-8') as cf:
+                cf.write(css_content)
+
+        def theme_stage(r):
+            plan = r['layout']
+            dna = r['dna']
+            wp_theme_dir = ws['theme']
+            theme_fp = _fingerprint({'plan': plan, 'dna': dna, 'sections': fingerprints})
+            if previous is not None and previous.get('theme') == theme_fp:
+                stage_progress(80, 'Tema FSE sin cambios')
+                return plan, theme_fp, True
+            stage_progress(80, 'Construyendo tema FSE')
+            if previous is not None and removed:
+                # Secciones eliminadas: sus patrones y plantillas no deben sobrevivir
+                import shutil
+                shutil.rmtree(wp_theme_dir, ignore_errors=True)
+                shutil.copytree(THEME_BASE_DIR, wp_theme_dir, ignore=shutil.ignore_patterns(*THEME_COPY_IGNORE))
+            # En otro caso el tema se regenera sobre el árbol existente del lote
+            os.makedirs(wp_theme_dir, exist_ok=True)
             try:
-                from theme_builder import build_complete_theme, generate_theme_screenshot
-                from blocks_builder import setup_css_framework, create_custom_blocks
-                build_complete_theme(
-                wp_theme_dir, 
-                plan, 
-                dna, 
-                images, 
-                theme_name, 
-                theme_description, 
-                theme_slug, 
-                css_framework,
-                theme_version=ctx.get('theme_version', '1.0.0'),
-                theme_author=ctx.get('theme_author', ''),
-                theme_uri=ctx.get('theme_uri', ''),
-                theme_textdomain=ctx.get('theme_textdomain', ''),
-                theme_tags=ctx.get('theme_tags', ''),
-                theme_license=ctx.get('theme_license', 'GPLv2 or later')
-            )
-                # Configurar framework CSS
-                setup_css_framework(wp_theme_dir, css_framework)
-                try:
-                    from theme_builder import apply_typography_and_spacing, update_theme_json_colors
-                    apply_typography_and_spacing(wp_theme_dir, dna, plan)
-                    update_theme_json_colors(wp_theme_dir, dna)
-                except Exception as _e:
-                    pass
-                # Crear bloques personalizados (con prefijo BEM desde theme_slug)
-                create_custom_blocks(wp_theme_dir, css_framework, plan, theme_slug)
-                # Generar screenshot SVG
-                generate_theme_screenshot(wp_theme_dir, plan, dna, theme_name, theme_description)
-                # SEO básico opcional
-                if enable_seo:
-                    _enable_seo_meta(wp_theme_dir)
-            except Exception as e:
-                print(f"Error en construcción del tema: {e}")
-                import traceback
-                traceback.print_exc()
+                if google_api_key:
+                    os.environ['GOOGLE_API_KEY'] = google_api_key
+                    if save_env:
+                        _update_env_file(ENV_PATH, 'GOOGLE_API_KEY', google_api_key)
+                if google_application_credentials:
+                    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = google_application_credentials
+                    if save_env:
+                        _update_env_file(ENV_PATH, 'GOOGLE_APPLICATION_CREDENTIALS', google_application_credentials)
+                builder = ThemeBuilder(output_dir=wp_theme_dir, context=dna)
+                builder.bootstrap()
+                builder.run_prompt('01_theme_json_full.json')
+                builder.run_prompt('52_template_parts_catalog.json')
+                builder.run_prompt('51_templates_catalog.json')
+                builder.run_prompt('53_patterns_catalog.json')
             
-            result = refine_and_generate_wp(TEMP_OUT_DIR, info_md, plan, wp_theme_dir, images=images, dna=dna)
-            used_ai = bool(result.get('used_ai')) if isinstance(result, dict) else False
-            provider = (result.get('provider') if isinstance(result, dict) else '') or ''
+                # Construcción mejorada del tema
+                try:
+                    from theme_builder import build_complete_theme, generate_theme_screenshot
+                    from blocks_builder import setup_css_framework, create_custom_blocks
+                    build_complete_theme(
+                    wp_theme_dir, 
+                    plan, 
+                    dna, 
+                    images, 
+                    theme_name, 
+                    theme_description, 
+                    theme_slug, 
+                    css_framework,
+                    theme_version=ctx.get('theme_version', '1.0.0'),
+                    theme_author=ctx.get('theme_author', ''),
+                    theme_uri=ctx.get('theme_uri', ''),
+                    theme_textdomain=ctx.get('theme_textdomain', ''),
+                    theme_tags=ctx.get('theme_tags', ''),
+                    theme_license=ctx.get('theme_license', 'GPLv2 or later')
+                )
+                    # Configurar framework CSS
+                    setup_css_framework(wp_theme_dir, css_framework)
+                    try:
+                        from theme_builder import apply_typography_and_spacing, update_theme_json_colors
+                        apply_typography_and_spacing(wp_theme_dir, dna, plan)
+                        update_theme_json_colors(wp_theme_dir, dna)
+                    except Exception as _e:
+                        pass
+                    # Crear bloques personalizados (con prefijo BEM desde theme_slug)
+                    create_custom_blocks(wp_theme_dir, css_framework, plan, theme_slug)
+                    # Generar screenshot SVG
+                    generate_theme_screenshot(wp_theme_dir, plan, dna, theme_name, theme_description)
+                    # SEO básico opcional
+                    if enable_seo:
+                        _enable_seo_meta(wp_theme_dir)
+                except Exception as e:
+                    print(f"Error en construcción del tema: {e}")
+                    import traceback
+                    traceback.print_exc()
+            except Exception:
+                return None
+            return plan, theme_fp, False
 
-            # Integrar fuentes personalizadas incluidas en el ZIP (si las hay)
+        def refine_stage(r):
+            if r['theme'] is None:
+                return False, ''
+            plan, theme_fp, theme_reused = r['theme']
+            wp_theme_dir = ws['theme']
+            refine_fp = _fingerprint({
+                'theme': theme_fp,
+                'info': r['info'],
+                'html': [source_digest(os.path.join(out_dir, n)) for n in ('index.html', 'styles.css')],
+            })
+            built['theme'] = theme_fp
+            built['refine'] = refine_fp
+            if theme_reused and previous.get('refine') == refine_fp:
+                stage_progress(90, 'Refinado IA sin cambios')
+                result = previous.get('result') or {}
+                return bool(result.get('used_ai')), result.get('provider') or ''
+            stage_progress(90, 'Refinando tema con IA')
             try:
-                _integrate_fonts_into_theme(wp_theme_dir, fonts)
+                result = refine_and_generate_wp(out_dir, r['info'], plan, wp_theme_dir, images=images, dna=r['dna'])
+                used_ai = bool(result.get('used_ai')) if isinstance(result, dict) else False
+                provider = (result.get('provider') if isinstance(result, dict) else '') or ''
+
+                # Integrar fuentes personalizadas incluidas en el ZIP (si las hay)
+                try:
+                    _integrate_fonts_into_theme(wp_theme_dir, fonts)
+                except Exception:
+                    pass
             except Exception:
-                pass
-        except Exception:
-            used_ai = False
-            provider = ''
+                used_ai = False
+                provider = ''
+            return used_ai, provider
+
+        results = run_stages({
+            'vision': ((), vision_stage),
+            'dna': ((), dna_stage),
+            'ocr': (('vision',) if fused else (), ocr_stage),
+            'info': ((), info_stage),
+            'assets': ((), assets_stage),
+            'slice': (('assets',), slice_stage),
+            'layout': (('assets', 'slice', 'vision'), layout_stage),
+            'wxr': (('ocr',), wxr_stage),
+            'static': (('layout', 'ocr', 'info'), static_stage),
+            'theme': (('layout', 'dna'), theme_stage),
+            'refine': (('theme', 'static', 'info', 'dna'), refine_stage),
+        }, max_workers=STAGE_WORKERS)
+        used_ai, provider = results['refine']
+        ocr_provider = results['ocr'][1]
+        built.update(
+            options=options,
+            ctx={k: v for k, v in ctx.items() if k not in BUILD_VOLATILE_KEYS},
+            ocr=results['ocr'][0],
+            static_html=_tree_fingerprint(out_dir),
+            result={'used_ai': used_ai, 'provider': provider, 'ocr_provider': ocr_provider},
+        )
+        _save_build_manifest(ws, built)
         PROGRESS.setdefault(batch_id, {})
         PROGRESS[batch_id]['used_ai'] = used_ai
         PROGRESS[batch_id]['provider'] = provider
         PROGRESS[batch_id]['ocr_provider'] = ocr_provider
         PROGRESS[batch_id]['saved_env'] = bool(save_env)
         PROGRESS[batch_id]['ready'] = True
-        _set_progress(batch_id, 100, 'Conversión completada')
-    except Exception as e:
+        _set_progress(batch_id, 100, 'Conversión completada', lmstudio=lm_client.state())
+    except Exception:
         _set_progress(batch_id, 100, 'Error en conversión')
+        # La cola registra el trabajo como fallido (FAILED) con el error
+        raise
+    finally:
+        lm_client.remove_listener(lmstudio_changed)
+        feature_cache.clear()
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def _conversion_running(batch_id):
+    """True si el lote tiene una conversión en ejecución (reenviarla se perdería)."""
+    try:
+        job = _get_job_queue().status(batch_id)
+    except Exception:
+        return False
+    return bool(job) and job.get('state') == RUNNING
+
+def _set_queue_position(batch_id, position):
+    _set_progress(batch_id, 1, f'En cola (posición {position})', queue_position=int(position))
+
+def _run_convert_job(ctx):
+    _set_progress(ctx.get('batch_id'), 1, 'Preparando...', queue_position=0)
+    _do_convert_async(ctx)
+
+def _get_job_queue():
+    """Cola de conversiones compartida; al crearla reanuda lo pendiente en SQLite."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue(JOB_DB_PATH, _run_convert_job, workers=JOB_WORKERS,
+                                  max_queued=JOB_QUEUE_MAX, on_position=_set_queue_position,
+                                  secret_keys=('google_api_key', 'google_application_credentials')).start()
+        return _job_queue
+
+def _is_batch_id(batch_id):
+    try:
+        return bool(batch_id) and str(uuid.UUID(batch_id)) == batch_id
+    except Exception:
+        return False
+
+def _valid_batch_id(batch_id):
+    return _is_batch_id(batch_id) and os.path.isdir(os.path.join(UPLOAD_DIR, batch_id))
+
+def _workspace(batch_id=None):
+    """Carpetas de salida de un lote: HTML estático, tema y ZIPs de descarga.
+
+    Sin batch_id devuelve las carpetas globales de siempre (temp_out, wp_theme).
+    """
+    if not batch_id:
+        return {'root': BASE_DIR, 'static': TEMP_OUT_DIR, 'theme': THEME_BASE_DIR, 'dist': BASE_DIR}
+    if not _is_batch_id(batch_id):
+        raise ValueError(f'batch_id no válido: {batch_id!r}')
+    root = os.path.join(WORKSPACES_DIR, batch_id)
+    return {'root': root, 'static': os.path.join(root, 'temp_out'), 'theme': os.path.join(root, 'wp_theme'), 'dist': os.path.join(root, 'dist')}
+
+def _prepare_workspace(batch_id, theme_source=None):
+    """Vacía el espacio del lote y siembra su tema con una copia del tema base."""
+    import shutil
+    ws = _workspace(batch_id)
+    if os.path.isdir(ws['root']):
+        shutil.rmtree(ws['root'], ignore_errors=True)
+    os.makedirs(ws['static'], exist_ok=True)
+    os.makedirs(ws['dist'], exist_ok=True)
+    shutil.copytree(theme_source or THEME_BASE_DIR, ws['theme'], ignore=shutil.ignore_patterns(*THEME_COPY_IGNORE))
+    return ws
+
+def _request_workspace(batch_id=None):
+    """Workspace del lote pedido por ruta o por ?batch_id=; 404 si no existe."""
+    from flask import abort
+    batch_id = batch_id or request.values.get('batch_id') or None
+    try:
+        ws = _workspace(batch_id)
+    except ValueError:
+        abort(404)
+    if batch_id and not os.path.isdir(ws['root']):
+        abort(404)
+    return ws
+
+def _fingerprint(obj):
+    raw = json.dumps(obj, sort_keys=True, default=str, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def _tree_fingerprint(root):
+    """Huella de una carpeta: rutas relativas y sha256 de cada archivo."""
+    entries = []
+    for dirpath, _, files in os.walk(root):
+        for f in files:
+            full = os.path.join(dirpath, f)
+            entries.append((os.path.relpath(full, root).replace(os.sep, '/'), source_digest(full)))
+    return _fingerprint(sorted(entries))
+
+def _section_fingerprint(section):
+    """Huella de las entradas de una sección: identidad y contenido de sus imágenes."""
+    return _fingerprint({
+        'slug': section.get('slug'),
+        'name': section.get('name'),
+        'label': section.get('label'),
+        'images': [source_digest(p) for p in section.get('images', [])],
+    })
+
+def _build_options(ctx):
+    """Huella de las opciones de conversión; si cambia, el lote se reconstruye entero."""
+    options = {k: v for k, v in ctx.items() if k not in BUILD_VOLATILE_KEYS}
+    options['_layout_depth'] = LAYOUT_DEPTH
+    options['_vision'] = os.environ.get('USE_VISION_ANALYSIS', 'true').lower()
+    return _fingerprint(options)
+
+def _load_build_manifest(ws):
+    try:
+        with open(os.path.join(ws['root'], BUILD_MANIFEST), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if isinstance(manifest, dict) and manifest.get('version') == BUILD_MANIFEST_VERSION:
+            return manifest
+    except Exception:
+        pass
+    return None
+
+def _save_build_manifest(ws, manifest):
+    path = os.path.join(ws['root'], BUILD_MANIFEST)
+    tmp = path + '.tmp'
+    try:
+        manifest['version'] = BUILD_MANIFEST_VERSION
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, default=str)
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+def _drop_build_manifest(ws):
+    try:
+        os.remove(os.path.join(ws['root'], BUILD_MANIFEST))
+    except Exception:
+        pass
+
+def _open_workspace(batch_id, options, full_rebuild=False):
+    """
+    Workspace de una conversión y el build.json previo. Se reutiliza tal cual
+    si la conversión anterior terminó con las mismas opciones; si no, se vacía
+    y el manifiesto es None (reconstrucción completa).
+    """
+    ws = _workspace(batch_id)
+    if INCREMENTAL_BUILDS and not full_rebuild and os.path.isfile(os.path.join(ws['theme'], 'theme.json')):
+        manifest = _load_build_manifest(ws)
+        if manifest and manifest.get('options') == options:
+            # Si esta conversión se interrumpe, la siguiente será completa
+            _drop_build_manifest(ws)
+            os.makedirs(ws['static'], exist_ok=True)
+            os.makedirs(ws['dist'], exist_ok=True)
+            return ws, manifest
+    return _prepare_workspace(batch_id), None
+
+def _purge_section_files(out_dir, sections, keep):
+    """Borra los recortes y el HTML de las secciones previas que no se conservan."""
+    assets_dir = os.path.join(out_dir, 'assets')
+    for slug, entry in (sections or {}).items():
+        if slug in keep:
+            continue
+        for name in entry.get('files', []):
+            try:
+                os.remove(os.path.join(assets_dir, os.path.basename(name)))
+            except Exception:
+                pass
+        try:
+            os.remove(os.path.join(out_dir, f"{os.path.basename(slug)}.html"))
+        except Exception:
+            pass
+
+def _sync_tree(src, dst):
+    """Copia en dst solo los archivos de src que cambian y elimina los que ya no existen."""
+    import shutil
+    wanted = set()
+    for dirpath, _, files in os.walk(src):
+        for f in files:
+            rel = os.path.relpath(os.path.join(dirpath, f), src)
+            wanted.add(rel)
+            target = os.path.join(dst, rel)
+            source = os.path.join(dirpath, f)
+            try:
+                if os.path.isfile(target) and source_digest(target) == source_digest(source):
+                    continue
+            except Exception:
+                pass
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+    for dirpath, _, files in os.walk(dst):
+        for f in files:
+            full = os.path.join(dirpath, f)
+            if os.path.relpath(full, dst) not in wanted:
+                try:
+                    os.remove(full)
+                except Exception:
+                    pass
 
 @app.route('/start_convert', methods=['POST'])
 def start_convert():
@@ -617,13 +1747,93 @@ def start_convert():
         'google_api_key': request.form.get('google_api_key') or '',
         'enable_slicing': request.form.get('enable_slicing') or '',
         'precise_slicing': request.form.get('precise_slicing') or '',
+        'pyramid_slicing': request.form.get('pyramid_slicing') or '',
         'save_env': request.form.get('save_env') or '',
         'google_application_credentials': request.form.get('google_application_credentials') or '',
-        'enable_seo': request.form.get('enable_seo') or ''
+        'enable_seo': request.form.get('enable_seo') or '',
+        'full_rebuild': request.form.get('full_rebuild') or ''
     }
-    _set_progress(batch_id, 1, 'Preparando...')
-    t = threading.Thread(target=_do_convert_async, args=(ctx,), daemon=True)
-    t.start()
+    if not _valid_batch_id(batch_id):
+        flash('Lote no encontrado')
+        return redirect(url_for('index'))
+    if _conversion_running(batch_id):
+        flash('Hay una conversión en curso para este lote: espera a que termine y vuelve a enviarla.')
+        return redirect(url_for('progress_ui', batch_id=batch_id))
+    _reset_progress(batch_id)
+    try:
+        position = _get_job_queue().submit(batch_id, ctx)
+    except QueueFull:
+        flash('El servidor está ocupado: demasiadas conversiones en cola. Inténtalo más tarde.')
+        return redirect(url_for('index'))
+    except JobRunning:
+        flash('Hay una conversión en curso para este lote: espera a que termine y vuelve a enviarla.')
+        return redirect(url_for('progress_ui', batch_id=batch_id))
+    if position > 0:
+        _set_queue_position(batch_id, position)
+    return redirect(url_for('progress_ui', batch_id=batch_id))
+
+@app.route('/batch/<batch_id>/images', methods=['POST'])
+def update_batch_images(batch_id):
+    """
+    Sustituye (o añade) capturas de un lote ya convertido y lo reconvierte con
+    las mismas opciones. Gracias a build.json solo se rehacen las secciones
+    cuyas imágenes cambiaron. Campos: images (varios archivos), remove (nombres).
+    """
+    if not _valid_batch_id(batch_id):
+        flash('Lote no encontrado')
+        return redirect(url_for('index'))
+    manifest = _load_build_manifest(_workspace(batch_id))
+    if not manifest or not isinstance(manifest.get('ctx'), dict):
+        flash('El lote todavía no tiene una conversión que actualizar')
+        return redirect(url_for('index'))
+    # Antes de tocar ningún archivo: con el trabajo en marcha el cambio se perdería
+    if _conversion_running(batch_id):
+        flash('Hay una conversión en curso para este lote: espera a que termine y vuelve a enviarla.')
+        return redirect(url_for('progress_ui', batch_id=batch_id))
+    batch_dir = os.path.join(UPLOAD_DIR, batch_id)
+    existing = {}
+    for root, _, files in os.walk(batch_dir):
+        for f in files:
+            if os.path.splitext(f)[1].lower() in SAFE_IMAGE_EXTS:
+                existing.setdefault(f, os.path.join(root, f))
+    for name in request.form.getlist('remove'):
+        path = existing.get(secure_filename(name))
+        if path:
+            try:
+                os.remove(path)
+            except Exception:
+                pass
+    for file in request.files.getlist('images'):
+        name = secure_filename(file.filename or '')
+        if not name or os.path.splitext(name)[1].lower() not in SAFE_IMAGE_EXTS:
+            continue
+        target = existing.get(name) or os.path.join(batch_dir, name)
+        tmp = target + '.subida'
+        file.save(tmp)
+        try:
+            probe_image(tmp)
+            os.replace(tmp, target)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except Exception:
+                pass
+            flash(f'{name} no es una imagen válida')
+    ctx = dict(manifest['ctx'])
+    ctx['batch_id'] = batch_id
+    ctx['google_api_key'] = request.form.get('google_api_key') or ''
+    ctx['google_application_credentials'] = request.form.get('google_application_credentials') or ''
+    _reset_progress(batch_id)
+    try:
+        position = _get_job_queue().submit(batch_id, ctx)
+    except QueueFull:
+        flash('El servidor está ocupado: demasiadas conversiones en cola. Inténtalo más tarde.')
+        return redirect(url_for('index'))
+    except JobRunning:
+        flash('Hay una conversión en curso para este lote: espera a que termine y vuelve a enviarla.')
+        return redirect(url_for('progress_ui', batch_id=batch_id))
+    if position > 0:
+        _set_queue_position(batch_id, position)
     return redirect(url_for('progress_ui', batch_id=batch_id))
 
 @app.route('/progress_ui')
@@ -641,6 +1851,7 @@ def convert():
     google_api_key = request.form.get('google_api_key') or ''
     enable_slicing = request.form.get('enable_slicing') or ''
     precise_slicing = request.form.get('precise_slicing') or ''
+    pyramid_slicing = request.form.get('pyramid_slicing') or ''
     save_env = request.form.get('save_env') or ''
     enable_seo = request.form.get('enable_seo') or ''
     google_application_credentials = request.form.get('google_application_credentials') or ''
@@ -648,9 +1859,11 @@ def convert():
         flash('Falta el identificador del lote')
         return redirect(url_for('index'))
     batch_dir = os.path.join(UPLOAD_DIR, batch_id)
-    if not os.path.isdir(batch_dir):
+    if not _valid_batch_id(batch_id):
         flash('El lote indicado no existe')
         return redirect(url_for('index'))
+    ws = _prepare_workspace(batch_id)
+    out_dir = ws['static']
     images = []
     fonts = []
     text_files = []
@@ -667,10 +1880,16 @@ def convert():
                 text_files.append(full)
             elif ext in SAFE_XML_EXTS:
                 xml_files.append(full)
+    probes = {}
+    for p in list(images):
+        try:
+            probes[p] = probe_image(p)
+        except Exception:
+            images.remove(p)
     if not images:
         flash('El lote no contiene imágenes válidas')
         return redirect(url_for('index'))
-    plan = analyze_images(images)
+    plan = analyze_images(images, probes)
     for s in plan['sections']:
         s['pattern'] = identify_pattern(s)
         try:
@@ -678,18 +1897,19 @@ def convert():
             s['pattern_variant'] = identify_pattern_variant(s)
         except Exception:
             s['pattern_variant'] = ''
-    dna = extract_design_dna(images)
+    feature_cache = FeatureCache()
+    dna = extract_design_dna(images, feature_cache=feature_cache)
     try:
         ocr_texts, ocr_provider = extract_texts(images)
     except Exception:
         ocr_texts, ocr_provider = ({}, '')
     # Exportar contenido WXR (para importador de contenidos)
     try:
-        _export_wxr(TEMP_OUT_DIR, plan, ocr_texts)
+        _export_wxr(out_dir, plan, ocr_texts)
     except Exception:
         pass
-    os.makedirs(TEMP_OUT_DIR, exist_ok=True)
-    assets_dir = os.path.join(TEMP_OUT_DIR, 'assets')
+    os.makedirs(out_dir, exist_ok=True)
+    assets_dir = os.path.join(out_dir, 'assets')
     os.makedirs(assets_dir, exist_ok=True)
     copied = []
     for section in plan['sections']:
@@ -701,61 +1921,16 @@ def convert():
                     wf.write(rf.read())
             copied.append(name)
         try:
-            from PIL import Image as PILImage
-            if section.get('images'):
-                p0 = section['images'][0]
-                im = PILImage.open(p0)
-                w, h = im.size
-                ratio = h / float(max(1, w))
-                if enable_slicing or ratio >= 1.5:
-                    segs = segment_image(p0, assets_dir, precise=bool(precise_slicing))
-                    if segs:
-                        layout_rows = []
-                        images_flat = []
-                        for sp in segs:
-                            copied.append(os.path.basename(sp))
-                            cols = segment_columns(sp, assets_dir, precise=bool(precise_slicing))
-                            if cols:
-                                widths = []
-                                total_w = 0
-                                for c in cols:
-                                    try:
-                                        cim = PILImage.open(c)
-                                        w2, _ = cim.size
-                                        widths.append(w2)
-                                        total_w += w2
-                                    except Exception:
-                                        widths.append(0)
-                                ratios = []
-                                ratios_percent = []
-                                if total_w > 0:
-                                    ratios = [round(w2/float(total_w), 3) for w2 in widths]
-                                    ratios_percent = [int(round(r*100)) for r in ratios]
-                                row = {
-                                    'segment': os.path.basename(sp),
-                                    'columns': [os.path.basename(c) for c in cols],
-                                    'ratios': ratios,
-                                    'ratios_percent': ratios_percent
-                                }
-                                layout_rows.append(row)
-                                for c in cols:
-                                    images_flat.append(c)
-                                    copied.append(os.path.basename(c))
-                        if images_flat:
-                            section['images'] = images_flat
-                        else:
-                            section['images'] = segs
-                        section['segments'] = [os.path.basename(s) for s in segs]
-                        if layout_rows:
-                            section['layout_rows'] = layout_rows
-                section['pattern'] = identify_pattern(section)
-                try:
-                    from analyzer import identify_pattern_variant
-                    section['pattern_variant'] = identify_pattern_variant(section)
-                except Exception:
-                    section['pattern_variant'] = ''
+            copied.extend(_slice_section(section, assets_dir, enable_slicing, precise_slicing, feature_cache, pyramid_slicing))
+            section['pattern'] = identify_pattern(section)
+            try:
+                from analyzer import identify_pattern_variant
+                section['pattern_variant'] = identify_pattern_variant(section)
+            except Exception:
+                section['pattern_variant'] = ''
         except Exception:
             pass
+    feature_cache.clear()
     info_md = ''
     if os.path.isfile(DOC_INFO_PATH):
         try:
@@ -782,8 +1957,8 @@ def convert():
                 extra_sections.append(f"- {base}")
         if extra_sections:
             info_md = (info_md or '') + "\n\n" + "\n".join(extra_sections)
-    html_path = os.path.join(TEMP_OUT_DIR, 'index.html')
-    css_path = os.path.join(TEMP_OUT_DIR, 'styles.css')
+    html_path = os.path.join(out_dir, 'index.html')
+    css_path = os.path.join(out_dir, 'styles.css')
     title = plan['title']
     sections_html = []
 
@@ -792,7 +1967,7 @@ def convert():
     for idx, section in enumerate(plan['sections']):
         section_file = f"{section['slug']}.html"
         section_files.append(section_file)
-        file_name = os.path.join(TEMP_OUT_DIR, section_file)
+        file_name = os.path.join(out_dir, section_file)
         html_file = open(file_name, 'w', encoding='utf-8')
         paragraph_texts = []
         for p in section['images']:
@@ -868,7 +2043,7 @@ img { max-width: 100%; display: block; border-radius: 8px; margin: 8px 0 }
 """
     with open(css_path, 'w', encoding='utf-8') as cf:
         cf.write(css_content)
-    wp_theme_dir = os.path.join(BASE_DIR, 'wp_theme')
+    wp_theme_dir = ws['theme']
     os.makedirs(wp_theme_dir, exist_ok=True)
     try:
         if google_api_key:
@@ -935,16 +2110,16 @@ img { max-width: 100%; display: block; border-radius: 8px; margin: 8px 0 }
             import traceback
             traceback.print_exc()
         
-    result = refine_and_generate_wp(TEMP_OUT_DIR, info_md, plan, wp_theme_dir, images=images, dna=dna)
-    used_ai = bool(result.get('used_ai')) if isinstance(result, dict) else False
-    provider = (result.get('provider') if isinstance(result, dict) else '') or ''
+        result = refine_and_generate_wp(out_dir, info_md, plan, wp_theme_dir, images=images, dna=dna)
+        used_ai = bool(result.get('used_ai')) if isinstance(result, dict) else False
+        provider = (result.get('provider') if isinstance(result, dict) else '') or ''
 
-    # SEO básico opcional
-    if enable_seo:
-        try:
-            _enable_seo_meta(wp_theme_dir)
-        except Exception:
-            pass
+        # SEO básico opcional
+        if enable_seo:
+            try:
+                _enable_seo_meta(wp_theme_dir)
+            except Exception:
+                pass
 
         # Integrar fuentes personalizadas incluidas en el ZIP (si las hay)
         try:
@@ -954,20 +2129,24 @@ img { max-width: 100%; display: block; border-radius: 8px; margin: 8px 0 }
     except Exception:
         used_ai = False
         provider = ''
-    return render_template('done.html', output_dir='temp_out', theme_dir='wp_theme', used_ai=used_ai, saved_env=bool(save_env), provider=provider, ocr_provider=ocr_provider)
+    return render_template('done.html', batch_id=batch_id, output_dir=f'batch/{batch_id}/temp_out', theme_dir=f'batch/{batch_id}/wp_theme', used_ai=used_ai, saved_env=bool(save_env), provider=provider, ocr_provider=ocr_provider)
 
-@app.route('/temp_out/<path:filename>')
-def temp_out_files(filename):
-    return send_from_directory(TEMP_OUT_DIR, filename)
+@app.route('/temp_out/<path:filename>', defaults={'batch_id': None})
+@app.route('/batch/<batch_id>/temp_out/<path:filename>')
+def temp_out_files(filename, batch_id):
+    return send_from_directory(_request_workspace(batch_id)['static'], filename)
 
-@app.route('/wp_theme/<path:filename>')
-def wp_theme_files(filename):
-    return send_from_directory(os.path.join(BASE_DIR, 'wp_theme'), filename)
+@app.route('/wp_theme/<path:filename>', defaults={'batch_id': None})
+@app.route('/batch/<batch_id>/wp_theme/<path:filename>')
+def wp_theme_files(filename, batch_id):
+    return send_from_directory(_request_workspace(batch_id)['theme'], filename)
 
-@app.route('/download_theme', methods=['GET'])
-def download_theme():
-    theme_dir = os.path.join(BASE_DIR, 'wp_theme')
-    zip_path = os.path.join(BASE_DIR, 'wp_theme.zip')
+@app.route('/download_theme', methods=['GET'], defaults={'batch_id': None})
+@app.route('/batch/<batch_id>/download_theme', methods=['GET'])
+def download_theme(batch_id):
+    ws = _request_workspace(batch_id)
+    theme_dir = ws['theme']
+    zip_path = os.path.join(ws['dist'], 'wp_theme.zip')
     import zipfile
     # Empaquetado limpio: sólo archivos necesarios para subir a wp-admin
     exclude_dirs = {
@@ -998,12 +2177,14 @@ def download_theme():
                 full = os.path.join(root, f)
                 arc = os.path.relpath(full, theme_dir)
                 zf.write(full, arc)
-    return send_from_directory(BASE_DIR, 'wp_theme.zip', as_attachment=True)
+    return send_from_directory(ws['dist'], 'wp_theme.zip', as_attachment=True)
 
-@app.route('/download_static', methods=['GET'])
-def download_static():
-    out_dir = TEMP_OUT_DIR
-    zip_path = os.path.join(BASE_DIR, 'static_site.zip')
+@app.route('/download_static', methods=['GET'], defaults={'batch_id': None})
+@app.route('/batch/<batch_id>/download_static', methods=['GET'])
+def download_static(batch_id):
+    ws = _request_workspace(batch_id)
+    out_dir = ws['static']
+    zip_path = os.path.join(ws['dist'], 'static_site.zip')
     import zipfile
     with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
         for root, _, files in os.walk(out_dir):
@@ -1011,32 +2192,36 @@ def download_static():
                 full = os.path.join(root, f)
                 arc = os.path.relpath(full, out_dir)
                 zf.write(full, arc)
-    return send_from_directory(BASE_DIR, 'static_site.zip', as_attachment=True)
+    return send_from_directory(ws['dist'], 'static_site.zip', as_attachment=True)
 
-@app.route('/download_content', methods=['GET'])
-def download_content():
+@app.route('/download_content', methods=['GET'], defaults={'batch_id': None})
+@app.route('/batch/<batch_id>/download_content', methods=['GET'])
+def download_content(batch_id):
     """
     Descarga el export WXR (contenido OCR/plan) generado en temp_out/content.xml
     para importarlo en WordPress (Herramientas > Importar > WordPress).
     """
-    wxr_path = os.path.join(TEMP_OUT_DIR, 'content.xml')
+    ws = _request_workspace(batch_id)
+    wxr_path = os.path.join(ws['static'], 'content.xml')
     if not os.path.isfile(wxr_path):
         flash('No se encontró content.xml. Vuelve a generar el contenido.')
         return redirect(url_for('index'))
-    return send_from_directory(TEMP_OUT_DIR, 'content.xml', as_attachment=True)
+    return send_from_directory(ws['static'], 'content.xml', as_attachment=True)
 
-@app.route('/download_bundle', methods=['GET'])
-def download_bundle():
+@app.route('/download_bundle', methods=['GET'], defaults={'batch_id': None})
+@app.route('/batch/<batch_id>/download_bundle', methods=['GET'])
+def download_bundle(batch_id):
     """
     Descarga un ZIP que contiene:
     - Carpeta 'html/' con todo el sitio estático generado
     - Carpeta 'theme/' con el tema WordPress listo para subir
     Esto permite ajustar primero el HTML y luego reutilizarlo para refinar el tema WP.
     """
-    static_dir = TEMP_OUT_DIR
-    theme_dir = os.path.join(BASE_DIR, 'wp_theme')
+    ws = _request_workspace(batch_id)
+    static_dir = ws['static']
+    theme_dir = ws['theme']
     bundle_name = 'img2html_bundle.zip'
-    bundle_path = os.path.join(BASE_DIR, bundle_name)
+    bundle_path = os.path.join(ws['dist'], bundle_name)
     import zipfile
 
     exclude_dirs = {
@@ -1081,14 +2266,14 @@ def download_bundle():
                     arc = os.path.join('theme', rel)
                     zf.write(full, arc)
 
-    return send_from_directory(BASE_DIR, bundle_name, as_attachment=True)
+    return send_from_directory(ws['dist'], bundle_name, as_attachment=True)
 
 @app.route('/refine_theme_from_html', methods=['POST'])
 def refine_theme_from_html():
     """
     Segunda fase opcional:
     - El usuario sube un ZIP con HTML/CSS ajustado (por ejemplo, el contenido de la carpeta html/ del bundle).
-    - La app reemplaza el contenido de temp_out con ese HTML.
+    - La app reemplaza el HTML del lote (campo batch_id, o un lote nuevo) con ese HTML.
     - Se vuelve a generar/refinar el tema de WordPress usando ese HTML como fuente principal.
     """
     file = request.files.get('html_zip')
@@ -1100,15 +2285,19 @@ def refine_theme_from_html():
     import shutil
 
     # Preparar carpeta temporal para extraer el ZIP
-    batch_id = str(uuid.uuid4())
-    html_batch_dir = os.path.join(UPLOAD_DIR, f'html_refined_{batch_id}')
+    batch_id = request.form.get('batch_id') or ''
+    if not _is_batch_id(batch_id):
+        batch_id = str(uuid.uuid4())
+    html_batch_dir = os.path.join(UPLOAD_DIR, f'html_refined_{uuid.uuid4()}')
     os.makedirs(html_batch_dir, exist_ok=True)
     zip_path = os.path.join(html_batch_dir, secure_filename(file.filename))
     file.save(zip_path)
 
+    # Se extrae aparte para que el propio ZIP no acabe dentro del HTML del lote
+    extract_dir = os.path.join(html_batch_dir, 'zip')
     try:
         with zipfile.ZipFile(zip_path, 'r') as zf:
-            zf.extractall(html_batch_dir)
+            zf.extractall(extract_dir)
     except Exception:
         flash('No se pudo descomprimir el ZIP de HTML/Tema refinado')
         return redirect(url_for('index'))
@@ -1116,8 +2305,8 @@ def refine_theme_from_html():
     # Soportar dos casos:
     # 1) ZIP con carpeta html/ y theme/ (bundle generado por la app)
     # 2) ZIP con un sitio estático "plano" que contenga index.html en cualquier carpeta
-    html_root_candidate = os.path.join(html_batch_dir, 'html')
-    theme_root_candidate = os.path.join(html_batch_dir, 'theme')
+    html_root_candidate = os.path.join(extract_dir, 'html')
+    theme_root_candidate = os.path.join(extract_dir, 'theme')
 
     new_temp_dir = None
     theme_source_dir = None
@@ -1129,7 +2318,7 @@ def refine_theme_from_html():
             theme_source_dir = theme_root_candidate
     else:
         # Buscar index.html en cualquier parte del ZIP
-        for root, _, files in os.walk(html_batch_dir):
+        for root, _, files in os.walk(extract_dir):
             if 'index.html' in files:
                 new_temp_dir = root
                 break
@@ -1138,26 +2327,43 @@ def refine_theme_from_html():
         flash('El ZIP debe contener un index.html (sitio estático refinado)')
         return redirect(url_for('index'))
 
-    # Sustituir el contenido de TEMP_OUT por el HTML refinado
-    try:
-        if os.path.isdir(TEMP_OUT_DIR):
-            shutil.rmtree(TEMP_OUT_DIR)
-        shutil.copytree(new_temp_dir, TEMP_OUT_DIR)
-    except Exception:
-        flash('No se pudo actualizar el HTML base con el contenido refinado')
-        return redirect(url_for('index'))
+    # Si el ZIP incluye una carpeta theme/, usarla como base del tema antes de refinar;
+    # si no, se parchea en su sitio el tema ya generado para el lote (o el tema base si es nuevo)
+    ws = _workspace(batch_id)
+    manifest = None
+    html_fp = _tree_fingerprint(new_temp_dir)
+    in_place = not theme_source_dir and os.path.isfile(os.path.join(ws['theme'], 'theme.json'))
+    if in_place:
+        manifest = _load_build_manifest(ws)
+        # El mismo HTML que ya dio lugar al tema actual: no hay nada que rehacer
+        if INCREMENTAL_BUILDS and manifest and manifest.get('static_html') == html_fp and manifest.get('result'):
+            shutil.rmtree(html_batch_dir, ignore_errors=True)
+            result = manifest['result']
+            return render_template(
+                'done.html',
+                batch_id=batch_id,
+                output_dir=f'batch/{batch_id}/temp_out',
+                theme_dir=f'batch/{batch_id}/wp_theme',
+                used_ai=bool(result.get('used_ai')),
+                saved_env=False,
+                provider=result.get('provider') or '',
+                ocr_provider=result.get('ocr_provider') or ''
+            )
+        _drop_build_manifest(ws)
+        os.makedirs(ws['dist'], exist_ok=True)
+    else:
+        try:
+            ws = _prepare_workspace(batch_id, theme_source=theme_source_dir)
+        except Exception:
+            flash('No se pudo preparar la carpeta del tema a partir del ZIP proporcionado')
+            return redirect(url_for('index'))
+    wp_theme_dir = ws['theme']
 
-    # Si el ZIP incluye una carpeta theme/, usarla como base del tema antes de refinar
-    wp_theme_dir = os.path.join(BASE_DIR, 'wp_theme')
+    # Sustituir el HTML del lote por el HTML refinado (solo los archivos que cambian)
     try:
-        if theme_source_dir and os.path.isdir(theme_source_dir):
-            if os.path.isdir(wp_theme_dir):
-                shutil.rmtree(wp_theme_dir)
-            shutil.copytree(theme_source_dir, wp_theme_dir)
-        else:
-            os.makedirs(wp_theme_dir, exist_ok=True)
+        _sync_tree(new_temp_dir, ws['static'])
     except Exception:
-        flash('No se pudo preparar la carpeta del tema a partir del ZIP proporcionado')
+        flash('No se pudo actualizar el HTML base con el contenido refinado')
         return redirect(url_for('index'))
 
     # Construir un plan mínimo para que el refinador pueda trabajar
@@ -1176,7 +2382,7 @@ def refine_theme_from_html():
 
     # Volver a generar / refinar el tema a partir del nuevo HTML
     result = refine_and_generate_wp(
-        TEMP_OUT_DIR,
+        ws['static'],
         info_md='',
         plan=minimal_plan,
         theme_dir=wp_theme_dir,
@@ -1186,6 +2392,15 @@ def refine_theme_from_html():
     used_ai = bool(result.get('used_ai')) if isinstance(result, dict) else False
     provider = (result.get('provider') if isinstance(result, dict) else '') or ''
 
+    # El tema ya no corresponde al plan de la conversión: la próxima reconstruye el tema
+    manifest = manifest or {}
+    manifest.pop('theme', None)
+    manifest.pop('refine', None)
+    manifest['static_html'] = html_fp
+    manifest['result'] = {'used_ai': used_ai, 'provider': provider, 'ocr_provider': ''}
+    _save_build_manifest(ws, manifest)
+    shutil.rmtree(html_batch_dir, ignore_errors=True)
+
     # Mostrar de nuevo la pantalla de resultado
     PROGRESS.setdefault(batch_id, {})
     PROGRESS[batch_id]['used_ai'] = used_ai
@@ -1196,8 +2411,9 @@ def refine_theme_from_html():
 
     return render_template(
         'done.html',
-        output_dir='temp_out',
-        theme_dir='wp_theme',
+        batch_id=batch_id,
+        output_dir=f'batch/{batch_id}/temp_out',
+        theme_dir=f'batch/{batch_id}/wp_theme',
         used_ai=used_ai,
         saved_env=False,
         provider=provider,
@@ -1228,7 +2444,8 @@ def install_theme():
             flash('No se encontró la instalación de WordPress. Especifica la ruta manualmente.')
             return redirect(url_for('index'))
         
-        theme_dir = os.path.join(BASE_DIR, 'wp_theme')
+        batch_id = request.form.get('batch_id') or ''
+        theme_dir = _workspace(batch_id if _is_batch_id(batch_id) else None)['theme']
         success = install_theme_to_wordpress(theme_dir, wordpress_dir, theme_slug)
         
         if success:
@@ -1241,9 +2458,6 @@ def install_theme():
         flash(f'Error: {str(e)}')
         return redirect(url_for('index'))
 
-if __name__ == '__main__':
-    port = int(os.environ.get('PORT', 8001))
-    app.run(host='0.0.0.0', port=port, debug=True)
 def _update_env_file(path, key, value):
     try:
         if not value:
@@ -1464,3 +2678,29 @@ if (!function_exists('img2html_filter_image_alt')) {
             f.write(content)
     except Exception:
         pass
+
+JOB_QUEUE_AUTOSTART = os.environ.get('IMG2HTML_QUEUE_AUTOSTART', 'true').lower() == 'true'
+
+def _autostart_job_queue():
+    """
+    Reanuda la cola persistente al arrancar la aplicación, no con la primera
+    petición. No se arranca en los procesos hijos de multiprocessing (spawn
+    reimporta el módulo principal) ni con IMG2HTML_QUEUE_AUTOSTART=false.
+    """
+    import multiprocessing
+    if not JOB_QUEUE_AUTOSTART or multiprocessing.parent_process() is not None:
+        return
+    try:
+        _get_job_queue()
+    except Exception:
+        pass
+
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', 8001))
+    # Con el recargador de debug solo el proceso hijo atiende peticiones y reanuda la cola
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        _autostart_job_queue()
+    app.run(host='0.0.0.0', port=port, debug=True)
+else:
+    # Servidor WSGI (gunicorn, waitress...): cada proceso reanuda la cola al importar la app
+    _autostart_job_queue()
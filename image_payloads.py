@@ -0,0 +1,166 @@
+"""
+Caché de imágenes ya codificadas para los modelos de visión.
+
+El análisis visual (analyzer), el OCR (ocr) y el refinado (ai_refine) envían la
+misma captura reducida, en JPEG y en base64. Cada variante se identifica por
+(sha256 del contenido, lado máximo, calidad, formato) y se codifica una sola
+vez: un nivel en memoria acotado por bytes (LRU) la comparte entre etapas,
+hilos y reintentos, y un nivel opcional en disco (una AnalysisCache propia)
+la conserva entre reinicios.
+"""
+import os
+import io
+import base64
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+PAYLOAD_CACHE_MB = int(os.environ.get('IMG2HTML_PAYLOAD_CACHE_MB', 64))
+PAYLOAD_CACHE_PERSIST = os.environ.get('IMG2HTML_PAYLOAD_CACHE_PERSIST', 'false').lower() == 'true'
+PAYLOAD_DISK_MB = int(os.environ.get('IMG2HTML_PAYLOAD_DISK_MB', 512))
+
+
+class PayloadCache:
+    def __init__(self, max_bytes: int, disk=None):
+        self.max_bytes = max(0, int(max_bytes))
+        self.disk = disk
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def get(self, key, produce: Callable[[], str], digest: str = None, params: Optional[Dict] = None) -> str:
+        """Variante guardada bajo key; si no existe se produce una sola vez aunque la pidan varios hilos."""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            gate = self._inflight.setdefault(key, threading.Lock())
+        with gate:
+            with self._lock:
+                value = self._lookup(key)
+                if value is not None:
+                    self.hits += 1
+                    return value
+            try:
+                if self.disk is not None and digest:
+                    try:
+                        value = self.disk.get('payload', digest, params)
+                    except Exception:
+                        value = None
+                    if value is not None:
+                        with self._lock:
+                            self.disk_hits += 1
+                if value is None:
+                    value = produce()
+                    with self._lock:
+                        self.misses += 1
+                    if self.disk is not None and digest and value:
+                        try:
+                            self.disk.put('payload', digest, value, params)
+                        except Exception:
+                            pass
+                with self._lock:
+                    self._store(key, value)
+                return value
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+    def _lookup(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def _store(self, key, value):
+        size = len(value)
+        if not value or size > self.max_bytes:
+            return
+        if key in self._items:
+            self._bytes -= len(self._items.pop(key))
+        self._items[key] = value
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._items:
+            _, old = self._items.popitem(last=False)
+            self._bytes -= len(old)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'persistent': self.disk is not None,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_payload_cache() -> PayloadCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            disk = None
+            if PAYLOAD_CACHE_PERSIST:
+                try:
+                    from analysis_cache import AnalysisCache, CACHE_DIR
+                    disk = AnalysisCache(os.path.join(CACHE_DIR, 'payloads.sqlite3'), PAYLOAD_DISK_MB * 1024 * 1024)
+                except Exception:
+                    disk = None
+            _cache = PayloadCache(PAYLOAD_CACHE_MB * 1024 * 1024, disk)
+        return _cache
+
+
+def _encode(path: str, max_side: int, quality: int, fmt: str, load=None) -> str:
+    from PIL import Image
+    img = load() if load is not None else None
+    if img is None:
+        try:
+            # En JPEG se decodifica ya reducida (Image.draft)
+            from analyzer import open_reduced
+            img = open_reduced(path, max_side)
+        except ImportError:
+            img = Image.open(path)
+    if fmt == 'JPEG' and img.mode != 'RGB':
+        img = img.convert('RGB')
+    if max(img.size) > max_side:
+        ratio = max_side / max(img.size)
+        new_size = (int(img.size[0] * ratio), int(img.size[1] * ratio))
+        img = img.resize(new_size, Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    img.save(output, format=fmt, quality=quality, optimize=True)
+    return base64.b64encode(output.getvalue()).decode('utf-8')
+
+
+def encoded_image(path: str, max_side: int, quality: int = 85, fmt: str = 'JPEG',
+                  load: Optional[Callable] = None) -> str:
+    """
+    Imagen reducida a max_side, codificada en fmt y en base64. load() puede
+    devolver la imagen ya decodificada (p. ej. de FeatureCache); solo se llama
+    si la variante no está en caché. Lanza excepción si no se puede codificar.
+    """
+    fmt = fmt.upper()
+    try:
+        from analyzer import source_digest
+        digest = source_digest(path)
+    except Exception:
+        digest = None
+    if digest is None:
+        return _encode(path, max_side, quality, fmt, load)
+    params = {'max_side': int(max_side), 'quality': int(quality), 'format': fmt}
+    key = (digest, params['max_side'], params['quality'], fmt)
+    return get_payload_cache().get(key, lambda: _encode(path, max_side, quality, fmt, load), digest, params)
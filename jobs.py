@@ -0,0 +1,349 @@
+"""
+Cola de trabajos persistente para las conversiones.
+
+Un número fijo de hilos consume una cola FIFO guardada en SQLite; los trabajos
+encolados o interrumpidos por un reinicio del proceso se reanudan al arrancar.
+Varios procesos pueden compartir la misma base (WSGI con varios workers): cada
+trabajo se reclama de forma atómica, queda a nombre del proceso que lo ejecuta
+y solo vuelve a la cola si ese proceso ha muerto o deja de dar señales de vida.
+Dentro de cada trabajo, run_stages ejecuta en paralelo las etapas independientes.
+"""
+import os
+import json
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT UNIQUE NOT NULL,
+    ctx TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    error TEXT,
+    owner TEXT,
+    heartbeat REAL
+)
+"""
+# Segundos entre latidos de los trabajos en ejecución; sin latido durante
+# JOB_STALE se considera que su proceso murió y el trabajo se reencola
+JOB_HEARTBEAT = 15
+JOB_STALE = 4 * JOB_HEARTBEAT
+
+
+def _owner_alive(owner: Optional[str]) -> Optional[bool]:
+    """
+    ¿Sigue vivo el proceso dueño ('host:pid:token')? None si no se puede
+    saber (otra máquina, Windows): entonces decide el latido.
+    """
+    parts = (owner or '').split(':')
+    if len(parts) != 3 or os.name != 'posix' or parts[0] != socket.gethostname():
+        return None
+    try:
+        pid = int(parts[1])
+    except ValueError:
+        return None
+    if pid == os.getpid():
+        # Mismo pid con otro token: un proceso anterior que ya no existe
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobRunning(Exception):
+    """El trabajo ya está en ejecución: reenviarlo no lo repetiría con las entradas nuevas."""
+
+
+class JobQueue:
+    """Planificador con `workers` hilos sobre una tabla `jobs` en SQLite.
+
+    `runner(ctx)` ejecuta el trabajo; `on_position(job_id, position)` se llama
+    cuando cambia la posición en cola (1 = siguiente en ejecutarse).
+    Las claves de `secret_keys` se guardan solo en memoria: un trabajo reanudado
+    tras reiniciar las recibe vacías y usa las del entorno (.env).
+    """
+
+    def __init__(self, db_path: str, runner: Callable[[Dict], None], workers: int = 2,
+                 max_queued: int = 100, max_attempts: int = 2,
+                 on_position: Optional[Callable[[str, int], None]] = None,
+                 secret_keys=()):
+        self.db_path = db_path
+        self.runner = runner
+        self.workers = max(1, int(workers or 1))
+        self.max_queued = max(1, int(max_queued or 1))
+        self.max_attempts = max(1, int(max_attempts or 1))
+        self.on_position = on_position
+        self.secret_keys = tuple(secret_keys or ())
+        self._secrets = {}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopped = False
+        self._halt = threading.Event()
+        self._owner = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._db() as db:
+            db.execute(_SCHEMA)
+            # Bases creadas antes de que los trabajos tuvieran dueño
+            columns = {row[1] for row in db.execute('PRAGMA table_info(jobs)')}
+            for column, kind in (('owner', 'TEXT'), ('heartbeat', 'REAL')):
+                if column not in columns:
+                    db.execute(f'ALTER TABLE jobs ADD COLUMN {column} {kind}')
+
+    def _db(self):
+        db = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return _Closing(db)
+
+    def start(self):
+        """Reencola los trabajos interrumpidos y arranca los hilos (idempotente)."""
+        with self._cond:
+            if self._threads:
+                return self
+            self._stopped = False
+            self._halt.clear()
+            self._requeue_stale()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f'img2html-job-{i}', daemon=True)
+                t.start()
+                self._threads.append(t)
+            t = threading.Thread(target=self._beat, name='img2html-job-heartbeat', daemon=True)
+            t.start()
+            self._threads.append(t)
+            self._cond.notify_all()
+        self._publish_positions()
+        return self
+
+    def _requeue_stale(self):
+        """
+        Lo que estaba en ejecución en un proceso caído vuelve a la cola
+        conservando su orden original; tras max_attempts se da por fallido.
+        Los trabajos de procesos vivos (latido reciente) no se tocan.
+        """
+        now = time.time()
+        with self._db() as db:
+            rows = db.execute("SELECT seq, owner, heartbeat, attempts FROM jobs WHERE state=?", (RUNNING,)).fetchall()
+            for row in rows:
+                if row['owner'] == self._owner:
+                    continue
+                alive = _owner_alive(row['owner'])
+                if alive or (alive is None and row['heartbeat'] and now - row['heartbeat'] < JOB_STALE):
+                    continue
+                if row['attempts'] >= self.max_attempts:
+                    db.execute("UPDATE jobs SET state=?, finished=?, error=?, owner=NULL WHERE seq=? AND state=? AND owner IS ?",
+                               (FAILED, now, 'interrumpido', row['seq'], RUNNING, row['owner']))
+                else:
+                    db.execute("UPDATE jobs SET state=?, started=NULL, owner=NULL WHERE seq=? AND state=? AND owner IS ?",
+                               (QUEUED, row['seq'], RUNNING, row['owner']))
+
+    def _beat(self):
+        """Latido de los trabajos de este proceso y rescate periódico de los abandonados."""
+        # Un Event propio: los avisos de submit() no despiertan al latido
+        while not self._halt.wait(JOB_HEARTBEAT):
+            try:
+                with self._db() as db:
+                    db.execute("UPDATE jobs SET heartbeat=? WHERE owner=? AND state=?", (time.time(), self._owner, RUNNING))
+                self._requeue_stale()
+            except Exception:
+                continue
+            with self._cond:
+                self._cond.notify_all()
+
+    def stop(self, timeout: float = 5.0):
+        with self._cond:
+            self._stopped = True
+            self._halt.set()
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def submit(self, job_id: str, ctx: Dict) -> int:
+        """
+        Encola un trabajo y devuelve su posición. Reenviar un id en cola no lo
+        duplica pero actualiza su ctx; si ya se está ejecutando lanza JobRunning.
+        """
+        secrets = {k: ctx.get(k) for k in self.secret_keys if ctx.get(k)}
+        stored = {k: v for k, v in ctx.items() if k not in self.secret_keys}
+        with self._cond:
+            with self._db() as db:
+                row = db.execute("SELECT state FROM jobs WHERE job_id=?", (job_id,)).fetchone()
+                if row is not None and row['state'] == RUNNING:
+                    raise JobRunning(job_id)
+                if row is not None and row['state'] == QUEUED:
+                    db.execute("UPDATE jobs SET ctx=? WHERE job_id=? AND state=?", (json.dumps(stored), job_id, QUEUED))
+                    if secrets:
+                        self._secrets[job_id] = secrets
+                    return self.position(job_id)
+                queued = db.execute("SELECT COUNT(*) FROM jobs WHERE state=?", (QUEUED,)).fetchone()[0]
+                if queued >= self.max_queued:
+                    raise QueueFull(job_id)
+                # Un trabajo terminado que se vuelve a lanzar pasa al final de la cola
+                db.execute("DELETE FROM jobs WHERE job_id=?", (job_id,))
+                db.execute("INSERT INTO jobs (job_id, ctx, state, created) VALUES (?, ?, ?, ?)",
+                           (job_id, json.dumps(stored), QUEUED, time.time()))
+            if secrets:
+                self._secrets[job_id] = secrets
+            self._cond.notify_all()
+        self._publish_positions()
+        return self.position(job_id)
+
+    def position(self, job_id: str) -> int:
+        """1..N si está en cola, 0 si se está ejecutando o ya terminó, -1 si no existe."""
+        with self._db() as db:
+            row = db.execute("SELECT seq, state FROM jobs WHERE job_id=?", (job_id,)).fetchone()
+            if row is None:
+                return -1
+            if row['state'] != QUEUED:
+                return 0
+            ahead = db.execute("SELECT COUNT(*) FROM jobs WHERE state=? AND seq<?", (QUEUED, row['seq'])).fetchone()[0]
+        return int(ahead) + 1
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        with self._db() as db:
+            row = db.execute("SELECT job_id, state, attempts, created, started, finished, error FROM jobs WHERE job_id=?",
+                             (job_id,)).fetchone()
+        if row is None:
+            return None
+        st = dict(row)
+        st['position'] = self.position(job_id) if st['state'] == QUEUED else 0
+        return st
+
+    def _claim(self):
+        # BEGIN IMMEDIATE: otro proceso sobre la misma base no puede reclamar
+        # el mismo trabajo entre la lectura y la actualización
+        with self._db() as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                row = db.execute("SELECT seq, job_id, ctx FROM jobs WHERE state=? ORDER BY seq LIMIT 1", (QUEUED,)).fetchone()
+                claimed = 0
+                if row is not None:
+                    now = time.time()
+                    claimed = db.execute("UPDATE jobs SET state=?, started=?, attempts=attempts+1, owner=?, heartbeat=? WHERE seq=? AND state=?",
+                                         (RUNNING, now, self._owner, now, row['seq'], QUEUED)).rowcount
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+        if not claimed:
+            return None
+        try:
+            ctx = json.loads(row['ctx'])
+        except Exception:
+            ctx = {}
+        ctx.update(self._secrets.pop(row['job_id'], {}))
+        return row['job_id'], ctx
+
+    def _finish(self, job_id, error=None):
+        with self._db() as db:
+            db.execute("UPDATE jobs SET state=?, finished=?, error=? WHERE job_id=? AND owner=?",
+                       (FAILED if error else DONE, time.time(), error, job_id, self._owner))
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopped:
+                    try:
+                        job = self._claim()
+                    except Exception:
+                        job = None
+                    if job is not None:
+                        break
+                    self._cond.wait(5.0)
+                if self._stopped:
+                    return
+            self._publish_positions()
+            job_id, ctx = job
+            try:
+                self.runner(ctx)
+                self._finish(job_id)
+            except Exception as e:
+                try:
+                    self._finish(job_id, str(e) or e.__class__.__name__)
+                except Exception:
+                    pass
+
+    def _publish_positions(self):
+        if not self.on_position:
+            return
+        try:
+            with self._db() as db:
+                rows = db.execute("SELECT job_id FROM jobs WHERE state=? ORDER BY seq", (QUEUED,)).fetchall()
+            for i, row in enumerate(rows):
+                self.on_position(row['job_id'], i + 1)
+        except Exception:
+            pass
+
+
+class _Closing:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        return self.db
+
+    def __exit__(self, *exc):
+        self.db.close()
+        return False
+
+
+def run_stages(stages: Dict, max_workers: Optional[int] = None) -> Dict:
+    """Ejecuta un grafo de etapas `{nombre: (dependencias, fn)}` sobre un pool de hilos.
+
+    Cada `fn` recibe un dict con los resultados de sus dependencias y su valor se
+    guarda bajo su nombre. Una etapa arranca en cuanto terminan sus dependencias;
+    si una falla ya no se lanzan etapas nuevas y el error se relanza al terminar
+    las que estaban en marcha.
+    """
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+    for name, (deps, _) in stages.items():
+        missing = [d for d in deps if d not in stages]
+        if missing:
+            raise ValueError(f'La etapa {name} depende de etapas inexistentes: {missing}')
+    results = {}
+    pending = dict(stages)
+    running = {}
+    error = None
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers or len(stages) or 1)), thread_name_prefix='img2html-stage') as pool:
+        while pending or running:
+            if error is None:
+                for name, (deps, fn) in list(pending.items()):
+                    if all(d in results for d in deps):
+                        del pending[name]
+                        running[pool.submit(fn, {d: results[d] for d in deps})] = name
+            if not running:
+                if error is None and pending:
+                    raise ValueError(f'Dependencias circulares entre etapas: {sorted(pending)}')
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                try:
+                    results[name] = fut.result()
+                except Exception as e:
+                    if error is None:
+                        error = e
+    if error is not None:
+        raise error
+    return results
@@ -0,0 +1,250 @@
+"""
+Cliente compartido para la API de LM Studio (compatible con OpenAI).
+
+Todas las peticiones de visión y OCR pasan por una única requests.Session con
+keep-alive y pool de conexiones. Un semáforo limita las peticiones simultáneas
+a los slots paralelos del servidor (LM_STUDIO_PARALLEL); cada petición lleva
+timeout de conexión y de lectura, y los errores de conexión y las respuestas
+429/5xx se reintentan con backoff exponencial y jitter.
+
+Un circuit breaker evita las cascadas de timeouts cuando el servidor está caído
+o cargando el modelo: una sonda GET /v1/models comprueba el endpoint y, tras
+LM_STUDIO_BREAKER_FAILURES fallos seguidos (o una sonda fallida), todas las
+llamadas se cortan en el acto durante LM_STUDIO_BREAKER_COOLDOWN segundos para
+que visión y OCR pasen directamente a sus alternativas (Tesseract...).
+"""
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+DEFAULT_ENDPOINT = 'http://localhost:1234/v1/chat/completions'
+DEFAULT_MODEL = 'qwen2-vl-7b-instruct'
+# Peticiones simultáneas: igualar a los slots paralelos configurados en LM Studio
+LM_STUDIO_PARALLEL = int(os.environ.get('LM_STUDIO_PARALLEL', 4))
+LM_STUDIO_RETRIES = int(os.environ.get('LM_STUDIO_RETRIES', 2))
+LM_STUDIO_BACKOFF = float(os.environ.get('LM_STUDIO_BACKOFF', 0.5))
+LM_STUDIO_CONNECT_TIMEOUT = float(os.environ.get('LM_STUDIO_CONNECT_TIMEOUT', 5))
+RETRY_STATUS = (429, 500, 502, 503, 504)
+LM_STUDIO_BREAKER_FAILURES = int(os.environ.get('LM_STUDIO_BREAKER_FAILURES', 3))
+LM_STUDIO_BREAKER_COOLDOWN = float(os.environ.get('LM_STUDIO_BREAKER_COOLDOWN', 60))
+LM_STUDIO_PROBE_TIMEOUT = float(os.environ.get('LM_STUDIO_PROBE_TIMEOUT', 3))
+# Segundos durante los que se da por buena la última sonda correcta
+LM_STUDIO_PROBE_TTL = float(os.environ.get('LM_STUDIO_PROBE_TTL', 30))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpen(Exception):
+    """LM Studio marcado como no disponible: la llamada ni se intenta."""
+
+
+def endpoint() -> str:
+    return os.environ.get('LM_STUDIO_ENDPOINT', DEFAULT_ENDPOINT)
+
+
+def model_name() -> str:
+    return os.environ.get('LM_STUDIO_MODEL', DEFAULT_MODEL)
+
+
+def models_url(url: Optional[str] = None) -> str:
+    """URL de GET /v1/models a partir del endpoint de chat/completions."""
+    url = (url or endpoint()).rstrip('/')
+    for suffix in ('/chat/completions', '/completions'):
+        if url.endswith(suffix):
+            return url[:-len(suffix)] + '/models'
+    return url + '/models'
+
+
+def message_content(response) -> str:
+    """Texto de la primera respuesta de un chat/completions ('' si no hay)."""
+    try:
+        choices = response.json().get('choices') or [{}]
+        return (choices[0].get('message', {}).get('content', '') or '').strip()
+    except Exception:
+        return ''
+
+
+class LMStudioClient:
+    def __init__(self, parallel: int = LM_STUDIO_PARALLEL, retries: int = LM_STUDIO_RETRIES,
+                 backoff: float = LM_STUDIO_BACKOFF, connect_timeout: float = LM_STUDIO_CONNECT_TIMEOUT,
+                 max_failures: int = LM_STUDIO_BREAKER_FAILURES, cooldown: float = LM_STUDIO_BREAKER_COOLDOWN):
+        self.parallel = max(1, int(parallel or 1))
+        self.retries = max(0, int(retries or 0))
+        self.backoff = max(0.0, float(backoff or 0))
+        self.connect_timeout = float(connect_timeout or 5)
+        self.max_failures = max(1, int(max_failures or 1))
+        self.cooldown = max(0.0, float(cooldown or 0))
+        self._slots = threading.BoundedSemaphore(self.parallel)
+        self._session = None
+        self._lock = threading.Lock()
+        # Estado del circuit breaker
+        self._breaker = threading.Lock()
+        self._failures = 0
+        self._opened_until = 0.0
+        self._probed_at = 0.0
+        self._last_error = ''
+        self._listeners = []
+        self._probing = threading.Lock()
+
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                # Una conexión reutilizable por slot del servidor
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.parallel)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+
+    def add_listener(self, fn: Callable[[Dict], None]):
+        """fn(state()) se llama cada vez que el circuito se abre o se cierra."""
+        with self._breaker:
+            self._listeners.append(fn)
+
+    def remove_listener(self, fn):
+        with self._breaker:
+            if fn in self._listeners:
+                self._listeners.remove(fn)
+
+    def _state_locked(self, now: float) -> Dict:
+        if self._opened_until > now:
+            state = OPEN
+        elif self._opened_until:
+            state = HALF_OPEN
+        else:
+            state = CLOSED
+        return {
+            'state': state,
+            'failures': self._failures,
+            'retry_in': max(0, int(round(self._opened_until - now))) if state == OPEN else 0,
+            'last_error': self._last_error,
+        }
+
+    def state(self) -> Dict:
+        with self._breaker:
+            return self._state_locked(time.time())
+
+    def _notify(self):
+        state = self.state()
+        with self._breaker:
+            listeners = list(self._listeners)
+        for fn in listeners:
+            try:
+                fn(state)
+            except Exception:
+                pass
+
+    def _record_success(self):
+        with self._breaker:
+            changed = bool(self._opened_until)
+            self._failures = 0
+            self._opened_until = 0.0
+            self._probed_at = time.time()
+            self._last_error = ''
+        if changed:
+            self._notify()
+
+    def _record_failure(self, error: str, trip: bool = False):
+        now = time.time()
+        with self._breaker:
+            self._failures += 1
+            self._last_error = error
+            # En semiabierto basta un fallo para volver a abrir
+            opening = (trip or self._failures >= self.max_failures or bool(self._opened_until)) and self._opened_until <= now
+            if opening:
+                self._opened_until = now + self.cooldown
+                self._probed_at = 0.0
+        if opening:
+            self._notify()
+
+    def probe(self) -> bool:
+        """GET /v1/models con timeout corto; un fallo abre el circuito directamente."""
+        try:
+            response = self.session().get(models_url(), timeout=(self.connect_timeout, LM_STUDIO_PROBE_TIMEOUT))
+            if response.status_code == 200:
+                self._record_success()
+                return True
+            error = f'HTTP {response.status_code} en /v1/models'
+        except Exception as e:
+            error = e.__class__.__name__
+        self._record_failure(error, trip=True)
+        return False
+
+    def available(self) -> bool:
+        """False mientras el circuito está abierto; si hace falta, sondea el endpoint."""
+        # Una sola sonda a la vez: el resto de hilos espera y reutiliza su resultado
+        with self._probing:
+            now = time.time()
+            with self._breaker:
+                if self._opened_until > now:
+                    return False
+                if self._probed_at and now - self._probed_at < LM_STUDIO_PROBE_TTL:
+                    return True
+            return self.probe()
+
+    def _sleep(self, attempt: int):
+        # Backoff exponencial con jitter completo: evita que los hilos reintenten a la vez
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def post(self, payload: Dict, timeout: float = 60, url: Optional[str] = None):
+        """
+        POST JSON al endpoint ocupando un slot. Devuelve la última respuesta
+        (el llamador revisa status_code) o relanza el último error de red.
+        Un timeout de lectura no se reintenta: el servidor ya está ocupado.
+        Con el circuito abierto lanza CircuitOpen sin tocar la red.
+        """
+        import requests
+        url = url or endpoint()
+        session = self.session()
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._sleep(attempt - 1)
+            if not self.available():
+                raise CircuitOpen(self.state().get('last_error') or 'LM Studio no disponible')
+            try:
+                with self._slots:
+                    response = session.post(url, json=payload, timeout=(self.connect_timeout, timeout))
+            except requests.exceptions.ReadTimeout:
+                self._record_failure('timeout')
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._record_failure(e.__class__.__name__)
+                last_error = e
+                continue
+            if response.status_code >= 500 or response.status_code == 429:
+                self._record_failure(f'HTTP {response.status_code}')
+                if response.status_code in RETRY_STATUS and attempt < self.retries:
+                    continue
+            else:
+                self._record_success()
+            return response
+        raise last_error
+
+    def map(self, fn: Callable, items: Iterable) -> List:
+        """fn(item) para todos los elementos en paralelo (tantos hilos como slots), en orden."""
+        items = list(items)
+        if len(items) <= 1 or self.parallel <= 1:
+            return [fn(item) for item in items]
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(self.parallel, len(items)), thread_name_prefix='img2html-lmstudio') as pool:
+            return list(pool.map(fn, items))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client() -> LMStudioClient:
+    """Cliente del proceso, compartido por el análisis visual y el OCR."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LMStudioClient()
+        return _client
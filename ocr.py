@@ -1,8 +1,11 @@
 import os
 import base64
-from typing import Dict, List
+import hashlib
+from typing import Dict, List, Optional
 import multiprocessing
 import io
+from lmstudio import get_client, message_content, CircuitOpen
+from image_payloads import encoded_image
 
 SAFE_IMAGE_EXTS = {'.png', '.jpg', '.jpeg', '.webp', '.gif'}
 
@@ -17,143 +20,124 @@ def _is_safe_image_path(p: str) -> bool:
     except Exception:
         return False
 
-def _qwen2_vl(paths: List[str]) -> Dict[str, str]:
+def _open_reduced(path: str, max_side: int):
+    """RGB con el lado mayor acotado; en JPEG decodifica ya reducido (Image.draft)."""
+    try:
+        from analyzer import open_reduced
+        return open_reduced(path, max_side)
+    except ImportError:
+        from PIL import Image
+        return Image.open(path).convert('RGB')
+
+QWEN2_VL_OCR_PROMPT = "Extract all text visible in this image. Return only the text content, nothing else. If there is no text, return an empty string."
+# Forma parte de la clave de la caché OCR: cambiar el prompt invalida los textos guardados
+QWEN2_VL_OCR_PROMPT_VERSION = hashlib.sha256(QWEN2_VL_OCR_PROMPT.encode('utf-8')).hexdigest()[:12]
+
+def _qwen2_vl_one(client, p: str) -> Optional[str]:
     """
-    Extrae texto de imágenes usando Qwen2 VL 7B Instruct a través de la API REST de LM Studio.
-    El endpoint por defecto es http://localhost:1234/v1/chat/completions
+    Texto de una imagen con Qwen2 VL; '' si no es una imagen válida. None si
+    LM Studio no respondió (circuito abierto, error de red o HTTP): esa imagen
+    debe pasar al fallback, no contarse como "sin texto".
     """
-    out: Dict[str, str] = {}
-    
     try:
-        import requests
-        from PIL import Image
-    except ImportError:
-        return {}
-    
-    # Obtener el endpoint de LM Studio desde variables de entorno o usar el predeterminado
-    lm_studio_endpoint = os.environ.get('LM_STUDIO_ENDPOINT', 'http://localhost:1234/v1/chat/completions')
-    
-    prompt = "Extract all text visible in this image. Return only the text content, nothing else. If there is no text, return an empty string."
-    
-    for p in paths:
+        # Validar que el archivo existe y es una imagen válida
+        if not _is_safe_image_path(p):
+            return ''
+        
+        # Imagen reducida (máx 2048px para OCR) en JPEG y base64, compartida por caché
+        mime_type = 'image/jpeg'
         try:
-            # Validar que el archivo existe y es una imagen válida
-            if not _is_safe_image_path(p):
-                out[p] = ''
-                continue
-            
-            # Optimizar imagen antes de enviar (redimensionar si es muy grande)
-            try:
-                img = Image.open(p).convert('RGB')
-                # Redimensionar si es muy grande (máx 2048px para OCR)
-                max_size = 2048
-                if max(img.size) > max_size:
-                    ratio = max_size / max(img.size)
-                    new_size = (int(img.size[0] * ratio), int(img.size[1] * ratio))
-                    img = img.resize(new_size, Image.Resampling.LANCZOS)
-                
-                # Comprimir a JPEG
-                output = io.BytesIO()
-                img.save(output, format='JPEG', quality=90, optimize=True)
-                output.seek(0)
-                image_data = output.read()
-            except Exception:
-                # Fallback: leer imagen original
-                with open(p, 'rb') as f:
-                    image_data = f.read()
-            
-            # Convertir a base64
-            image_base64 = base64.b64encode(image_data).decode('utf-8')
-            
-            # Determinar el tipo MIME de la imagen
+            image_base64 = encoded_image(p, 2048, quality=90)
+        except Exception:
+            # Fallback: enviar la imagen original con su tipo MIME
+            with open(p, 'rb') as f:
+                image_base64 = base64.b64encode(f.read()).decode('utf-8')
             img_ext = os.path.splitext(p)[1].lower()
-            mime_type = 'image/jpeg'
             if img_ext == '.png':
                 mime_type = 'image/png'
             elif img_ext == '.webp':
                 mime_type = 'image/webp'
             elif img_ext == '.gif':
                 mime_type = 'image/gif'
-            
-            # Obtener el nombre del modelo desde variables de entorno o usar el predeterminado
-            model_name = os.environ.get('LM_STUDIO_MODEL', 'qwen2-vl-7b-instruct')
-            
-            # Preparar el payload para la API de LM Studio (formato compatible con OpenAI)
-            payload = {
+        
+        # Obtener el nombre del modelo desde variables de entorno o usar el predeterminado
+        model_name = os.environ.get('LM_STUDIO_MODEL', 'qwen2-vl-7b-instruct')
+        
+        # Preparar el payload para la API de LM Studio (formato compatible con OpenAI)
+        payload = {
+            "model": model_name,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:{mime_type};base64,{image_base64}"
+                            }
+                        },
+                        {
+                            "type": "text",
+                            "text": QWEN2_VL_OCR_PROMPT
+                        }
+                    ]
+                }
+            ],
+            "max_tokens": 512,
+            "temperature": 0.1
+        }
+        
+        # Petición a la API de LM Studio (sesión compartida, con reintentos)
+        try:
+            response = client.post(payload, timeout=60)
+        except Exception:
+            return None
+        if response.status_code == 200:
+            return message_content(response)
+        # Si falla la petición, intentar sin el formato de imagen (fallback)
+        # Algunas versiones de LM Studio pueden requerir un formato diferente
+        try:
+            payload_alt = {
                 "model": model_name,
                 "messages": [
                     {
                         "role": "user",
-                        "content": [
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:{mime_type};base64,{image_base64}"
-                                }
-                            },
-                            {
-                                "type": "text",
-                                "text": prompt
-                            }
-                        ]
+                        "content": f"{QWEN2_VL_OCR_PROMPT}\n\n[Imagen: {os.path.basename(p)}]"
                     }
                 ],
                 "max_tokens": 512,
                 "temperature": 0.1
             }
-            
-            # Hacer la petición a la API de LM Studio
-            response = requests.post(
-                lm_studio_endpoint,
-                json=payload,
-                timeout=60  # Timeout de 60 segundos
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                # Extraer el texto de la respuesta
-                if 'choices' in result and len(result['choices']) > 0:
-                    text = result['choices'][0].get('message', {}).get('content', '').strip()
-                    out[p] = text
-                else:
-                    out[p] = ''
-            else:
-                # Si falla la petición, intentar sin el formato de imagen (fallback)
-                # Algunas versiones de LM Studio pueden requerir un formato diferente
-                try:
-                    # Formato alternativo para modelos de visión
-                    model_name = os.environ.get('LM_STUDIO_MODEL', 'qwen2-vl-7b-instruct')
-                    payload_alt = {
-                        "model": model_name,
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": f"{prompt}\n\n[Imagen: {os.path.basename(p)}]"
-                            }
-                        ],
-                        "max_tokens": 512,
-                        "temperature": 0.1
-                    }
-                    response_alt = requests.post(
-                        lm_studio_endpoint,
-                        json=payload_alt,
-                        timeout=60
-                    )
-                    if response_alt.status_code == 200:
-                        result_alt = response_alt.json()
-                        if 'choices' in result_alt and len(result_alt['choices']) > 0:
-                            text = result_alt['choices'][0].get('message', {}).get('content', '').strip()
-                            out[p] = text
-                        else:
-                            out[p] = ''
-                    else:
-                        out[p] = ''
-                except Exception:
-                    out[p] = ''
+            response_alt = client.post(payload_alt, timeout=60)
+            if response_alt.status_code == 200:
+                return message_content(response_alt)
         except Exception:
-            out[p] = ''
-    
-    return out
+            pass
+        return None
+    except CircuitOpen:
+        return None
+    except Exception:
+        return ''
+
+def _qwen2_vl(paths: List[str]) -> Dict[str, str]:
+    """
+    Extrae texto de imágenes usando Qwen2 VL 7B Instruct a través de la API REST de LM Studio.
+    El endpoint por defecto es http://localhost:1234/v1/chat/completions (LM_STUDIO_ENDPOINT).
+    Las imágenes se envían a la vez, hasta los slots paralelos del servidor.
+    Solo devuelve las imágenes que LM Studio llegó a responder: si el circuito
+    se abre a mitad, las restantes quedan fuera para el fallback.
+    """
+    try:
+        import requests
+        from PIL import Image
+    except ImportError:
+        return {}
+    client = get_client()
+    # Con LM Studio caído (circuit breaker abierto) se pasa directamente a Tesseract
+    if not client.available():
+        return {}
+    texts = client.map(lambda p: _qwen2_vl_one(client, p), paths)
+    return {p: t for p, t in zip(paths, texts) if t is not None}
 
 def _google_vision(paths: List[str]) -> Dict[str, str]:
     try:
@@ -196,8 +180,8 @@ def _tesseract_worker(path: str, conn):
                 _pt.pytesseract.tesseract_cmd = cmd
         except Exception:
             pass
-        img = Image.open(path).convert('RGB')
         max_size = 2048
+        img = _open_reduced(path, max_size)
         if max(img.size) > max_size:
             ratio = max_size / max(img.size)
             new_size = (int(img.size[0] * ratio), int(img.size[1] * ratio))
@@ -236,13 +220,63 @@ def _tesseract(paths: List[str]) -> Dict[str, str]:
             out[p] = ''
     return out
 
+def _ocr_cache():
+    """(caché de análisis, source_digest) o (None, None) si no están disponibles."""
+    try:
+        from analysis_cache import get_cache
+        from analyzer import source_digest
+        return get_cache(), source_digest
+    except ImportError:
+        return None, None
+
 def extract_texts(paths: List[str]):
     """
     Extrae texto de imágenes usando el siguiente orden de prioridad:
     1. Google Vision (si hay credenciales en .env)
     2. Qwen2 VL 7B Instruct (si no hay credenciales de Google Vision)
     3. Tesseract (fallback final)
+
+    Los textos no vacíos del proveedor preferente se guardan en la caché de
+    análisis por contenido de la imagen, así que solo se envían al motor OCR las
+    capturas nuevas o cambiadas. Lo que responde un fallback (p. ej. Tesseract
+    con LM Studio caído) no se guarda: la próxima vez se vuelve a intentar.
     """
+    cache, digest_of = _ocr_cache()
+    if cache is None:
+        return _extract_texts(paths)[:2]
+    creds = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+    preferred = 'vision' if creds and os.path.isfile(creds) else 'qwen2-vl'
+    params = {
+        'provider': preferred,
+        'model': os.environ.get('LM_STUDIO_MODEL', 'qwen2-vl-7b-instruct') if preferred == 'qwen2-vl' else '',
+        'prompt': QWEN2_VL_OCR_PROMPT_VERSION if preferred == 'qwen2-vl' else '',
+    }
+    cached = {}
+    digests = {}
+    for p in paths:
+        try:
+            digests[p] = digest_of(p)
+            hit = cache.get('ocr', digests[p], params)
+            if hit and hit.get('text'):
+                cached[p] = hit
+        except Exception:
+            continue
+    missing = [p for p in paths if p not in cached]
+    data, provider, origin = _extract_texts(missing) if missing else ({}, '', {})
+    for p in missing:
+        if origin.get(p) == preferred and data.get(p) and p in digests:
+            try:
+                cache.put('ocr', digests[p], {'text': data[p], 'provider': provider}, params)
+            except Exception:
+                pass
+    out = {p: hit['text'] for p, hit in cached.items()}
+    out.update(data or {})
+    if not provider and cached:
+        provider = next(iter(cached.values())).get('provider') or ''
+    return out, provider
+
+def _extract_texts(paths: List[str]):
+    """(textos, proveedor principal, {ruta: proveedor que dio su texto})."""
     # Verificar si hay credenciales de Google Vision
     creds = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
     has_google_creds = creds and os.path.isfile(creds)
@@ -250,19 +284,24 @@ def extract_texts(paths: List[str]):
     # Si hay credenciales de Google Vision, usarlas
     if has_google_creds:
         data = _google_vision(paths)
-        if data:
-            return data, 'vision'
         # Si Google Vision falla pero hay credenciales, retornar vacío con 'vision'
-        return data, 'vision'
+        return data, 'vision', {p: 'vision' for p in data}
     
     # Si no hay credenciales de Google Vision, usar Qwen2 VL
     data_qwen = _qwen2_vl(paths)
     if data_qwen:
-        return data_qwen, 'qwen2-vl'
+        origin = {p: 'qwen2-vl' for p in data_qwen}
+        # Las que LM Studio no llegó a responder (p. ej. circuito abierto a mitad) van a Tesseract
+        failed = [p for p in paths if p not in data_qwen]
+        if failed:
+            fallback = _tesseract(failed)
+            data_qwen.update(fallback)
+            origin.update({p: 'tesseract' for p in fallback})
+        return data_qwen, 'qwen2-vl', origin
     
     # Fallback a Tesseract
     data2 = _tesseract(paths)
     if data2:
-        return data2, 'tesseract'
+        return data2, 'tesseract', {p: 'tesseract' for p in data2}
     
-    return {}, ''
+    return {}, '', {}
@@ -0,0 +1,275 @@
+"""
+Benchmark de los motores de segmentación de analyzer.py.
+
+Uso:
+    python tests/bench_segmentation.py [energy|pyramid|streaming|transitions|xycut|palette ...]
+
+BENCH_CORPUS_DIR=<carpeta> añade capturas reales al benchmark de transiciones.
+
+No forma parte de la suite de pytest (el nombre no empieza por test_).
+"""
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import analyzer
+from test_analyzer import _legacy_row_energy, _legacy_col_energy, _sample_page, _banded_page
+
+
+def _timeit(fn, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def bench_energy(sizes=((360, 1200), (720, 3000), (1440, 6000))):
+    print('== _row_energy / _col_energy ==')
+    print(f"{'tamaño':>12} {'legacy':>10} {'numpy':>10} {'imagechops':>11} {'x numpy':>8}")
+    for w, h in sizes:
+        img = _sample_page(w, h)
+        legacy = _timeit(lambda im: (_legacy_row_energy(im), _legacy_col_energy(im)), img, repeat=1)
+        fast = _timeit(lambda im: (analyzer._row_energy(im), analyzer._col_energy(im)), img)
+        np_mod = analyzer.np
+        analyzer.np = None
+        try:
+            chops = _timeit(lambda im: (analyzer._row_energy(im), analyzer._col_energy(im)), img)
+        finally:
+            analyzer.np = np_mod
+        print(f"{w:>5}x{h:<6} {legacy:>9.3f}s {fast:>9.4f}s {chops:>10.4f}s {legacy / max(fast, 1e-9):>7.0f}x")
+
+
+def _match_error(ref, got):
+    """Distancia media (px) de cada corte de referencia al corte más cercano."""
+    if not ref or not got:
+        return float('nan')
+    return sum(min(abs(r - g) for g in got) for r in ref) / float(len(ref))
+
+
+def bench_pyramid(sizes=((1440, 3000), (1440, 6000), (1440, 12000)), precise=False):
+    import tempfile
+    print('== cortes de filas: resolución completa vs pirámide ==')
+    print(f"{'tamaño':>12} {'full':>9} {'pyramid':>9} {'speedup':>8} {'cortes':>9} {'err px':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for w, h in sizes:
+            page = _banded_page(os.path.join(tmp, f'page_{w}x{h}.png'), w=w, h=h)
+
+            def full():
+                return analyzer._cv_cuts(analyzer.ImageFeatures(page), 0, 180, precise)
+
+            def pyramid():
+                return analyzer._pyramid_cuts(analyzer.ImageFeatures(page), 0, 180, precise)
+
+            ref = full()
+            got = pyramid()
+            t_full = _timeit(full, repeat=2)
+            t_pyr = _timeit(pyramid, repeat=2)
+            print(f"{w:>5}x{h:<6} {t_full:>8.3f}s {t_pyr:>8.3f}s {t_full / max(t_pyr, 1e-9):>7.1f}x "
+                  f"{len(ref):>4}/{len(got):<4} {_match_error(ref, got):>7.1f}")
+
+
+def bench_streaming(sizes=((1440, 8000), (1440, 16000)), strip_height=1024):
+    import tempfile
+    import tracemalloc
+    from PIL import Image
+    print('== segment_layout vs segment_layout_streaming (pico de memoria NumPy) ==')
+    print(f"{'archivo':>18} {'normal':>9} {'MB':>7} {'streaming':>10} {'MB':>7} {'filas':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for w, h in sizes:
+            png = _banded_page(os.path.join(tmp, f'page_{w}x{h}.png'), w=w, h=h)
+            bmp = os.path.join(tmp, f'page_{w}x{h}.bmp')
+            Image.open(png).save(bmp)
+            for page in (png, bmp):
+                results = []
+                for fn in (lambda: analyzer.segment_layout(page),
+                           lambda: analyzer.segment_layout_streaming(page, strip_height=strip_height)):
+                    tracemalloc.start()
+                    t0 = time.perf_counter()
+                    layout = fn()
+                    dt = time.perf_counter() - t0
+                    peak = tracemalloc.get_traced_memory()[1] / 1e6
+                    tracemalloc.stop()
+                    results.append((dt, peak, len(layout['rows'])))
+                (t1, m1, r1), (t2, m2, r2) = results
+                name = os.path.basename(page)
+                print(f"{name:>18} {t1:>8.2f}s {m1:>7.0f} {t2:>9.2f}s {m2:>7.0f} {r1:>3}/{r2:<3}")
+
+
+def _design_corpus(n=12, w=1200, seed=11):
+    """
+    Diseños sintéticos con fronteras de sección conocidas: bandas lisas,
+    degradados suaves, ruido de compresión y bloques de "texto".
+    """
+    import numpy as np
+    rnd = np.random.RandomState(seed)
+    corpus = []
+    for _ in range(n):
+        bands = []
+        y = 0
+        h = int(rnd.randint(2000, 6000))
+        while y < h:
+            hh = int(rnd.randint(180, 700))
+            bands.append((y, min(h, y + hh)))
+            y += hh
+        img = np.zeros((h, w, 3), dtype=np.float64)
+        for y0, y1 in bands:
+            c0 = rnd.randint(0, 256, 3).astype(np.float64)
+            if rnd.rand() < 0.3:
+                c1 = np.clip(c0 + rnd.randint(-25, 26, 3), 0, 255)
+                t = np.linspace(0, 1, y1 - y0)[:, None]
+                img[y0:y1] = (c0 * (1 - t) + c1 * t)[:, None, :]
+            else:
+                img[y0:y1] = c0
+            for _ in range(int(rnd.randint(0, 6))):
+                ty = int(rnd.randint(y0, max(y0 + 1, y1 - 20)))
+                tx = int(rnd.randint(0, w - 300))
+                img[ty:ty + 14, tx:tx + int(rnd.randint(80, 300))] = rnd.randint(0, 256, 3)
+        img += rnd.normal(0, 2.0, img.shape)
+        bgr = np.clip(img, 0, 255).astype(np.uint8)
+        corpus.append((f'synthetic_{len(corpus)}', bgr, [b[0] for b in bands[1:]]))
+    return corpus
+
+
+def _real_corpus():
+    import cv2
+    folder = os.environ.get('BENCH_CORPUS_DIR')
+    if not folder or not os.path.isdir(folder):
+        return []
+    out = []
+    for name in sorted(os.listdir(folder)):
+        im = cv2.imread(os.path.join(folder, name))
+        if im is not None:
+            out.append((name, im, None))
+    return out
+
+
+def _precision_recall(truth, got, tol=6):
+    if not truth:
+        return float('nan'), float('nan')
+    tp_r = sum(1 for t in truth if any(abs(t - g) <= tol for g in got))
+    tp_p = sum(1 for g in got if any(abs(t - g) <= tol for t in truth))
+    precision = tp_p / float(len(got)) if got else 0.0
+    return precision, tp_r / float(len(truth))
+
+
+def _cuts_with(detector, bgr):
+    previous = analyzer.TRANSITION_DETECTOR
+    analyzer.TRANSITION_DETECTOR = detector
+    try:
+        return analyzer._cv_cuts(analyzer.ImageFeatures(bgr), 0, 180)
+    finally:
+        analyzer.TRANSITION_DETECTOR = previous
+
+
+def bench_transitions():
+    import cv2
+    print('== transiciones de color por filas: k-means vs change-point ==')
+    print('(P/R de las transiciones y de los cortes finales tras _merge_cuts, tolerancia 6 px)')
+    print(f"{'diseño':>16} {'alto':>6} {'kmeans':>9} {'P/R trans':>11} {'P/R cortes':>11} "
+          f"{'changept':>9} {'P/R trans':>11} {'P/R cortes':>11}")
+    totals = {'kmeans': 0.0, 'changepoint': 0.0}
+    for name, bgr, truth in _design_corpus() + _real_corpus():
+        profile = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV).mean(axis=1)
+        if truth is None:
+            # Sin verdad de referencia: se toma k-means como referencia
+            truth = _cuts_with('kmeans', bgr)
+        cols = []
+        for detector, fn in (('kmeans', analyzer._kmeans_transitions), ('changepoint', analyzer._change_points)):
+            dt = _timeit(fn, profile, repeat=2)
+            totals[detector] += dt
+            p1, r1 = _precision_recall(truth, fn(profile))
+            p2, r2 = _precision_recall(truth, _cuts_with(detector, bgr))
+            cols.append(f"{dt * 1000:>7.1f}ms {p1:>5.2f}/{r1:<5.2f} {p2:>5.2f}/{r2:<5.2f}")
+        print(f"{name[:16]:>16} {bgr.shape[0]:>6} " + ' '.join(cols))
+    print(f"total detector: kmeans {totals['kmeans'] * 1000:.1f}ms, change-point {totals['changepoint'] * 1000:.1f}ms "
+          f"({totals['kmeans'] / max(totals['changepoint'], 1e-9):.1f}x)")
+
+
+def bench_xycut(sizes=((1440, 3000), (1440, 6000))):
+    import tempfile
+    print('== filas+columnas: crops por fila vs XYCutEngine (tablas integrales) ==')
+    print(f"{'tamaño':>12} {'crops':>9} {'xycut d2':>9} {'xycut d3':>9} {'columnas':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for w, h in sizes:
+            page = _banded_page(os.path.join(tmp, f'page_{w}x{h}.png'), w=w, h=h)
+            layouts = {}
+
+            def run(depth):
+                layouts[depth] = analyzer.segment_layout(page, depth=depth)
+
+            t1 = _timeit(run, 1, repeat=2)
+            t2 = _timeit(run, 2, repeat=2)
+            t3 = _timeit(run, 3, repeat=2)
+            ncols = lambda lay: sum(len(r['columns']) for r in lay['rows'])
+            print(f"{w:>5}x{h:<6} {t1:>8.3f}s {t2:>8.3f}s {t3:>8.3f}s {ncols(layouts[1]):>4}/{ncols(layouts[2]):<4}")
+
+
+def _hex_distance(a, b):
+    ca = [int(a[i:i + 2], 16) for i in (1, 3, 5)]
+    cb = [int(b[i:i + 2], 16) for i in (1, 3, 5)]
+    return sum((x - y) ** 2 for x, y in zip(ca, cb)) ** 0.5
+
+
+def _dna_page(path, w, h, seed=5):
+    """Página con fondo claro, cabecera oscura, acentos de color y líneas de texto."""
+    import numpy as np
+    from PIL import Image
+    rnd = np.random.RandomState(seed)
+    arr = np.full((h, w, 3), 248, dtype=np.uint8)
+    arr[:h // 8] = (18, 28, 58)
+    for y in range(h // 8, h, 600):
+        arr[y + 40:y + 100, 80:80 + w // 4] = (37, 99, 235)
+        arr[y + 300:y + 330, w // 2:w - 80] = (240, 240, 236)
+    for y in range(h // 8 + 150, h, 36):
+        arr[y:y + 10, 80:80 + int(rnd.randint(w // 4, w - 160))] = (40, 40, 44)
+    arr = np.clip(arr + rnd.normal(0, 1.5, arr.shape), 0, 255).astype(np.uint8)
+    Image.fromarray(arr).save(path)
+    return path
+
+
+def bench_palette(sizes=((1440, 3000), (1440, 8000))):
+    import tempfile
+    from PIL import Image
+    print('== paleta de extract_design_dna: colorgram vs histograma NumPy ==')
+    print('(Δ roles: distancia RGB máxima entre los colores asignados a cada rol)')
+    print(f"{'tamaño':>12} {'colorgram':>10} {'numpy':>9} {'Δ roles':>8}")
+    try:
+        import colorgram
+    except Exception:
+        colorgram = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for w, h in sizes:
+            page = _dna_page(os.path.join(tmp, f'page_{w}x{h}.png'), w, h)
+            feat = analyzer.ImageFeatures(page)
+            fast = _timeit(lambda: analyzer._palette_roles([c for c, _ in analyzer._palette_colors(analyzer._sample_pixels(feat))]))
+            ours = analyzer._palette_roles([c for c, _ in analyzer._palette_colors(analyzer._sample_pixels(feat))])
+            if colorgram is None:
+                print(f"{w:>5}x{h:<6} {'-':>10} {fast:>8.4f}s {'-':>8}")
+                continue
+            t0 = time.perf_counter()
+            colors = colorgram.extract(Image.open(page).convert('RGB'), 12)
+            slow = time.perf_counter() - t0
+            ref = analyzer._palette_roles([(c.rgb.r, c.rgb.g, c.rgb.b) for c in colors])
+            delta = max(_hex_distance(a['color'], b['color']) for a, b in zip(ref, ours))
+            print(f"{w:>5}x{h:<6} {slow:>9.2f}s {fast:>8.4f}s {delta:>8.0f}")
+
+
+BENCHES = {
+    'energy': bench_energy,
+    'pyramid': bench_pyramid,
+    'streaming': bench_streaming,
+    'transitions': bench_transitions,
+    'xycut': bench_xycut,
+    'palette': bench_palette,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHES)
+    for name in names:
+        BENCHES[name]()
@@ -0,0 +1,23 @@
+import os
+import sys
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Los tests no deben reanudar la cola real de trabajos al importar app
+os.environ.setdefault('IMG2HTML_QUEUE_AUTOSTART', 'false')
+
+
+@pytest.fixture(autouse=True)
+def _isolated_analysis_cache(tmp_path, monkeypatch):
+    # Cada test con su propia caché de análisis (también en los procesos spawn)
+    import analysis_cache
+    cache_dir = str(tmp_path / 'analysis-cache')
+    monkeypatch.setenv('IMG2HTML_ANALYSIS_CACHE_DIR', cache_dir)
+    monkeypatch.setattr(analysis_cache, 'CACHE_DIR', cache_dir)
+    monkeypatch.setattr(analysis_cache, '_cache', None)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_lmstudio_client(monkeypatch):
+    # El circuit breaker es global: cada test parte de un cliente cerrado
+    import lmstudio
+    monkeypatch.setattr(lmstudio, '_client', None)
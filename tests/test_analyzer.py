@@ -1,7 +1,11 @@
 import pytest
 import os, sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PIL import Image
+import numpy as np
+import analyzer
 from analyzer import identify_pattern_variant, identify_pattern, extract_design_dna, _is_grayscale
+from analyzer import _row_energy, _col_energy, _find_cuts, _find_vcuts
 
 def test_identify_pattern_variant_balanced():
     section = {
@@ -36,4 +40,508 @@ def test_extract_design_dna_default():
     assert isinstance(dna, dict)
     pal = dna.get('palette') or []
     slugs = [p.get('slug') for p in pal]
-    assert 'background' in slugs and 'text' in slugs and 'primary' in slugs
\ No newline at end of file
+    assert 'background' in slugs and 'text' in slugs and 'primary' in slugs
+
+def _legacy_row_energy(img):
+    w, h = img.size
+    px = img.convert('L').load()
+    arr = []
+    for y in range(h):
+        s = 0
+        last = px[0, y]
+        for x in range(1, w):
+            v = px[x, y]
+            s += abs(v - last)
+            last = v
+        arr.append(s)
+    return arr
+
+def _legacy_col_energy(img):
+    w, h = img.size
+    px = img.convert('L').load()
+    arr = []
+    for x in range(w):
+        s = 0
+        last = px[x, 0]
+        for y in range(1, h):
+            v = px[x, y]
+            s += abs(v - last)
+            last = v
+        arr.append(s)
+    return arr
+
+def _sample_page(w=120, h=300, seed=7):
+    import random
+    rnd = random.Random(seed)
+    img = Image.new('RGB', (w, h), (250, 250, 250))
+    for _ in range(40):
+        x0, y0 = rnd.randrange(w), rnd.randrange(h)
+        x1, y1 = min(w, x0 + rnd.randrange(1, 40)), min(h, y0 + rnd.randrange(1, 60))
+        color = (rnd.randrange(256), rnd.randrange(256), rnd.randrange(256))
+        img.paste(color, (x0, y0, x1, y1))
+    return img
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_energy_parity_with_legacy_loops(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(analyzer, 'np', None)
+    img = _sample_page()
+    row = _row_energy(img)
+    col = _col_energy(img)
+    assert row == _legacy_row_energy(img)
+    assert col == _legacy_col_energy(img)
+    assert _find_cuts(row, 20) == _find_cuts(_legacy_row_energy(img), 20)
+    assert _find_vcuts(col, 20) == _find_vcuts(_legacy_col_energy(img), 20)
+
+def test_energy_degenerate_sizes():
+    assert _row_energy(Image.new('L', (1, 5))) == [0] * 5
+    assert _col_energy(Image.new('L', (5, 1))) == [0] * 5
+
+def _banded_page(path, w=800, h=1600, seed=3):
+    import random
+    from PIL import ImageDraw
+    rnd = random.Random(seed)
+    img = Image.new('RGB', (w, h), (255, 255, 255))
+    d = ImageDraw.Draw(img)
+    y = 0
+    while y < h:
+        hh = rnd.randrange(200, 500)
+        d.rectangle((0, y, w - 1, y + hh), fill=tuple(rnd.randrange(256) for _ in range(3)))
+        for _ in range(3):
+            x = rnd.randrange(0, w - 200)
+            d.rectangle((x, y + 30, x + rnd.randrange(100, 300), y + hh - 30), fill=tuple(rnd.randrange(256) for _ in range(3)))
+        y += hh
+    img.save(path)
+    return str(path)
+
+def test_segment_layout_matches_disk_pipeline(tmp_path):
+    page = _banded_page(tmp_path / 'page.png')
+    disk = tmp_path / 'disk'
+    disk.mkdir()
+    segs = analyzer.segment_image(page, str(disk))
+    layout = analyzer.segment_layout(page)
+    assert [r['name'] for r in layout['rows']] == [os.path.basename(s) for s in segs]
+    for row, seg in zip(layout['rows'], segs):
+        cols = analyzer.segment_columns(seg, str(disk))
+        assert [c['name'] for c in row['columns']] == [os.path.basename(c) for c in cols]
+        assert [c['width'] for c in row['columns']] == [Image.open(c).size[0] for c in cols]
+    assert 'path' not in layout['rows'][0]
+
+def test_segment_layout_writes_crops_once(tmp_path):
+    page = _banded_page(tmp_path / 'page.png')
+    out = tmp_path / 'out'
+    out.mkdir()
+    layout = analyzer.segment_layout(page, str(out), write=True)
+    row = layout['rows'][0]
+    x0, y0, x1, y1 = row['columns'][0]['box']
+    assert Image.open(row['columns'][0]['path']).size == (x1 - x0, y1 - y0)
+    assert os.path.isfile(row['path'])
+
+def test_feature_cache_memoizes_planes(tmp_path):
+    page = _banded_page(tmp_path / 'page.png', w=400, h=600)
+    cache = analyzer.FeatureCache()
+    feat = cache.features(page)
+    gray = feat.gray
+    assert feat.gray is gray
+    assert cache.features(page).gray is gray
+    analyzer.segment_layout(page, feature_cache=cache)
+    assert cache.hits > 0
+    row = feat.crop((0, 100, 400, 300))
+    assert row.gray.base is not None and row.size == (400, 200)
+
+def test_feature_cache_lru_cap(tmp_path):
+    page = _banded_page(tmp_path / 'page.png', w=400, h=600)
+    cache = analyzer.FeatureCache(max_bytes=400 * 600 * 4)
+    feat = cache.features(page)
+    feat.hsv
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.peek(page, 'bgr') is None
+    assert cache.peek(page, 'hsv') is not None
+    assert feat.gray.shape == (600, 400)
+
+def test_pyramid_cuts_close_to_full_resolution(tmp_path):
+    page = _banded_page(tmp_path / 'tall.png', w=600, h=2400)
+    assert analyzer._pyramid_scale(2400) == 2
+    full = analyzer._cv_cuts(analyzer.ImageFeatures(page), 0, 180)
+    pyr = analyzer._pyramid_cuts(analyzer.ImageFeatures(page), 0, 180)
+    assert full and pyr
+    matched = [c for c in full if min(abs(c - p) for p in pyr) <= 20]
+    assert len(matched) >= len(full) - 1
+    layout = analyzer.segment_layout(page, pyramid=True)
+    assert layout['rows'] and layout['height'] == 2400
+
+@pytest.mark.parametrize('ext', ['.png', '.bmp', '.jpg'])
+def test_streaming_layout_matches_in_memory(tmp_path, ext):
+    page = _banded_page(tmp_path / 'tall.png', w=500, h=2000)
+    if ext != '.png':
+        Image.open(page).save(tmp_path / ('tall' + ext))
+        page = str(tmp_path / ('tall' + ext))
+    reader = analyzer.StripReader(page)
+    assert reader.streaming == (ext != '.jpg')
+    feat = analyzer.ImageFeatures(page)
+    energy, avg_hsv, _ = analyzer._stream_row_profiles(reader, strip_height=256)
+    assert (energy == np.abs(feat.sobel_y).sum(axis=1)).all()
+    assert (avg_hsv == feat.hsv.mean(axis=1)).all()
+    # Lecturas hacia atrás: se reanudan desde un punto de control
+    for y0, y1 in ((700, 900), (10, 30), (1500, 2000), (690, 1200)):
+        assert (reader.read(y0, y1) == feat.bgr[y0:y1]).all()
+    out = tmp_path / 'out'
+    out.mkdir()
+    layout = analyzer.segment_layout_streaming(page, str(out), write=True, strip_height=256)
+    assert layout['rows'] and layout['height'] == 2000
+    row = layout['rows'][0]
+    assert Image.open(row['path']).size == (500, row['box'][3] - row['box'][1])
+
+@pytest.mark.parametrize('mode', ['RGBA', 'P', 'L'])
+def test_png_strips_decode_exactly(tmp_path, mode):
+    cv2 = pytest.importorskip('cv2')
+    rnd = np.random.RandomState(1)
+    pix = (rnd.randint(0, 60, (900, 211, 3)) + np.arange(211)[None, :, None]).astype(np.uint8)
+    im = Image.fromarray(pix)
+    im = im.quantize(32) if mode == 'P' else im.convert(mode)
+    im.save(tmp_path / 'p.png')
+    reader = analyzer.StripReader(str(tmp_path / 'p.png'))
+    assert reader.streaming
+    full = cv2.imread(str(tmp_path / 'p.png'))
+    assert (np.vstack([reader.read(y, y + 128) for y in range(0, 900, 128)]) == full).all()
+
+def test_streaming_crops_fall_back_when_imwrite_fails(tmp_path, monkeypatch):
+    page = _banded_page(tmp_path / 'tall.bmp', w=400, h=1200)
+    monkeypatch.setattr(analyzer.cv2, 'imwrite', lambda *a, **k: False)
+    layout = analyzer.segment_layout_streaming(page, str(tmp_path), write=True, strip_height=256)
+    paths = [r['path'] for r in layout['rows']]
+    assert paths and all(p and os.path.exists(p) for p in paths)
+
+def test_change_points_find_steps():
+    rnd = np.random.RandomState(0)
+    profile = np.concatenate([
+        np.full((120, 3), (10.0, 40.0, 240.0)),
+        np.full((200, 3), (100.0, 180.0, 60.0)),
+        np.full((80, 3), (10.0, 40.0, 240.0)),
+    ]) + rnd.normal(0, 1.5, (400, 3))
+    assert analyzer._change_points(profile) == [120, 320]
+    assert analyzer._change_points(np.full((300, 3), 128.0)) == []
+    assert analyzer._change_points(np.zeros((10, 3))) == []
+
+
+def test_xy_cut_engine_integral_energy(tmp_path):
+    cv2 = pytest.importorskip('cv2')
+    page = _banded_page(str(tmp_path / 'page.png'), w=400, h=600)
+    feat = analyzer.ImageFeatures(page)
+    engine = analyzer.XYCutEngine(feat)
+    box = (37, 51, 311, 477)
+    x0, y0, x1, y1 = box
+    direct = np.abs(feat.sobel_x[y0:y1, x0:x1]).sum() + np.abs(feat.sobel_y[y0:y1, x0:x1]).sum()
+    # Sumas directas y, dentro de una región, tablas integrales int32
+    for region in (None, (0, 40, 400, 500)):
+        if region:
+            assert engine.region(region) and engine._region['sat_x'].dtype == np.int32
+        assert engine.energy(box) == pytest.approx(direct)
+        energy, hsv = engine._profiles(box, 0)
+        assert np.allclose(energy, np.abs(feat.sobel_y[y0:y1, x0:x1]).sum(axis=1))
+        assert np.allclose(hsv, feat.hsv[y0:y1, x0:x1].mean(axis=1))
+        energy, hsv = engine._profiles(box, 1)
+        assert np.allclose(energy, np.abs(feat.sobel_x[y0:y1, x0:x1]).sum(axis=0))
+        assert np.allclose(hsv, feat.hsv[y0:y1, x0:x1].mean(axis=0))
+    # Una región cuya suma no cabe en 32 bits no construye tablas
+    assert not engine.region((0, 0, 400000, 6000)) and engine._region is None
+
+
+def test_segment_layout_nested_rows(tmp_path, monkeypatch):
+    pytest.importorskip('cv2')
+    w, h = 1000, 1200
+    arr = np.full((h, w, 3), 245, dtype=np.uint8)
+    arr[:600, :800] = (30, 60, 200)
+    arr[600:, :] = (20, 20, 20)
+    # columna estrecha con un cambio suave que no supera el umbral a ancho completo
+    arr[:300, 800:] = (240, 240, 240)
+    arr[300:600, 800:] = (205, 205, 205)
+    path = str(tmp_path / 'nested.png')
+    Image.fromarray(arr).save(path)
+    flat = analyzer.segment_layout(path)
+    deep = analyzer.segment_layout(path, depth=3)
+    assert [r['box'] for r in deep['rows']] == [r['box'] for r in flat['rows']]
+    calls = []
+    real = analyzer._pyramid_cuts
+    monkeypatch.setattr(analyzer, '_pyramid_cuts', lambda *a, **k: calls.append(a[1]) or real(*a, **k))
+    # pyramid también se respeta con depth > 1
+    analyzer.segment_layout(path, depth=3, pyramid=True)
+    assert 0 in calls
+    first = deep['rows'][0]
+    assert len(first['columns']) == 2
+    assert first['columns'][0]['rows'] == []
+    inner = first['columns'][1]['rows']
+    assert len(inner) == 2 and abs(inner[1]['box'][1] - 300) <= 10
+    section = {'layout_rows': [{'columns': ['a.png'], 'ratios_percent': [100],
+                                'column_layouts': [analyzer.nested_layout_rows(first['columns'][0]['rows'] + [
+                                    {'box': [0, 0, 800, 300], 'columns': [{'box': [0, 0, 400, 300], 'width': 400},
+                                                                           {'box': [400, 0, 800, 300], 'width': 400}]}])]}]}
+    assert analyzer.identify_pattern_variant(section) == 'balanced'
+
+
+def test_extract_design_dna_numpy_palette(tmp_path):
+    arr = np.full((900, 600, 3), 250, dtype=np.uint8)
+    arr[:200] = (20, 30, 60)
+    arr[300:340, 50:350] = (230, 90, 40)
+    for y in range(400, 900, 30):
+        arr[y:y + 8, 40:500] = (30, 30, 30)
+    arr = np.clip(arr + np.random.RandomState(1).normal(0, 2, arr.shape), 0, 255).astype(np.uint8)
+    path = str(tmp_path / 'dna.png')
+    Image.fromarray(arr).save(path)
+    dna = analyzer.extract_design_dna([path])
+    roles = {p['slug']: p['color'] for p in dna['palette']}
+    assert set(roles) == {'background', 'text', 'primary', 'secondary'}
+
+    def rgb(hexcolor):
+        return tuple(int(hexcolor[i:i + 2], 16) for i in (1, 3, 5))
+
+    assert all(abs(a - b) <= 8 for a, b in zip(rgb(roles['background']), (250, 250, 250)))
+    assert all(abs(a - b) <= 8 for a, b in zip(rgb(roles['primary']), (230, 90, 40)))
+    assert analyzer._luminance(rgb(roles['text'])) < 0.15
+    assert analyzer.extract_design_dna([path], seed=7) == analyzer.extract_design_dna([path], seed=7)
+
+
+def test_extract_design_dna_weights_all_images(tmp_path):
+    hero = np.full((400, 800, 3), (12, 16, 32), dtype=np.uint8)
+    hero[150:200, 100:400] = (230, 90, 40)
+    page = np.full((2400, 800, 3), 246, dtype=np.uint8)
+    page[::40, 50:700] = (35, 35, 35)
+    paths = [str(tmp_path / '01-hero.png'), str(tmp_path / '02-about.png')]
+    Image.fromarray(hero).save(paths[0])
+    Image.fromarray(page).save(paths[1])
+    pixels, weights = analyzer._merged_sample(paths, max_pixels=4096)
+    assert len(pixels) <= 4096 + 256
+    # cada imagen pesa en proporción a su área
+    assert weights[:len(weights) // 2].sum() * 6 == pytest.approx(weights[len(weights) // 2:].sum(), rel=0.01)
+    colors = analyzer._palette_colors(pixels, 12, weights=weights)
+    assert max(colors, key=lambda c: c[1])[0] == (246, 246, 246)
+    roles = {p['slug']: p['color'] for p in analyzer.extract_design_dna(paths)['palette']}
+    assert roles['background'] == '#f6f6f6'
+    assert roles['primary'] == '#e65a28'
+
+
+def test_reservoir_pixels_uniform_and_bounded():
+    # el valor de cada píxel es el número de bloque: la muestra debe repartirse
+    blocks = [np.full((3000, 3), i, dtype=np.uint8) for i in range(10)]
+    sample = analyzer._reservoir_pixels(blocks, 1000, seed=3)
+    assert sample.shape == (1000, 3)
+    assert np.array_equal(sample, analyzer._reservoir_pixels(blocks, 1000, seed=3))
+    per_block = np.bincount(sample[:, 0], minlength=10)
+    assert per_block.min() > 60 and per_block.max() < 140
+    assert len(analyzer._reservoir_pixels([np.zeros((5, 3), dtype=np.uint8)], 100)) == 5
+
+
+def test_slice_layout_virtual_segments(tmp_path):
+    page = _banded_page(str(tmp_path / 'page.png'), w=600, h=1400)
+    out = tmp_path / 'out'
+    out.mkdir()
+    layout = analyzer.slice_layout(page, str(out), virtual=True)
+    rows = layout['rows']
+    assert rows and all('path' not in r and r['segment']['source'] == page for r in rows)
+    written = sorted(os.listdir(str(out)))
+    assert written == sorted(c['name'] for r in rows for c in r['columns'])
+    col = rows[0]['columns'][0]
+    with Image.open(col['path']) as im:
+        on_disk = np.asarray(im.convert('RGB'))
+    crop = analyzer.load_segment(col['segment'])
+    if isinstance(crop, np.ndarray):
+        crop = crop[:, :, ::-1]
+    assert np.array_equal(on_disk, np.asarray(crop))
+    # el hash depende de fuente y caja: mismo segmento, mismo archivo
+    again = analyzer.virtual_segment(page, col['box'])
+    assert again['hash'] == col['segment']['hash'] != rows[0]['segment']['hash']
+    p1 = analyzer.materialize_segment(rows[0]['segment'], str(out))
+    mtime = os.stat(p1).st_mtime_ns
+    assert analyzer.materialize_segment(dict(rows[0]['segment']), str(out)) == p1
+    assert os.stat(p1).st_mtime_ns == mtime
+
+
+def test_probe_image_header_and_reduced_decode(tmp_path):
+    path = str(tmp_path / '01-hero.jpg')
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    _sample_page(1600, 1200, seed=2).save(path, quality=90, exif=exif)
+    info = analyzer.probe_image(path)
+    assert info == {'format': 'JPEG', 'width': 1600, 'height': 1200, 'mode': 'RGB', 'orientation': 6}
+    plan = analyzer.analyze_images([path], {path: info})
+    assert plan['sections'][0]['sources'] == [dict(info, path=path)]
+    small = analyzer.open_reduced(path, 400)
+    assert small.mode == 'RGB' and max(small.size) == 400
+    assert analyzer.open_reduced(path, 4000).size == (1600, 1200)
+    with pytest.raises(Exception):
+        analyzer.probe_image(str(tmp_path / 'missing.png'))
+
+
+def test_vision_analysis_persistent_cache(tmp_path, monkeypatch):
+    import requests
+    import analysis_cache
+    from analyzer import analyze_image_with_qwen2vl
+    path = tmp_path / 'hero.png'
+    Image.new('RGB', (300, 200), (20, 40, 60)).save(str(path))
+    posts = []
+
+    class _Resp:
+        status_code = 200
+
+        def json(self):
+            return {'choices': [{'message': {'content': '{"components": ["button"], "layout": {"type": "grid"}}'}}]}
+    monkeypatch.setattr(requests.Session, 'post', lambda self, *a, **k: posts.append(k['json']['model']) or _Resp())
+    monkeypatch.setattr(requests.Session, 'get', lambda self, *a, **k: _Resp())
+    first = analyze_image_with_qwen2vl(str(path))
+    assert first == {'components': ['button'], 'layout': {'type': 'grid'}}
+    # Tras un reinicio (caché nueva sobre la misma base) no se vuelve a llamar a LM Studio
+    monkeypatch.setattr(analysis_cache, '_cache', None)
+    assert analyze_image_with_qwen2vl(str(path)) == first
+    assert len(posts) == 1
+    # Otro modelo es otra clave
+    monkeypatch.setenv('LM_STUDIO_MODEL', 'otro-modelo')
+    analyze_image_with_qwen2vl(str(path))
+    assert posts == ['qwen2-vl-7b-instruct', 'otro-modelo']
+
+
+def test_analysis_cache_ttl(tmp_path):
+    from analysis_cache import AnalysisCache
+    cache = AnalysisCache(str(tmp_path / 'c.sqlite3'))
+    assert cache.put('vision', 'abc', {'analysis': None}, ttl=-1) is False
+    assert cache.put('vision', 'cero', {'analysis': None}, ttl=0) is False
+    assert cache.put('vision', 'corto', {'analysis': None}, ttl=0.5)
+    cache.put('vision', 'def', {'analysis': {'ok': True}}, ttl=60)
+    assert cache.get('vision', 'abc') is None
+    assert cache.get('vision', 'def') == {'analysis': {'ok': True}}
+    assert cache.get('vision', 'cero') is None
+    assert cache.get('vision', 'corto') == {'analysis': None}
+    assert cache.stats()['entries'] == 2
+
+
+def test_vision_text_coerces_fused_field():
+    from analyzer import vision_text
+    assert vision_text({'text': '  Hola  '}) == 'Hola'
+    assert vision_text({'text': ['Título', '', 'Texto', 3]}) == 'Título\nTexto\n3'
+    assert vision_text({'text': ''}) == ''
+    # Sin un campo 'text' utilizable la imagen no cuenta como leída
+    assert vision_text({'components': []}) is None
+    assert vision_text({'text': {'a': 1}}) is None
+    assert vision_text(None) is None
+
+
+def test_encoded_image_payload_shared_across_callers(tmp_path, monkeypatch):
+    import base64
+    import io as _io
+    import image_payloads
+    from ai_refine import _optimize_image_for_ai
+    monkeypatch.setattr(image_payloads, '_cache', None)
+    path = tmp_path / 'captura.png'
+    Image.new('RGB', (3000, 1500), (10, 120, 200)).save(str(path))
+    encodes = []
+    real = image_payloads._encode
+    monkeypatch.setattr(image_payloads, '_encode', lambda *a, **k: encodes.append(a[1:4]) or real(*a, **k))
+    first = image_payloads.encoded_image(str(path), 2048, quality=85)
+    assert _optimize_image_for_ai(str(path)) == first
+    image_payloads.encoded_image(str(path), 1024, quality=85)
+    assert encodes == [(2048, 85, 'JPEG'), (1024, 85, 'JPEG')]
+    assert Image.open(_io.BytesIO(base64.b64decode(first))).size == (2048, 1024)
+    st = image_payloads.get_payload_cache().stats()
+    assert st['hits'] == 1 and st['misses'] == 2
+    # Nivel persistente: otra instancia (reinicio) reutiliza los bytes sin recodificar
+    from analysis_cache import AnalysisCache
+    disk = AnalysisCache(str(tmp_path / 'payloads.sqlite3'))
+    for _ in range(2):
+        monkeypatch.setattr(image_payloads, '_cache', image_payloads.PayloadCache(1 << 20, disk))
+        assert image_payloads.encoded_image(str(path), 512, quality=70) == image_payloads.encoded_image(str(path), 512, quality=70)
+    assert encodes.count((512, 70, 'JPEG')) == 1
+
+
+def test_ocr_cache_skips_fallback_provider(tmp_path, monkeypatch):
+    import ocr
+    path = tmp_path / 'texto.png'
+    Image.new('RGB', (120, 80), (250, 250, 250)).save(str(path))
+    monkeypatch.delenv('GOOGLE_APPLICATION_CREDENTIALS', raising=False)
+    monkeypatch.setattr(ocr, '_qwen2_vl', lambda paths: {})
+    monkeypatch.setattr(ocr, '_tesseract', lambda paths: {p: 'tess text' for p in paths})
+    assert ocr.extract_texts([str(path)]) == ({str(path): 'tess text'}, 'tesseract')
+    # LM Studio vuelve: el texto de Tesseract no se sirve desde la caché
+    monkeypatch.setattr(ocr, '_qwen2_vl', lambda paths: {p: 'qwen text' for p in paths})
+    assert ocr.extract_texts([str(path)]) == ({str(path): 'qwen text'}, 'qwen2-vl')
+    monkeypatch.setattr(ocr, '_qwen2_vl', lambda paths: {})
+    assert ocr.extract_texts([str(path)]) == ({str(path): 'qwen text'}, 'qwen2-vl')
+    # Otro prompt de OCR es otra clave
+    monkeypatch.setattr(ocr, 'QWEN2_VL_OCR_PROMPT_VERSION', 'otro-prompt')
+    assert ocr.extract_texts([str(path)]) == ({str(path): 'tess text'}, 'tesseract')
+
+
+def test_layout_cache_keyed_by_detector_and_version(tmp_path, monkeypatch):
+    page = _banded_page(str(tmp_path / 'page.png'), w=400, h=900)
+    calls = []
+    real = analyzer.segment_layout
+    monkeypatch.setattr(analyzer, 'segment_layout', lambda *a, **k: calls.append(1) or real(*a, **k))
+    analyzer.slice_layout(page, None)
+    analyzer.slice_layout(page, None)
+    assert len(calls) == 1
+    monkeypatch.setattr(analyzer, 'TRANSITION_DETECTOR', 'kmeans')
+    analyzer.slice_layout(page, None)
+    monkeypatch.setattr(analyzer, 'LAYOUT_CACHE_VERSION', analyzer.LAYOUT_CACHE_VERSION + 1)
+    analyzer.slice_layout(page, None)
+    assert len(calls) == 3
+
+
+def test_ocr_breaker_trip_sends_remaining_images_to_tesseract(tmp_path, monkeypatch):
+    import ocr
+    from lmstudio import CircuitOpen
+    paths = []
+    for i, name in enumerate(('a.png', 'b.png', 'c.png')):
+        paths.append(str(tmp_path / name))
+        Image.new('RGB', (120, 80), (250, 250 - i, 250)).save(paths[-1])
+    monkeypatch.delenv('GOOGLE_APPLICATION_CREDENTIALS', raising=False)
+
+    class _Resp:
+        status_code = 200
+
+        def json(self):
+            return {'choices': [{'message': {'content': 'qwen text'}}]}
+
+    class _Client:
+        # El circuito se abre tras la primera imagen
+        calls = 0
+
+        def available(self):
+            return True
+
+        def map(self, fn, items):
+            return [fn(p) for p in items]
+
+        def post(self, payload, timeout=60):
+            _Client.calls += 1
+            if _Client.calls > 1:
+                raise CircuitOpen('timeout')
+            return _Resp()
+    monkeypatch.setattr(ocr, 'get_client', lambda: _Client())
+    monkeypatch.setattr(ocr, '_tesseract', lambda ps: {p: 'tess text' for p in ps})
+    texts, provider = ocr.extract_texts(paths)
+    assert provider == 'qwen2-vl'
+    assert texts == {paths[0]: 'qwen text', paths[1]: 'tess text', paths[2]: 'tess text'}
+    # Solo el texto de Qwen2-VL queda en caché
+    _Client.calls = 0
+    monkeypatch.setattr(ocr, '_tesseract', lambda ps: {p: 'otro' for p in ps})
+    texts, _ = ocr.extract_texts(paths)
+    assert texts[paths[0]] == 'qwen text' and texts[paths[1]] == 'qwen text' and texts[paths[2]] == 'otro'
+
+
+def test_xy_cut_tree_shape(tmp_path, monkeypatch):
+    pytest.importorskip('cv2')
+    page = _banded_page(str(tmp_path / 'page.png'), w=800, h=1600)
+    built = []
+    region = analyzer.XYCutEngine.region
+    monkeypatch.setattr(analyzer.XYCutEngine, 'region', lambda self, box: built.append(tuple(box)) or region(self, box))
+    tree = analyzer.xy_cut_tree(page, depth=2)
+    assert tree['box'] == [0, 0, 800, 1600] and tree['split'] == 'rows'
+    # Una sola tabla integral para toda la página: los hijos la reutilizan
+    assert built == [(0, 0, 800, 1600)]
+    rows = tree['children']
+    assert len(rows) >= 2 and rows[0]['box'][1] >= 0 and rows[-1]['box'][3] <= 1600
+    assert all(a['box'][3] <= b['box'][1] for a, b in zip(rows, rows[1:]))
+    for row in rows:
+        assert row['box'][0] == 0 and row['box'][2] == 800
+        assert row['split'] in (None, 'columns')
+        for col in row['children']:
+            assert col['box'][1] == row['box'][1] and col['box'][3] == row['box'][3]
+            assert col['split'] is None and col['children'] == []
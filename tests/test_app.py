@@ -0,0 +1,430 @@
+import os
+import sys
+import zipfile
+import io
+import pytest
+from PIL import Image
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+app_module = pytest.importorskip('app')
+
+
+def _png_bytes(color, size=(64, 48)):
+    buf = io.BytesIO()
+    Image.new('RGB', size, color).save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def _design_zip(path):
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('01-hero.png', _png_bytes((10, 20, 30)))
+        zf.writestr('copia/01-hero.png', _png_bytes((10, 20, 30)))
+        zf.writestr('02-about.png', _png_bytes((200, 200, 200)))
+        zf.writestr('roto.png', b'no es una imagen')
+        zf.writestr('notas.md', b'# notas')
+        zf.writestr('script.sh', b'rm -rf /')
+        zf.writestr('../fuera.png', _png_bytes((1, 2, 3)))
+    return path
+
+
+def test_ingest_zip_dedup_and_validation(tmp_path):
+    dest = tmp_path / 'batch'
+    dest.mkdir()
+    zip_path = _design_zip(str(tmp_path / 'design.zip'))
+    result = app_module._ingest_zip(zip_path, str(dest), workers=3)
+    names = sorted(os.path.relpath(p, str(dest)) for p in result['images'])
+    assert names == ['01-hero.png', '02-about.png']
+    assert [os.path.relpath(d['path'], str(dest)) for d in result['duplicates']] == [os.path.join('copia', '01-hero.png')]
+    assert not (dest / 'copia' / '01-hero.png').exists()
+    assert not (dest / 'roto.png').exists() and not (dest / 'script.sh').exists()
+    assert not (tmp_path / 'fuera.png').exists()
+    assert [os.path.basename(p) for p in result['files']] == ['notas.md']
+    probe = result['probes'][str(dest / '02-about.png')]
+    assert (probe['width'], probe['height'], probe['format']) == (64, 48, 'PNG')
+    assert os.path.isfile(str(dest / 'ingest.json'))
+    assert result['truncated'] == []
+    # Por encima de los límites no se extrae nada más, pero se informa
+    capped = tmp_path / 'capped'
+    capped.mkdir()
+    result = app_module._ingest_zip(zip_path, str(capped), max_files=2)
+    assert result['truncated'] == ['02-about.png', 'roto.png', 'notas.md']
+    assert not (capped / '02-about.png').exists()
+
+
+def test_chunked_upload_resumable(tmp_path, monkeypatch):
+    import hashlib
+    monkeypatch.setattr(app_module, 'UPLOAD_DIR', str(tmp_path))
+    monkeypatch.setattr(app_module, 'UPLOAD_CHUNK_SIZE', 64)
+    data = open(_design_zip(str(tmp_path / 'design.zip')), 'rb').read()
+    client = app_module.app.test_client()
+    # Un ZIP que no se podría extraer entero se rechaza antes de subirlo
+    monkeypatch.setattr(app_module, 'MAX_CHUNKED_UNCOMPRESSED', len(data) - 1)
+    assert client.post('/upload/init', json={'filename': 'design.zip', 'size': len(data)}).status_code == 413
+    monkeypatch.setattr(app_module, 'MAX_CHUNKED_UNCOMPRESSED', 10 * len(data))
+    res = client.post('/upload/init', json={'filename': 'design.zip', 'size': len(data)})
+    assert res.status_code == 201
+    batch_id = res.get_json()['batch_id']
+
+    def put(offset, chunk, checksum=None):
+        return client.put(f'/upload/{batch_id}/chunk?offset={offset}', data=chunk,
+                          headers={'X-Chunk-Sha256': checksum or hashlib.sha256(chunk).hexdigest()})
+
+    offsets = list(range(0, len(data), 64))
+    assert put(0, data[:64], checksum='0' * 64).status_code == 422
+    # el final (directorio central) primero: la extracción arranca antes de completar
+    for off in reversed(offsets[len(offsets) // 2:]):
+        assert put(off, data[off:off + 64]).status_code == 200
+    status = client.get(f'/upload/{batch_id}').get_json()
+    assert status['extracting'] and not status['complete']
+    assert status['missing'] == [[0, offsets[len(offsets) // 2]]]
+    assert client.post(f'/upload/{batch_id}/finalize').status_code == 409
+    # reanudación tras "reinicio": el estado se recupera de upload.json
+    app_module._drop_chunked_upload(batch_id)
+    for off in offsets[:len(offsets) // 2]:
+        assert put(off, data[off:off + 64]).status_code == 200
+    assert client.get(f'/upload/{batch_id}').get_json()['complete']
+    res = client.post(f'/upload/{batch_id}/finalize', data={'theme_name': 'Demo'})
+    assert res.status_code == 200
+    batch_dir = tmp_path / batch_id
+    assert (batch_dir / '01-hero.png').exists() and (batch_dir / '02-about.png').exists()
+    assert not (batch_dir / 'copia' / '01-hero.png').exists()
+
+
+def test_chunked_upload_stall_reingests_and_evicts(tmp_path, monkeypatch):
+    import hashlib
+    import time
+    monkeypatch.setattr(app_module, 'UPLOAD_DIR', str(tmp_path))
+    monkeypatch.setattr(app_module, 'UPLOAD_STALL_TIMEOUT', 0.2)
+    data = open(_design_zip(str(tmp_path / 'design.zip')), 'rb').read()
+    client = app_module.app.test_client()
+    assert client.post('/upload/00000000-0000-0000-0000-000000000000/finalize').get_json()['error']
+    batch_id = client.post('/upload/init', json={'filename': 'design.zip', 'size': len(data)}).get_json()['batch_id']
+
+    def put(a, b):
+        chunk = data[a:b]
+        return client.put(f'/upload/{batch_id}/chunk?offset={a}', data=chunk,
+                          headers={'X-Chunk-Sha256': hashlib.sha256(chunk).hexdigest()})
+    half = len(data) // 2
+    assert put(half, len(data)).status_code == 200
+    # La extracción en curso se agota esperando la primera mitad
+    job = app_module.CHUNKED_UPLOADS[batch_id]['ingest']
+    assert job['done'].wait(5) and isinstance(job['error'], TimeoutError)
+    assert put(0, half).status_code == 200
+    assert client.post(f'/upload/{batch_id}/finalize', data={'theme_name': 'Demo'}).status_code == 200
+    batch_dir = tmp_path / batch_id
+    assert (batch_dir / '01-hero.png').exists() and (batch_dir / '02-about.png').exists()
+    # Una subida abandonada se olvida (y se puede reanudar desde upload.json)
+    other = client.post('/upload/init', json={'filename': 'design.zip', 'size': len(data)}).get_json()['batch_id']
+    app_module._evict_chunked_uploads(time.time() + 1)
+    assert other not in app_module.CHUNKED_UPLOADS
+    assert client.get(f'/upload/{other}').get_json()['received'] == 0
+
+
+def test_batch_workspaces_are_isolated(tmp_path, monkeypatch):
+    import uuid
+    monkeypatch.setattr(app_module, 'UPLOAD_DIR', str(tmp_path / 'uploads'))
+    monkeypatch.setattr(app_module, 'WORKSPACES_DIR', str(tmp_path / 'workspaces'))
+    batches = {}
+    for color in ((200, 30, 30), (30, 30, 200)):
+        batch_id = str(uuid.uuid4())
+        batch_dir = tmp_path / 'uploads' / batch_id
+        batch_dir.mkdir(parents=True)
+        (batch_dir / '01-hero.png').write_bytes(_png_bytes(color, (160, 120)))
+        batches[batch_id] = color
+        app_module._do_convert_async({'batch_id': batch_id})
+        assert app_module.PROGRESS[batch_id]['ready']
+    client = app_module.app.test_client()
+    for batch_id, color in batches.items():
+        ws = app_module._workspace(batch_id)
+        assert ws['root'] == str(tmp_path / 'workspaces' / batch_id)
+        assert os.path.isfile(os.path.join(ws['theme'], 'theme.json'))
+        assert not os.path.isdir(os.path.join(ws['theme'], 'node_modules'))
+        asset = client.get(f'/batch/{batch_id}/temp_out/assets/01-hero.png')
+        assert asset.status_code == 200
+        assert Image.open(io.BytesIO(asset.data)).convert('RGB').getpixel((0, 0)) == color
+        bundle = client.get(f'/batch/{batch_id}/download_bundle')
+        assert bundle.status_code == 200
+        assert 'html/index.html' in zipfile.ZipFile(io.BytesIO(bundle.data)).namelist()
+        assert os.path.isfile(os.path.join(ws['dist'], 'img2html_bundle.zip'))
+    assert client.get(f'/batch/{uuid.uuid4()}/download_static').status_code == 404
+    assert client.get('/batch/no-es-un-lote/temp_out/index.html').status_code == 404
+
+
+def test_progress_stream_and_eviction(monkeypatch):
+    import json
+    import threading
+    monkeypatch.setattr(app_module, 'PROGRESS', {})
+    monkeypatch.setattr(app_module, '_progress_meta', {})
+    monkeypatch.setattr(app_module, 'PROGRESS_MAX', 3)
+    monkeypatch.setattr(app_module, 'PROGRESS_TTL', 60)
+    batch_id = 'lote-sse'
+    app_module._set_progress(batch_id, 5, 'Inicializando conversión')
+
+    def convert():
+        for pct, msg in ((40, 'OCR: tesseract'), (80, 'Construyendo tema FSE')):
+            app_module._set_progress(batch_id, pct, msg)
+        app_module.PROGRESS[batch_id]['ready'] = True
+        app_module._set_progress(batch_id, 100, 'Conversión completada')
+
+    client = app_module.app.test_client()
+    res = client.get(f'/progress/{batch_id}/stream', buffered=False)
+    assert res.mimetype == 'text/event-stream'
+    timer = threading.Timer(0.2, convert)
+    timer.start()
+    events = [json.loads(line[6:]) for line in res.get_data(as_text=True).splitlines() if line.startswith('data: ')]
+    timer.join()
+    assert events[0]['percent'] == 5 and events[-1]['ready'] and events[-1]['percent'] == 100
+    assert client.get(f'/progress/{batch_id}').get_json()['ready']
+
+    # Acotado: los terminados salen primero; pasado el TTL se olvidan
+    for i in range(4):
+        app_module._set_progress(f'activo-{i}', 10, 'Cargando imágenes')
+    assert sorted(app_module.PROGRESS) == ['activo-1', 'activo-2', 'activo-3']
+    app_module._set_progress('activo-3', 100, 'Error en conversión')
+    app_module._prune_progress(app_module.time.time() + 30)
+    assert 'activo-3' in app_module.PROGRESS
+    app_module._prune_progress(app_module.time.time() + 120)
+    assert sorted(app_module.PROGRESS) == ['activo-1', 'activo-2']
+
+
+def test_analysis_cache_reused_across_batches(tmp_path, monkeypatch):
+    import numpy as np
+    import analyzer
+    a = np.full((600, 900, 3), (240, 230, 220), np.uint8)
+    a[100:250, 50:400] = (20, 30, 40)
+    a[300:500, 450:850] = (200, 40, 60)
+    first, second = tmp_path / 'a' / '01-hero.png', tmp_path / 'b' / 'portada.png'
+    for p in (first, second):
+        p.parent.mkdir()
+        Image.fromarray(a).save(str(p))
+    calls = []
+    real = analyzer.segment_layout
+    monkeypatch.setattr(analyzer, 'segment_layout', lambda *a, **k: calls.append(1) or real(*a, **k))
+    out_a, out_b = tmp_path / 'out-a', tmp_path / 'out-b'
+    out_a.mkdir()
+    out_b.mkdir()
+    layout_a = analyzer.slice_layout(str(first), str(out_a), depth=3)
+    dna_a = analyzer.extract_design_dna([str(first)])
+    # Mismo contenido con otro nombre: la geometría sale de la caché y los recortes se reescriben
+    layout_b = analyzer.slice_layout(str(second), str(out_b), depth=3)
+    dna_b = analyzer.extract_design_dna([str(second)])
+    assert len(calls) == 1
+    assert dna_a == dna_b
+    assert [[c['box'] for c in r['columns']] for r in layout_a['rows']] == [[c['box'] for c in r['columns']] for r in layout_b['rows']]
+    assert sorted(os.listdir(str(out_b))) == sorted(n.replace('01-hero', 'portada') for n in os.listdir(str(out_a)))
+    stats = app_module.app.test_client().get('/cache/stats').get_json()
+    assert stats['stages']['layout']['hits'] == 1 and stats['stages']['layout']['misses'] == 1
+    assert stats['stages']['dna']['hits'] == 1 and stats['entries'] == 2
+
+
+def test_incremental_reconversion_only_redoes_changed_sections(tmp_path, monkeypatch):
+    import uuid
+    monkeypatch.setattr(app_module, 'UPLOAD_DIR', str(tmp_path / 'uploads'))
+    monkeypatch.setattr(app_module, 'WORKSPACES_DIR', str(tmp_path / 'workspaces'))
+    ocr_calls, refine_calls, submitted = [], [], []
+    monkeypatch.setattr(app_module, 'extract_texts', lambda imgs: (ocr_calls.append(sorted(os.path.basename(p) for p in imgs)), ({}, 'test'))[1])
+    monkeypatch.setattr(app_module, 'refine_and_generate_wp', lambda *a, **k: refine_calls.append(1) or {'used_ai': False, 'provider': ''})
+
+    class _SyncQueue:
+        def submit(self, job_id, ctx):
+            # Al encolar, el progreso de la conversión anterior ya no cuenta como terminado
+            st = app_module.PROGRESS[job_id]
+            submitted.append((st['ready'], st['percent'], 'ocr_provider' in st))
+            app_module._do_convert_async(ctx)
+            return 0
+    monkeypatch.setattr(app_module, '_get_job_queue', lambda: _SyncQueue())
+    batch_id = str(uuid.uuid4())
+    batch_dir = tmp_path / 'uploads' / batch_id
+    batch_dir.mkdir(parents=True)
+    (batch_dir / '01-hero.png').write_bytes(_png_bytes((200, 30, 30), (160, 120)))
+    (batch_dir / '02-about.png').write_bytes(_png_bytes((30, 30, 200), (160, 120)))
+    app_module._do_convert_async({'batch_id': batch_id, 'theme_name': 'Demo'})
+    assert ocr_calls == [['01-hero.png', '02-about.png']] and len(refine_calls) == 1
+    # Sin cambios: ni OCR, ni tema, ni refinado
+    app_module._do_convert_async({'batch_id': batch_id, 'theme_name': 'Demo'})
+    assert len(ocr_calls) == 1 and len(refine_calls) == 1
+    assert app_module.PROGRESS[batch_id]['incremental'] == {'changed': 0, 'reused': 2, 'removed': 0}
+    # Se sustituye una captura: solo esa sección vuelve a pasar por el OCR
+    client = app_module.app.test_client()
+    resp = client.post(f'/batch/{batch_id}/images', data={'images': (io.BytesIO(_png_bytes((30, 160, 30), (160, 120))), '02-about.png')},
+                       content_type='multipart/form-data')
+    assert resp.status_code == 302
+    assert ocr_calls[-1] == ['02-about.png'] and len(refine_calls) == 2
+    assert submitted == [(False, 1, False)] and app_module.PROGRESS[batch_id]['ready']
+    assert app_module.PROGRESS[batch_id]['incremental'] == {'changed': 1, 'reused': 1, 'removed': 0}
+    asset = client.get(f'/batch/{batch_id}/temp_out/assets/02-about.png')
+    assert Image.open(io.BytesIO(asset.data)).convert('RGB').getpixel((0, 0)) == (30, 160, 30)
+    # El mismo HTML enviado a /refine_theme_from_html no vuelve a refinar el tema
+    bundle = zipfile.ZipFile(io.BytesIO(client.get(f'/batch/{batch_id}/download_static').data))
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w') as zf:
+        for name in bundle.namelist():
+            zf.writestr(name, bundle.read(name))
+    buf.seek(0)
+    resp = client.post('/refine_theme_from_html', data={'batch_id': batch_id, 'html_zip': (buf, 'html.zip')},
+                       content_type='multipart/form-data')
+    assert resp.status_code == 200 and len(refine_calls) == 2
+
+
+@pytest.mark.parametrize('malformed', [False, True])
+def test_fused_vision_ocr_sends_each_image_once(tmp_path, monkeypatch, malformed):
+    import uuid
+    import json
+    import requests
+    monkeypatch.setattr(app_module, 'UPLOAD_DIR', str(tmp_path / 'uploads'))
+    monkeypatch.setattr(app_module, 'WORKSPACES_DIR', str(tmp_path / 'workspaces'))
+    monkeypatch.delenv('GOOGLE_APPLICATION_CREDENTIALS', raising=False)
+    monkeypatch.setenv('USE_VISION_ANALYSIS', 'true')
+    monkeypatch.setattr(app_module, 'FUSED_VISION_OCR', True)
+    monkeypatch.setattr(app_module, 'refine_and_generate_wp', lambda *a, **k: {'used_ai': False, 'provider': ''})
+    ocr_calls, prompts = [], []
+    monkeypatch.setattr(app_module, 'extract_texts', lambda imgs: ocr_calls.append(imgs) or ({}, 'tesseract'))
+
+    class _Resp:
+        status_code = 200
+
+        def json(self):
+            content = {'text': 'Hola mundo', 'components': ['button'], 'layout': {'type': 'grid', 'columns': 2}}
+            if malformed:
+                # layout/colors con otra forma: el texto leído debe conservarse igualmente
+                content.update(layout='grid', colors=['#ffffff'])
+            return {'choices': [{'message': {'content': json.dumps(content)}}]}
+    monkeypatch.setattr(requests.Session, 'post', lambda self, url, json=None, timeout=None: prompts.append(json['messages'][0]['content'][1]['text']) or _Resp())
+    monkeypatch.setattr(requests.Session, 'get', lambda self, url, timeout=None: _Resp())
+    batch_id = str(uuid.uuid4())
+    batch_dir = tmp_path / 'uploads' / batch_id
+    batch_dir.mkdir(parents=True)
+    (batch_dir / '01-hero.png').write_bytes(_png_bytes((200, 30, 30), (160, 120)))
+    (batch_dir / '02-about.png').write_bytes(_png_bytes((30, 30, 200), (160, 120)))
+    app_module._do_convert_async({'batch_id': batch_id})
+    assert app_module.PROGRESS[batch_id]['ready'] and app_module.PROGRESS[batch_id]['ocr_provider'] == 'qwen2-vl'
+    assert len(prompts) == 2 and all('"text"' in p for p in prompts)
+    assert ocr_calls == []
+    ws = app_module._workspace(batch_id)
+    manifest = json.load(open(os.path.join(ws['root'], 'build.json')))
+    assert manifest['sections']['hero']['section'].get('layout_type') == (None if malformed else 'grid')
+    assert manifest['sections']['hero']['section']['detected_components'] == ['button']
+    assert 'Hola mundo' in open(os.path.join(ws['static'], 'hero.html'), encoding='utf-8').read()
+
+
+def test_wxr_keeps_ocr_text_of_sliced_sections(tmp_path, monkeypatch):
+    import uuid
+    monkeypatch.setattr(app_module, 'UPLOAD_DIR', str(tmp_path / 'uploads'))
+    monkeypatch.setattr(app_module, 'WORKSPACES_DIR', str(tmp_path / 'workspaces'))
+    monkeypatch.setenv('USE_VISION_ANALYSIS', 'false')
+    monkeypatch.setattr(app_module, 'refine_and_generate_wp', lambda *a, **k: {'used_ai': False, 'provider': ''})
+    monkeypatch.setattr(app_module, 'extract_texts', lambda imgs: ({p: 'Texto de portada' for p in imgs}, 'test'))
+    batch_id = str(uuid.uuid4())
+    batch_dir = tmp_path / 'uploads' / batch_id
+    batch_dir.mkdir(parents=True)
+    # Captura alta con franjas separadas por blanco: se segmenta en filas
+    img = Image.new('RGB', (200, 600), (255, 255, 255))
+    for top, color in ((20, (200, 30, 30)), (220, (30, 30, 200)), (420, (30, 160, 30))):
+        img.paste(color, (10, top, 190, top + 160))
+    img.save(batch_dir / '01-hero.png')
+    app_module._do_convert_async({'batch_id': batch_id})
+    ws = app_module._workspace(batch_id)
+    manifest = app_module._load_build_manifest(ws)
+    section = manifest['sections']['hero']['section']
+    assert section['images'] != [str(batch_dir / '01-hero.png')]
+    # segments solo nombra archivos escritos; las filas virtuales quedan en segment_refs
+    assert all(os.path.isfile(os.path.join(ws['static'], 'assets', n)) for n in section['segments'])
+    assert len(section['segment_refs']) >= 2
+    wxr = open(os.path.join(ws['static'], 'content.xml'), encoding='utf-8').read()
+    assert 'Texto de portada' in wxr
+
+
+def test_batch_update_rejected_while_conversion_runs(tmp_path, monkeypatch):
+    import uuid
+    monkeypatch.setattr(app_module, 'UPLOAD_DIR', str(tmp_path / 'uploads'))
+    monkeypatch.setattr(app_module, 'WORKSPACES_DIR', str(tmp_path / 'workspaces'))
+    batch_id = str(uuid.uuid4())
+    batch_dir = tmp_path / 'uploads' / batch_id
+    batch_dir.mkdir(parents=True)
+    original = _png_bytes((200, 30, 30))
+    (batch_dir / '01-hero.png').write_bytes(original)
+    ws = app_module._workspace(batch_id)
+    os.makedirs(ws['root'])
+    app_module._save_build_manifest(ws, {'ctx': {'theme_name': 'Demo'}, 'sections': {}})
+    submitted = []
+
+    class _BusyQueue:
+        def status(self, job_id):
+            return {'state': 'running', 'position': 0}
+
+        def submit(self, job_id, ctx):
+            submitted.append(job_id)
+            return 0
+    monkeypatch.setattr(app_module, '_get_job_queue', lambda: _BusyQueue())
+    client = app_module.app.test_client()
+    resp = client.post(f'/batch/{batch_id}/images', data={'images': (io.BytesIO(_png_bytes((30, 160, 30))), '01-hero.png')},
+                       content_type='multipart/form-data')
+    assert resp.status_code == 302 and 'progress_ui' in resp.headers['Location']
+    # Ni se toca la captura ni se reenvía un trabajo que se perdería
+    assert (batch_dir / '01-hero.png').read_bytes() == original and submitted == []
+    resp = client.post('/start_convert', data={'batch_id': batch_id})
+    assert resp.status_code == 302 and submitted == []
+
+
+def test_failed_conversion_reaches_the_job_queue(monkeypatch):
+    import uuid
+    batch_id = str(uuid.uuid4())
+
+    def boom(*a, **k):
+        raise RuntimeError('disco lleno')
+    monkeypatch.setattr(app_module, '_open_workspace', boom)
+    # El error se publica en el progreso y se relanza para que la cola marque FAILED
+    with pytest.raises(RuntimeError):
+        app_module._run_convert_job({'batch_id': batch_id})
+    assert app_module.PROGRESS[batch_id]['message'] == 'Error en conversión'
+    assert not app_module.PROGRESS[batch_id]['ready']
+
+
+def test_job_queue_starts_with_the_app(monkeypatch):
+    started = []
+    monkeypatch.setattr(app_module, '_get_job_queue', lambda: started.append(1))
+    monkeypatch.setattr(app_module, 'JOB_QUEUE_AUTOSTART', True)
+    app_module._autostart_job_queue()
+    assert started == [1]
+    monkeypatch.setattr(app_module, 'JOB_QUEUE_AUTOSTART', False)
+    app_module._autostart_job_queue()
+    assert started == [1]
+
+
+def _slice_layout_failing_in_pool(path, *args):
+    # Falla solo dentro de un proceso del pool: la sección se rehace en secuencial
+    import multiprocessing
+    import analyzer
+    if 'roto' in os.path.basename(path) and multiprocessing.parent_process() is not None:
+        raise RuntimeError('fallo en el pool')
+    return analyzer.slice_layout(path, *args)
+
+
+def test_slice_sections_pool_matches_sequential(tmp_path, monkeypatch):
+    import numpy as np
+    monkeypatch.setattr(app_module, 'slice_layout', _slice_layout_failing_in_pool)
+    sections = []
+    for i, name in enumerate(('01-hero.png', '02-roto.png', '03-about.png', '04-footer.png')):
+        arr = np.full((900, 400, 3), 250, dtype=np.uint8)
+        for top in range(40 + 20 * i, 900, 300):
+            arr[top:top + 180, 30:370] = (30 + 50 * i, 90, 200 - 40 * i)
+        path = tmp_path / name
+        Image.fromarray(arr).save(str(path))
+        sections.append({'images': [str(path)]})
+    sections.append({'images': []})
+    try:
+        results = {}
+        for workers in (1, 2):
+            out = tmp_path / f'assets-{workers}'
+            out.mkdir()
+            calls = []
+            layouts = app_module._slice_sections(sections, str(out), workers=workers,
+                                                 on_section=lambda done, total: calls.append((done, total)))
+            assert calls == [(1, 4), (2, 4), (3, 4), (4, 4)]
+            results[workers] = {i: [r['box'] for r in lay['rows']] for i, lay in layouts.items()}
+        assert sorted(results[2]) == [0, 1, 2, 3]
+        assert results[2] == results[1]
+        # El pool se reutiliza entre conversiones
+        assert app_module._slice_pool is not None
+        assert app_module._get_slice_pool(2) is app_module._slice_pool
+    finally:
+        app_module._drop_slice_pool()
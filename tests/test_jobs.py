@@ -0,0 +1,157 @@
+import os
+import sys
+import sqlite3
+import threading
+import time
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from jobs import JobQueue, QueueFull, JobRunning, DONE, FAILED, run_stages
+
+
+def test_job_queue_fifo_positions_and_limit(tmp_path):
+    gate = threading.Event()
+    ran = []
+
+    def runner(ctx):
+        gate.wait(5)
+        ran.append(ctx['n'])
+
+    positions = {}
+    q = JobQueue(str(tmp_path / 'jobs.sqlite3'), runner, workers=1, max_queued=2,
+                 on_position=lambda job_id, pos: positions.__setitem__(job_id, pos),
+                 secret_keys=('key',))
+    q.start()
+    q.submit('a', {'n': 1})
+    for _ in range(100):
+        if q.position('a') == 0:
+            break
+        threading.Event().wait(0.02)
+    assert q.submit('b', {'n': 2, 'key': 'secreto'}) == 1
+    assert q.submit('c', {'n': 3}) == 2
+    # Reenviar uno en cola actualiza su ctx; uno en ejecución no se puede reenviar
+    assert q.submit('b', {'n': 2}) == 1
+    with pytest.raises(JobRunning):
+        q.submit('a', {'n': 1})
+    with pytest.raises(QueueFull):
+        q.submit('d', {'n': 4})
+    assert positions['c'] == 2
+    with sqlite3.connect(str(tmp_path / 'jobs.sqlite3')) as db:
+        assert all('secreto' not in row[0] for row in db.execute('SELECT ctx FROM jobs'))
+    gate.set()
+    for _ in range(250):
+        if q.status('c')['state'] == DONE:
+            break
+        threading.Event().wait(0.02)
+    q.stop()
+    assert ran == [1, 2, 3]
+
+
+def test_job_queue_resumes_after_restart(tmp_path):
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    first = JobQueue(db_path, lambda ctx: None, workers=1)
+    first.submit('interrumpido', {'n': 1})
+    first.submit('pendiente', {'n': 2})
+    # Simula un proceso caído a mitad del primer trabajo
+    with sqlite3.connect(db_path) as db:
+        db.execute("UPDATE jobs SET state='running', attempts=1 WHERE job_id='interrumpido'")
+    ran = []
+    done = threading.Event()
+
+    def runner(ctx):
+        ran.append(ctx['n'])
+        if len(ran) == 2:
+            done.set()
+
+    second = JobQueue(db_path, runner, workers=1).start()
+    assert done.wait(5)
+    second.stop()
+    assert ran == [1, 2]
+
+
+def test_run_stages_overlaps_independent_branches():
+    started = {}
+
+    def stage(name, secs, value):
+        def fn(deps):
+            started[name] = time.time()
+            time.sleep(secs)
+            return (value, sorted(deps))
+        return fn
+
+    t0 = time.time()
+    results = run_stages({
+        'ocr': ((), stage('ocr', 0.3, 'texto')),
+        'dna': ((), stage('dna', 0.3, 'paleta')),
+        'slice': ((), stage('slice', 0.1, 'filas')),
+        'html': (('ocr', 'slice'), stage('html', 0.0, 'index')),
+        'theme': (('dna', 'slice'), stage('theme', 0.0, 'tema')),
+    })
+    elapsed = time.time() - t0
+    assert elapsed < 0.55
+    assert results['html'] == ('index', ['ocr', 'slice'])
+    assert started['html'] >= started['ocr'] + 0.29
+
+    def boom(deps):
+        raise RuntimeError('fallo OCR')
+
+    ran = []
+    with pytest.raises(RuntimeError):
+        run_stages({'ocr': ((), boom), 'html': (('ocr',), lambda d: ran.append('html'))})
+    assert ran == []
+    with pytest.raises(ValueError):
+        run_stages({'a': (('b',), lambda d: 1), 'b': (('a',), lambda d: 2)})
+
+
+def test_job_queue_records_failed_jobs(tmp_path):
+    done = threading.Event()
+
+    def runner(ctx):
+        try:
+            raise RuntimeError('fallo en conversión')
+        finally:
+            done.set()
+
+    q = JobQueue(str(tmp_path / 'jobs.sqlite3'), runner, workers=1).start()
+    q.submit('roto', {})
+    assert done.wait(5)
+    for _ in range(100):
+        if q.status('roto')['state'] == FAILED:
+            break
+        threading.Event().wait(0.02)
+    q.stop()
+    st = q.status('roto')
+    assert st['state'] == FAILED and st['error'] == 'fallo en conversión'
+
+
+def test_job_queue_shared_database_claims_once(tmp_path):
+    import socket
+    db_path = str(tmp_path / 'jobs.sqlite3')
+    ran = []
+    lock = threading.Lock()
+
+    def runner(ctx):
+        with lock:
+            ran.append(ctx['n'])
+        time.sleep(0.01)
+
+    # Dos "procesos" sobre la misma base: cada trabajo se ejecuta una sola vez
+    queues = [JobQueue(db_path, runner, workers=2).start() for _ in range(2)]
+    for n in range(20):
+        queues[n % 2].submit(f'job-{n}', {'n': n})
+    for _ in range(250):
+        if len(ran) >= 20 and all(queues[0].status(f'job-{n}')['state'] == DONE for n in range(20)):
+            break
+        threading.Event().wait(0.02)
+    for q in queues:
+        q.stop()
+    assert sorted(ran) == list(range(20))
+    # Un trabajo en ejecución en otro proceso vivo no se reencola; el de un proceso muerto sí
+    alive = f'{socket.gethostname()}:{os.getppid()}:abc'
+    dead = f'{socket.gethostname()}:{2 ** 22 + 12345}:abc'
+    with sqlite3.connect(db_path) as db:
+        db.execute("INSERT INTO jobs (job_id, ctx, state, attempts, created, owner, heartbeat) VALUES ('vivo', '{}', 'running', 1, 0, ?, ?)", (alive, time.time()))
+        db.execute("INSERT INTO jobs (job_id, ctx, state, attempts, created, owner, heartbeat) VALUES ('muerto', '{}', 'running', 1, 0, ?, ?)", (dead, time.time()))
+    other = JobQueue(db_path, lambda ctx: None, workers=1)
+    other._requeue_stale()
+    assert other.status('vivo')['state'] == 'running'
+    assert other.status('muerto')['state'] == 'queued'
@@ -0,0 +1,92 @@
+import os
+import sys
+import threading
+import time
+import pytest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+requests = pytest.importorskip('requests')
+from lmstudio import LMStudioClient, CircuitOpen, message_content, models_url
+
+
+class _Resp:
+    def __init__(self, status, content=''):
+        self.status_code = status
+        self._content = content
+
+    def json(self):
+        return {'choices': [{'message': {'content': self._content}}]}
+
+
+def test_client_retries_and_bounds_concurrency(monkeypatch):
+    client = LMStudioClient(parallel=2, retries=2, backoff=0.01, max_failures=10)
+    session = client.session()
+    assert session is client.session()
+    monkeypatch.setattr(session, 'get', lambda url, timeout=None: _Resp(200))
+    calls = []
+    statuses = iter([503, 200])
+
+    def flaky(url, json=None, timeout=None):
+        calls.append(timeout)
+        return _Resp(next(statuses), ' hola ')
+    monkeypatch.setattr(session, 'post', flaky)
+    assert message_content(client.post({'model': 'm'}, timeout=30)) == 'hola'
+    assert calls == [(client.connect_timeout, 30)] * 2
+
+    def down(url, json=None, timeout=None):
+        calls.append(timeout)
+        raise requests.exceptions.ConnectionError('caído')
+    monkeypatch.setattr(session, 'post', down)
+    calls.clear()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.post({'model': 'm'})
+    assert len(calls) == 3
+
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow(url, json=None, timeout=None):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return _Resp(200, json['n'])
+    monkeypatch.setattr(session, 'post', slow)
+    t0 = time.time()
+    out = client.map(lambda n: message_content(client.post({'n': str(n)})), range(6))
+    assert out == [str(n) for n in range(6)]
+    assert peak[0] == 2
+    assert time.time() - t0 < 0.3
+
+
+def test_circuit_breaker_trips_and_recovers(monkeypatch):
+    client = LMStudioClient(retries=0, max_failures=2, cooldown=0.2)
+    session = client.session()
+    probes, posts, events = [], [], []
+    client.add_listener(lambda st: events.append(st['state']))
+    monkeypatch.setattr(session, 'get', lambda url, timeout=None: probes.append(url) or _Resp(200))
+
+    def down(url, json=None, timeout=None):
+        posts.append(url)
+        raise requests.exceptions.ConnectionError('caído')
+    monkeypatch.setattr(session, 'post', down)
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.post({})
+    assert client.state()['state'] == 'open' and events == ['open']
+    # Abierto: las llamadas se cortan sin tocar la red
+    for _ in range(5):
+        with pytest.raises(CircuitOpen):
+            client.post({})
+    assert len(posts) == 2 and not client.available()
+    assert probes == [models_url()]
+    # Tras el enfriamiento, una sonda correcta cierra el circuito
+    time.sleep(0.25)
+    monkeypatch.setattr(session, 'post', lambda url, json=None, timeout=None: _Resp(200, 'ok'))
+    assert message_content(client.post({})) == 'ok'
+    assert client.state()['state'] == 'closed' and events == ['open', 'closed']
+    # Una sonda fallida abre el circuito directamente
+    broken = LMStudioClient(cooldown=30)
+    monkeypatch.setattr(broken.session(), 'get', lambda url, timeout=None: _Resp(503))
+    assert not broken.available() and broken.state()['state'] == 'open'
@@ -0,0 +1,8 @@
+(function(){
+  try{
+    var iframes = document.querySelectorAll('.wp-block-embed iframe');
+    iframes.forEach(function(f){
+      f.setAttribute('loading','lazy');
+    });
+  }catch(err){}
+})();
\ No newline at end of file
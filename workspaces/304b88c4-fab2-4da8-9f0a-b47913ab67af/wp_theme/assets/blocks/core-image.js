@@ -0,0 +1,10 @@
+(function(){
+  try{
+    document.addEventListener('keydown', function(e){
+      if (e.key === 'Escape'){
+        var overlay = document.querySelector('.wp-lightbox-overlay');
+        if (overlay){ overlay.click(); }
+      }
+    });
+  }catch(err){}
+})();
\ No newline at end of file
@@ -0,0 +1,27 @@
+<?php
+return [
+  'core/button' => [
+    'style' => ['assets/components/img2html-block-styles.css']
+  ],
+  'core/navigation' => [
+    'style' => ['assets/components/img2html-block-styles.css']
+  ],
+  'img2html/classic-menu' => [
+    'style' => ['assets/components/img2html-block-styles.css']
+  ],
+  'core/image' => [
+    'style' => ['assets/blocks/core-image.css']
+  ],
+  'core/quote' => [
+    'style' => ['assets/blocks/core-quote.css']
+  ],
+  'core/table' => [
+    'style' => ['assets/blocks/core-table.css']
+  ],
+  'core/cover' => [
+    'style' => ['assets/blocks/core-cover.css']
+  ],
+  'core/gallery' => [
+    'style' => ['assets/blocks/core-gallery.css']
+  ]
+];
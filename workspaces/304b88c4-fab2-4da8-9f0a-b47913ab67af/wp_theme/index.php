@@ -0,0 +1,10 @@
+<?php
+/**
+ * Silence is golden.
+ */
+
+
+
+
+
+
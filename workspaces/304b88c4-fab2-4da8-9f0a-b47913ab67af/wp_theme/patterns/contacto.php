@@ -0,0 +1,34 @@
+<?php
+/**
+ * Title: Contacto
+ * Slug: img2html/contacto
+ * Description: Sección de contacto con información y formulario
+ * Categories: img2html-sections, contact
+ * Keywords: contacto, formulario, mapa
+ * Viewport Width: 1200
+ * Block Types: core/post-content
+ * Inserter: yes
+ * Sync Status: synced
+ */
+?>
+<!-- wp:group {"align":"wide","layout":{"type":"constrained"}} -->
+<div class="wp-block-group alignwide">
+<!-- wp:columns {"align":"wide"} -->
+<div class="wp-block-columns alignwide">
+<!-- wp:column -->
+<div class="wp-block-column">
+<!-- wp:heading {"level":2} -->
+<h2>Contáctanos</h2>
+<!-- /wp:heading -->
+<!-- wp:img2html/contact-info /-->
+</div>
+<!-- /wp:column -->
+<!-- wp:column -->
+<div class="wp-block-column">
+<!-- wp:form-contact /-->
+</div>
+<!-- /wp:column -->
+</div>
+<!-- /wp:columns -->
+</div>
+<!-- /wp:group -->
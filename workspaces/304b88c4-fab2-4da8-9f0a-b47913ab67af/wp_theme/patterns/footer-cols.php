@@ -0,0 +1,43 @@
+<?php
+/**
+ * Title: Footer Columnas
+ * Slug: img2html/footer-cols
+ * Description: Pie de página en 3 columnas con enlaces y redes
+ * Categories: img2html-footer, footer
+ * Keywords: footer, columnas, enlaces
+ * Viewport Width: 1200
+ * Block Types: core/post-content
+ * Inserter: yes
+ * Sync Status: synced
+ */
+?>
+<!-- wp:img2html/footer {"columns":3,"darkBackground":true} -->
+<!-- wp:columns -->
+<div class="wp-block-columns">
+<!-- wp:column -->
+<div class="wp-block-column">
+<!-- wp:site-logo {"width":48} /-->
+<!-- wp:paragraph -->
+<p>© 2025. Todos los derechos reservados.</p>
+<!-- /wp:paragraph -->
+</div>
+<!-- /wp:column -->
+<!-- wp:column -->
+<div class="wp-block-column">
+<!-- wp:heading {"level":4} -->
+<h4>Enlaces</h4>
+<!-- /wp:heading -->
+<!-- wp:navigation {"layout":{"type":"flex","orientation":"vertical"}} /-->
+</div>
+<!-- /wp:column -->
+<!-- wp:column -->
+<div class="wp-block-column">
+<!-- wp:heading {"level":4} -->
+<h4>Redes Sociales</h4>
+<!-- /wp:heading -->
+<!-- wp:img2html/social-links /-->
+</div>
+<!-- /wp:column -->
+</div>
+<!-- /wp:columns -->
+<!-- /wp:img2html/footer -->
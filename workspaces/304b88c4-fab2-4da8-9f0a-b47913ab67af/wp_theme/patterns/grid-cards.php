@@ -0,0 +1,18 @@
+<?php
+/**
+ * Title: Grid de Tarjetas
+ * Slug: img2html/grid-cards
+ * Description: Grid reutilizable de tarjetas con tres columnas
+ * Categories: img2html-cards, cards
+ * Keywords: grid, cards, servicios
+ * Viewport Width: 1200
+ * Block Types: core/post-content
+ * Inserter: yes
+ * Sync Status: synced
+ */
+?>
+<!-- wp:img2html/cards-grid {"title":"Nuestros Servicios","columns":3} -->
+<!-- wp:img2html/card {"title":"Servicio 1","text":"Descripción breve del servicio.","buttonText":"Ver más","buttonUrl":"#"} /-->
+<!-- wp:img2html/card {"title":"Servicio 2","text":"Descripción breve del servicio.","buttonText":"Ver más","buttonUrl":"#"} /-->
+<!-- wp:img2html/card {"title":"Servicio 3","text":"Descripción breve del servicio.","buttonText":"Ver más","buttonUrl":"#"} /-->
+<!-- /wp:img2html/cards-grid -->
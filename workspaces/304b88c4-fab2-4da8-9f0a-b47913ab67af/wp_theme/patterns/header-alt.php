@@ -0,0 +1,24 @@
+<?php
+/**
+ * Title: Header Alternativo
+ * Slug: img2html/header-alt
+ * Description: Encabezado alternativo con logo, navegación y botón
+ * Categories: img2html-header, header
+ * Keywords: header, navegación, logo
+ * Viewport Width: 1200
+ * Block Types: core/post-content
+ * Inserter: yes
+ * Sync Status: synced
+ */
+?>
+<!-- wp:img2html/header {"sticky":true,"transparent":false,"alignment":"space-between"} -->
+<!-- wp:site-logo {"width":48} /-->
+<!-- wp:navigation {"layout":{"type":"flex","justifyContent":"left"}} /-->
+<!-- wp:buttons {"layout":{"type":"flex","justifyContent":"right"}} -->
+<div class="wp-block-buttons">
+<!-- wp:button {"backgroundColor":"primary","textColor":"background"} -->
+<div class="wp-block-button"><a class="wp-block-button__link has-primary-background-color has-background-color has-text-color wp-element-button">Contáctanos</a></div>
+<!-- /wp:button -->
+</div>
+<!-- /wp:buttons -->
+<!-- /wp:img2html/header -->
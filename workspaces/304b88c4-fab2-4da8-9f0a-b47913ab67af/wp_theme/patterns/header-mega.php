@@ -0,0 +1,17 @@
+<?php
+/**
+ * Title: Header Mega Menu
+ * Slug: img2html/header-mega
+ * Description: Encabezado con logo y menú clásico con mega menú
+ * Categories: img2html-header, header
+ * Keywords: header, mega menu, navegación
+ * Viewport Width: 1200
+ * Block Types: core/post-content
+ * Inserter: yes
+ * Sync Status: synced
+ */
+?>
+<!-- wp:img2html/header {"sticky":true,"transparent":false,"alignment":"space-between","shadow":true} -->
+<!-- wp:site-logo {"width":48} /-->
+<!-- wp:img2html/classic-menu {"location":"primary_menu","menuClass":"menu-principal","depth":3} /-->
+<!-- /wp:img2html/header -->
@@ -0,0 +1,14 @@
+<?php
+/**
+ * Title: Hero Global
+ * Slug: img2html/hero
+ * Description: Sección hero reutilizable con título, subtítulo y botón
+ * Categories: img2html-hero, hero
+ * Keywords: hero, portada, destacado
+ * Viewport Width: 1200
+ * Block Types: core/post-content
+ * Inserter: yes
+ * Sync Status: synced
+ */
+?>
+<!-- wp:img2html/hero {"title":"Título Principal","subtitle":"Subtítulo descriptivo","buttonText":"Empezar","buttonUrl":"#","align":"center","darkBackground":false,"transparent":false,"sticky":false} /-->
@@ -0,0 +1,33 @@
+<?php
+/*
+Title: Equipo 2x3
+Description: Sección de equipo con 2 filas y 3 columnas
+Categories: img2html-cards
+Sync Status: synced
+*/
+?>
+<!-- wp:group {"layout":{"type":"constrained"}} -->
+<div class="wp-block-group">
+<!-- wp:heading {"textAlign":"center","level":2} -->
+<h2 class="has-text-align-center">Conoce al equipo</h2>
+<!-- /wp:heading -->
+<!-- wp:columns {"isStackedOnMobile":true} -->
+<div class="wp-block-columns"><!-- wp:column -->
+<div class="wp-block-column"><!-- wp:img2html/molecule-team-member {"name":"Ana Pérez","role":"Diseñadora","avatarUrl":"https://via.placeholder.com/96"} /--></div>
+<!-- /wp:column --><!-- wp:column -->
+<div class="wp-block-column"><!-- wp:img2html/molecule-team-member {"name":"Luis Gómez","role":"Desarrollador","avatarUrl":"https://via.placeholder.com/96"} /--></div>
+<!-- /wp:column --><!-- wp:column -->
+<div class="wp-block-column"><!-- wp:img2html/molecule-team-member {"name":"María López","role":"PM","avatarUrl":"https://via.placeholder.com/96"} /--></div>
+<!-- /wp:column --></div>
+<!-- /wp:columns -->
+<!-- wp:columns {"isStackedOnMobile":true} -->
+<div class="wp-block-columns"><!-- wp:column -->
+<div class="wp-block-column"><!-- wp:img2html/molecule-team-member {"name":"Pedro Ruiz","role":"QA","avatarUrl":"https://via.placeholder.com/96"} /--></div>
+<!-- /wp:column --><!-- wp:column -->
+<div class="wp-block-column"><!-- wp:img2html/molecule-team-member {"name":"Carla Díaz","role":"Marketing","avatarUrl":"https://via.placeholder.com/96"} /--></div>
+<!-- /wp:column --><!-- wp:column -->
+<div class="wp-block-column"><!-- wp:img2html/molecule-team-member {"name":"Jorge Sáenz","role":"Ventas","avatarUrl":"https://via.placeholder.com/96"} /--></div>
+<!-- /wp:column --></div>
+<!-- /wp:columns -->
+</div>
+<!-- /wp:group -->
@@ -0,0 +1,24 @@
+<?php
+/*
+Title: Equipo centrado XL
+Description: Miembros centrados con avatares grandes
+Categories: img2html-cards
+Sync Status: synced
+*/
+?>
+<!-- wp:group {"layout":{"type":"constrained"}} -->
+<div class="wp-block-group">
+<!-- wp:heading {"textAlign":"center","level":2} -->
+<h2 class="has-text-align-center">Nuestro equipo</h2>
+<!-- /wp:heading -->
+<!-- wp:columns {"isStackedOnMobile":true} -->
+<div class="wp-block-columns"><!-- wp:column -->
+<div class="wp-block-column"><!-- wp:img2html/molecule-team-member {"name":"Ana Pérez","role":"Diseñadora","avatarUrl":"https://via.placeholder.com/128","className":"img2html-team-member--center img2html-team-member--xl"} /--></div>
+<!-- /wp:column --><!-- wp:column -->
+<div class="wp-block-column"><!-- wp:img2html/molecule-team-member {"name":"Luis Gómez","role":"Desarrollador","avatarUrl":"https://via.placeholder.com/128","className":"img2html-team-member--center img2html-team-member--xl"} /--></div>
+<!-- /wp:column --><!-- wp:column -->
+<div class="wp-block-column"><!-- wp:img2html/molecule-team-member {"name":"María López","role":"PM","avatarUrl":"https://via.placeholder.com/128","className":"img2html-team-member--center img2html-team-member--xl"} /--></div>
+<!-- /wp:column --></div>
+<!-- /wp:columns -->
+</div>
+<!-- /wp:group -->
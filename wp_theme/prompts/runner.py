@@ -111,8 +111,8 @@ def build_patterns_from_catalog(catalog_path, target_dir):
         title = name.replace('-', ' ').title()
         write_file(fn, stub_pattern(title))
 
-def run_offline_steps(overview):
-    target_dir = (PROMPTS_DIR / '..').resolve()
+def run_offline_steps(overview, target_dir=None):
+    target_dir = Path(target_dir) if target_dir else (PROMPTS_DIR / '..').resolve()
     seeds = overview.get('seeds') or {}
     ct = seeds.get('customTemplates')
     tp = seeds.get('templateParts')
@@ -141,7 +141,7 @@ class ThemeBuilder:
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
     def bootstrap(self):
-        run_offline_steps(self.overview)
+        run_offline_steps(self.overview, self.output_dir)
         if self.context.get('palette'):
             tpath = self.output_dir / 'theme.json'
             theme = load_json(tpath) or {"version":3, "settings":{}}